@@ -1,6 +1,8 @@
 from project_raccoon.src.data.monomers import Monomer, Monomers
-from project_raccoon.src.functions import generate_file
+from project_raccoon.src.functions import generate_file, generate_sequence
 
-monomers = Monomers.from_file("monomers.dat")
+monomers = Monomers.from_json()
+sequence = generate_sequence(monomers, "gmx/seq_FHFHF.txt")
 
-generate_file(monomers, False, "gmx/seq_FHFHF.txt", "gmx/system.pdb", trr=1)
+# grown with a loose threshold, the soft clashes are relaxed afterwards
+generate_file(monomers, sequence, False, "gmx/system.pdb", trr=0.7, relax=1.0)
@@ -1,6 +1,11 @@
-from .src.data import Monomer, Monomers, Sequence, Atom
+from .src.data import Monomer, Monomers, Sequence, Atom, Structure
 from .src.functions import (
     generate_file,
+    build_structure,
+    generate_ensemble,
+    build_box,
+    relax_structure,
+    write_pdb,
     generate_sequence,
     visualize_pdb_file,
     get_elements_and_coords_from_pdb,
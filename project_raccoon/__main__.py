@@ -1,7 +1,14 @@
 import argparse
 import os
 
-from project_raccoon import start_racoon, welcome, tschau_kakao
+from project_raccoon import (
+    start_racoon,
+    welcome,
+    tschau_kakao,
+    Monomers,
+    generate_sequence,
+    generate_ensemble,
+)
 
 
 def main():
@@ -21,6 +28,24 @@ def main():
     argParser.add_argument(
         "-r", "--removeduplicates", help="Remove Duplicates", type=bool, default=True
     )
+    argParser.add_argument(
+        "-n",
+        "--ensemble",
+        help="Number of conformations, generates an ensemble without the interactive menu",
+        type=int,
+        default=None,
+    )
+    argParser.add_argument(
+        "--seed", help="Master seed of the ensemble", type=int, default=None
+    )
+    argParser.add_argument(
+        "--workers", help="Number of worker processes", type=int, default=None
+    )
+    argParser.add_argument(
+        "--multimodel",
+        help="Write the ensemble as models to a single file",
+        action="store_true",
+    )
 
     args = argParser.parse_args()
 
@@ -38,6 +63,21 @@ def main():
         print("Monomer file does not exist!")
         exit(1)
 
+    if args.ensemble is not None:
+        monomers = Monomers.from_json(MONOMERFILE)
+        sequence = generate_sequence(monomers=monomers, fpath=SEQUENCEFILE)
+        generate_ensemble(
+            monomers,
+            sequence,
+            count=args.ensemble,
+            outpath=OUTPUTFILE,
+            explicit_bonds=EXPLICITBONDS,
+            seed=args.seed,
+            workers=args.workers,
+            multi_model=args.multimodel,
+        )
+        return
+
     welcome()
     start_racoon(
         sequence_file=SEQUENCEFILE,
@@ -1,3 +1,10 @@
-from .monomers import Monomer, Monomers
+from .monomers import Monomer, Monomers, MonomerTemplate
 
-from .structs import Sequence, Atom
+from .structs import (
+    Sequence,
+    Atom,
+    AtomView,
+    BondGraph,
+    CoordinateBuffer,
+    Structure,
+)
@@ -1,8 +1,7 @@
-from ..typing import List, Dict, Union, Optional
+from ..typing import List, Dict, Union, Optional, NamedTuple, Tuple
 from .structs import Atom
 
 from ..util import MONOMERFILE
-import copy
 import ast
 
 import importlib
@@ -10,6 +9,80 @@ import importlib
 import numpy as np
 
 
+class MonomerTemplate(NamedTuple):
+    """
+    Immutable array representation of a monomer, which is used to place residues without per-atom Python objects.
+    Atom indices are relative to the first atom of the monomer and start at 0. Neighbours of polymer building blocks
+    can point to atoms of the previous or next residue, i.e. to negative indices or indices beyond the atom count.
+    """
+
+    name: str
+    """Name of the monomer."""
+    coordinates: np.ndarray
+    """Cartesian coordinates of shape (n,3)."""
+    names: np.ndarray
+    """Force field identifiers of the atoms, shape (n,)."""
+    elements: np.ndarray
+    """Elements of the atoms, shape (n,)."""
+    neighbour_indptr: np.ndarray
+    """CSR index pointer of the neighbour lists, the neighbours of atom i are `neighbour_indices[neighbour_indptr[i]:neighbour_indptr[i+1]]`."""
+    neighbour_indices: np.ndarray
+    """CSR indices of the neighbouring atoms."""
+    link: np.ndarray
+    """Indices of the linked atoms, C- and N-Terminus."""
+
+    @classmethod
+    def from_monomer(cls, monomer: "Monomer") -> "MonomerTemplate":
+        """
+        Creates the template of a monomer.
+
+        Args:
+            - `monomer (Monomer)`: Monomer to create the template from.
+
+        Returns:
+            - `template (MonomerTemplate)`: Read-only template of the monomer.
+        """
+        first = monomer.atoms[0].index if monomer.atoms else 0
+
+        neighbours = [atom.neighbours for atom in monomer.atoms]
+        indptr = np.zeros(len(neighbours) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(n) for n in neighbours])
+
+        arrays = [
+            monomer.coordinates_to_numpy().reshape(-1, 3),
+            np.array([atom.ff_identifier for atom in monomer.atoms], dtype=str),
+            np.array([atom.element for atom in monomer.atoms], dtype=str),
+            indptr,
+            np.array([i for n in neighbours for i in n], dtype=np.int64) - first,
+            np.array(monomer.link, dtype=np.int64) - first,
+        ]
+
+        for array in arrays:
+            array.flags.writeable = False
+
+        return cls(monomer.name, *arrays)
+
+    @property
+    def atom_count(self) -> int:
+        """Number of atoms in the monomer."""
+        return len(self.coordinates)
+
+    def coordinates_to_numpy(self) -> np.ndarray:
+        """Returns the read-only array of the cartesian coordinates of all atoms."""
+        return self.coordinates
+
+    def bonds(self) -> np.ndarray:
+        """Returns all pairs of an atom and one of its neighbours as relative atom indices, shape (M,2)."""
+        atoms = np.repeat(np.arange(self.atom_count), np.diff(self.neighbour_indptr))
+        return np.stack((atoms, self.neighbour_indices), axis=1)
+
+    def invert(self) -> "MonomerTemplate":
+        """Returns the template of the inverted monomer, in which the link list is reversed."""
+        link = self.link[::-1].copy()
+        link.flags.writeable = False
+        return self._replace(link=link)
+
+
 class Monomer:
     """
     Contains the monomer class for the raccoon model.
@@ -51,11 +124,22 @@ class Monomer:
         self.link = link
         self.polymer = polymer
         self.inverted = inverted
+        self._template = None
 
     def coordinates_to_numpy(self):
         """Returns a numpy array of the cartesian coordinates of all atoms."""
         return np.array([[atom.x, atom.y, atom.z] for atom in self.atoms])
 
+    @property
+    def template(self) -> MonomerTemplate:
+        """
+        Read-only array template of the monomer, which is created on first access. Changes of the atoms
+        afterwards are not reflected in the template.
+        """
+        if self._template is None:
+            self._template = MonomerTemplate.from_monomer(self)
+        return self._template
+
     def get_explicit_links(self):
         """Returns a list of lists of all explicit links within the monomer."""
         return [atom.neighbours for atom in self.atoms]
@@ -134,16 +218,39 @@ class Monomer:
                 f"Inversion not possible for {self.name} (polymer building block)."
             )
 
-        inv_monomer = copy.deepcopy(self)
+        # the inverted monomer gets its own atoms, which can be changed without changing this monomer
+        atoms = [
+            Atom(
+                atom.ff_identifier,
+                atom.element,
+                atom.x,
+                atom.y,
+                atom.z,
+                list(atom.neighbours),
+                atom.index,
+            )
+            for atom in self.atoms
+        ]
+
+        inv_monomer = Monomer(
+            name=self.name,
+            resolution=self.resolution,
+            atom_count=self.atom_count,
+            atoms=atoms,
+            link=self.link[::-1],
+            polymer=self.polymer,
+            inverted=not self.inverted,
+        )
 
-        inv_monomer.link = inv_monomer.link[::-1]
-        inv_monomer.inverted = not inv_monomer.inverted
+        if self._template is not None:
+            inv_monomer._template = self._template.invert()
 
         return inv_monomer
 
     def update(self, shift: int, shift_cartesian: List[float]) -> "Monomer":
         """
-        Updates the monomer by shifting the atom positions and indicies.
+        Updates the monomer by shifting the atom positions and indicies. The atoms of the monomer are not changed,
+        the updated monomer contains new atoms.
 
         Args:
             - `shift (int)`: Shift value
@@ -153,24 +260,30 @@ class Monomer:
             - `updated_monomer (Monomer)`: Updated monomer
         """
 
-        updated_monomer = copy.deepcopy(self)
-
-        updated_monomer.link = [x + shift for x in updated_monomer.link]
-
-        for atom in updated_monomer.atoms:
-            # shifting the atom positions
-            atom.x = atom.x + shift_cartesian[0]
-            atom.y = atom.y + shift_cartesian[1]
-            atom.z = atom.z + shift_cartesian[2]
-
-            # shifting the atom index
-            atom.index += shift
-
-            # shifting the neighboring atoms
-            for idx, _ in enumerate(atom.neighbours):
-                atom.neighbours[idx] += shift
+        dx, dy, dz = shift_cartesian
+
+        atoms = [
+            Atom(
+                atom.ff_identifier,
+                atom.element,
+                atom.x + dx,
+                atom.y + dy,
+                atom.z + dz,
+                [neighbour + shift for neighbour in atom.neighbours],
+                atom.index + shift,
+            )
+            for atom in self.atoms
+        ]
 
-        return updated_monomer
+        return Monomer(
+            name=self.name,
+            resolution=self.resolution,
+            atom_count=self.atom_count,
+            atoms=atoms,
+            link=[x + shift for x in self.link],
+            polymer=self.polymer,
+            inverted=self.inverted,
+        )
 
     @classmethod
     def create_monomer(
@@ -316,6 +429,51 @@ class Monomers:
 
     def __init__(self, monomers: List[Monomer]):
         self.monomers = monomers
+        # templates of the inverted monomers by their name and resolution, which are created on first use
+        self._inverted: Dict[Tuple[str, str], Tuple[Monomer, MonomerTemplate]] = dict()
+        self._reindex()
+
+    def _reindex(self) -> None:
+        """Rebuilds the lookup of the list positions of the monomers by their name and resolution."""
+        self._lookup: Dict[Tuple[str, str], int] = dict()
+        for i, monomer in enumerate(self.monomers):
+            self._lookup.setdefault((monomer.name, monomer.resolution), i)
+
+    @staticmethod
+    def _key(item: Union[Monomer, Dict]) -> Optional[Tuple[str, str]]:
+        """Returns the lookup key (name, resolution) of a monomer or dictionary, None if it has no such key."""
+        if isinstance(item, Monomer):
+            return item.name, item.resolution
+        if isinstance(item, Dict) and "name" in item and "resolution" in item:
+            return item["name"], item["resolution"]
+        return None
+
+    def _find(self, item: Union[Monomer, Dict]) -> Optional[int]:
+        """
+        Returns the list position of the first monomer equal to a monomer or dictionary, None if there is none.
+        Monomers are looked up by their name and resolution, so only a single monomer has to be compared.
+        """
+        key = self._key(item)
+
+        if key is not None:
+            i = self._lookup.get(key)
+            if i is not None and i < len(self.monomers):
+                candidate = self.monomers[i]
+                if (candidate.name, candidate.resolution) != key:
+                    # the list was modified directly, not through add_monomer or remove_monomer
+                    self._reindex()
+                    return self._find(item)
+                if candidate == item:
+                    return i
+            elif i is None and len(self._lookup) == len(self.monomers):
+                return None
+
+        # fall back to a linear search, e.g. for dictionaries without name or resolution
+        for i, monomer in enumerate(self.monomers):
+            if monomer == item:
+                return i
+
+        return None
 
     @classmethod
     def from_file(cls, fpath: str):
@@ -394,11 +552,13 @@ class Monomers:
             - `save (Optional[bool], optional)`: Save the monomer to the monomers file. Defaults to False.
         """
 
-        if {"name": monomer.name, "resolution": monomer.resolution} in self.monomers:
+        if (monomer.name, monomer.resolution) in self._lookup:
             print("Monomer already in list")
             return
 
+        self._lookup[(monomer.name, monomer.resolution)] = len(self.monomers)
         self.monomers.append(monomer)
+        self._inverted.clear()
 
         if save:
             self.to_json(MONOMERFILE)
@@ -411,11 +571,40 @@ class Monomers:
             - `save (Optional[bool], optional)`: Save the monomer to the monomers file. Defaults to False.
         """
 
-        self.monomers.remove(monomer)
+        i = self._find(monomer)
+        if i is None:
+            raise ValueError(
+                f"{monomer.name} in {monomer.resolution} resolution not in list"
+            )
+
+        del self.monomers[i]
+        self._reindex()
+        self._inverted.clear()
 
         if save:
             self.to_json()
 
+    def inverted_template(self, index: int) -> MonomerTemplate:
+        """
+        Returns the template of the inverted monomer at a list position. The template is created once per monomer
+        and cached until monomers are added or removed.
+
+        Args:
+            - `index (int)`: List position of the monomer.
+
+        Returns:
+            - `template (MonomerTemplate)`: Read-only template of the inverted monomer.
+        """
+        monomer = self.monomers[index]
+        key = (monomer.name, monomer.resolution)
+
+        cached = self._inverted.get(key)
+        if cached is None or cached[0] is not monomer:
+            cached = (monomer, monomer.invert().template)
+            self._inverted[key] = cached
+
+        return cached[1]
+
     def __repr__(self):
         return f"{len(self.monomers)} Monomers"
 
@@ -465,18 +654,18 @@ class Monomers:
         return iter(self.monomers)
 
     def __contains__(self, item):
-        return item in self.monomers
+        return self._find(item) is not None
 
-    def index(self, monomer: Monomer) -> int:
+    def index(self, monomer: Union[Monomer, Dict]) -> int:
         """
         Return the index of an monomer in the monomers.
         """
-        if monomer in self.monomers:
-            return self.monomers.index(monomer)
-        else:
-            raise ValueError(
-                f"{monomer.name} in {monomer.resolution} monomer.resolution not in list"
-            )
+        i = self._find(monomer)
+        if i is None:
+            name, resolution = self._key(monomer) or (None, None)
+            raise ValueError(f"{name} in {resolution} resolution not in list")
+
+        return i
 
     def __sizeof__(self) -> int:
         return len(self.monomers)
@@ -1,4 +1,6 @@
-from ..typing import NamedTuple, List, Optional, Union
+from ..typing import NamedTuple, List, Optional, Union, Tuple
+
+import numpy as np
 
 
 class Sequence(NamedTuple):
@@ -8,10 +10,149 @@ class Sequence(NamedTuple):
     inverted: List[bool]
     reps: List[int]
 
+    def atom_count(self, monomers: "Monomers") -> int:
+        """Returns the total number of atoms of the sequence, the sum of the repetitions times the atom count of each monomer."""
+        return sum(
+            monomers[index].atom_count * reps
+            for index, reps in zip(self.index, self.reps)
+        )
+
+
+def _unique_keys(keys: np.ndarray) -> np.ndarray:
+    """Returns the sorted unique values of integer keys, sorting is faster than hashing for millions of keys."""
+    keys = np.sort(keys)
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    return keys[first]
+
+
+class BondGraph(NamedTuple):
+    """
+    Undirected bond graph of the atoms in compressed sparse row (CSR) format. The neighbours of the atom with index i are
+    `indices[indptr[i] : indptr[i + 1]]` in ascending order.
+    """
+
+    indptr: np.ndarray
+    """Offsets of the neighbours of every atom in `indices`, shape (N+1,)."""
+    indices: np.ndarray
+    """Indices of the neighbours of all atoms, every bond appears twice, shape (2M,)."""
+    edges: np.ndarray
+    """Unique bonds as pairs of atom indices with i < j, sorted, shape (M,2)."""
+
+    @classmethod
+    def from_edges(cls, edges: np.ndarray, atom_count: int) -> "BondGraph":
+        """
+        Builds the bond graph from pairs of atom indices. Duplicate bonds, either direction, and bonds of an atom to itself
+        are dropped.
+
+        Args:
+            - `edges (np.ndarray)`: Bonds as pairs of atom indices, shape (M,2).
+            - `atom_count (int)`: Number of atoms.
+
+        Returns:
+            - `(BondGraph)`: Bond graph.
+        """
+        edges = np.sort(np.asarray(edges, dtype=np.int64).reshape(-1, 2), axis=1)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+
+        if len(edges) > 0 and (edges.min() < 0 or edges.max() >= atom_count):
+            raise ValueError(f"Bonds refer to atoms outside of [0, {atom_count}).")
+        if (
+            2 * len(edges) > np.iinfo(np.int32).max
+            or atom_count > np.iinfo(np.int32).max
+        ):
+            raise ValueError("The bond graph is too large for 32 bit indices.")
+
+        # unique 1d keys i * N + j are sorted by the first and then by the second atom
+        keys = _unique_keys(edges[:, 0] * atom_count + edges[:, 1])
+        edges = np.stack(np.divmod(keys, atom_count), axis=1).reshape(-1, 2)
+
+        directed = np.concatenate((keys, edges[:, 1] * atom_count + edges[:, 0]))
+        directed.sort()
+        sources, targets = np.divmod(directed, atom_count)
+
+        indptr = np.zeros(atom_count + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=atom_count), out=indptr[1:])
+
+        return cls(indptr, targets.astype(np.int32), edges)
+
+    @property
+    def atom_count(self) -> int:
+        """Number of atoms in the graph."""
+        return len(self.indptr) - 1
+
+    @property
+    def degrees(self) -> np.ndarray:
+        """Number of bonds of every atom, shape (N,)."""
+        return np.diff(self.indptr)
+
+    def neighbours(self, index: int) -> np.ndarray:
+        """Returns the indices of the atoms bonded to the atom with index `index`."""
+        return self.indices[self.indptr[index] : self.indptr[index + 1]]
+
+
+class CoordinateBuffer:
+    """
+    Preallocated buffer of cartesian coordinates, which is filled in place. If the capacity is exceeded,
+    the buffer grows by amortized doubling, so that appending N coordinates is O(N) in total.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._data = np.empty((max(int(capacity), 1), 3))
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        """Number of coordinates, which fit into the buffer without growing it."""
+        return len(self._data)
+
+    def append(self, points: np.ndarray) -> None:
+        """
+        Appends coordinates to the buffer.
+
+        Args:
+            - `points (np.ndarray)`: Coordinates of shape (N,3).
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        start = self._size
+        stop = start + len(points)
+
+        if stop > len(self._data):
+            grown = np.empty((max(stop, 2 * len(self._data)), 3))
+            grown[:start] = self._data[:start]
+            self._data = grown
+
+        self._data[start:stop] = points
+        self._size = stop
+
+    def truncate(self, size: int) -> None:
+        """
+        Discards all coordinates from index `size` on, the capacity of the buffer is kept.
+
+        Args:
+            - `size (int)`: New number of coordinates in the buffer.
+        """
+        if size < 0:
+            raise ValueError(f"Cannot truncate the buffer to a negative size {size}.")
+
+        self._size = min(int(size), self._size)
+
+    def to_numpy(self) -> np.ndarray:
+        """Returns a view of shape (N,3) of the filled part of the buffer."""
+        return self._data[: self._size]
+
+    def __getitem__(self, index):
+        return self.to_numpy()[index]
+
+    def __len__(self):
+        return self._size
+
 
 class Atom:
     """A class which contains the information about the atom."""
 
+    __slots__ = ("ff_identifier", "element", "x", "y", "z", "neighbours", "index")
+
     ff_identifier: str
     """The force field identifier of the atom."""
     element: str
@@ -71,3 +212,321 @@ class Atom:
 
     def __repr__(self) -> str:
         return f"Atom({self.ff_identifier}, {self.element}, {self.x}, {self.y}, {self.z}, {self.neighbours}, {self.index})"
+
+
+class AtomView:
+    """
+    Lightweight, read-only view of an atom in a `Structure`, which provides the same per-atom access as `Atom`
+    without copying the data out of the arrays of the structure.
+    """
+
+    __slots__ = ("_structure", "_index")
+
+    def __init__(self, structure: "Structure", index: int):
+        self._structure = structure
+        self._index = index
+
+    @property
+    def ff_identifier(self) -> str:
+        """The force field identifier of the atom."""
+        return str(self._structure.names[self._index])
+
+    @property
+    def element(self) -> str:
+        """The element of the atom."""
+        return str(self._structure.elements[self._index])
+
+    @property
+    def x(self) -> float:
+        """The x coordinate of the atom."""
+        return float(self._structure.coordinates[self._index, 0])
+
+    @property
+    def y(self) -> float:
+        """The y coordinate of the atom."""
+        return float(self._structure.coordinates[self._index, 1])
+
+    @property
+    def z(self) -> float:
+        """The z coordinate of the atom."""
+        return float(self._structure.coordinates[self._index, 2])
+
+    @property
+    def neighbours(self) -> List[int]:
+        """The serial numbers of the explicitly bonded atoms."""
+        return (self._structure.neighbours(self._index) + 1).tolist()
+
+    @property
+    def index(self) -> int:
+        """The serial number of the atom in the structure."""
+        return self._index + 1
+
+    to_list = Atom.to_list
+    to_dict = Atom.to_dict
+    __repr__ = Atom.__repr__
+
+
+class Structure:
+    """
+    In-memory, array-backed structure of a polymer peptide chain. Atoms are numbered consecutively,
+    the atom with index i has the serial number i + 1 in a PDB file.
+    """
+
+    coordinates: np.ndarray
+    """Cartesian coordinates of shape (N,3)."""
+    names: np.ndarray
+    """Force field identifiers of the atoms, shape (N,)."""
+    elements: np.ndarray
+    """Elements of the atoms, shape (N,)."""
+    residue_names: np.ndarray
+    """Names of the residues of the atoms, shape (N,)."""
+    residue_numbers: np.ndarray
+    """Residue numbers of the atoms starting at 1, shape (N,)."""
+    bonds: np.ndarray
+    """Unique explicit bonds as pairs of atom indices, shape (M,2)."""
+    links: np.ndarray
+    """Bonds between the linked atoms (C- and N-Terminus) of consecutive residues as pairs of atom indices, shape (L,2)."""
+    box: Optional[np.ndarray]
+    """Edge lengths of shape (3,) of the rectangular periodic simulation cell, None for a structure in open space."""
+
+    def __init__(
+        self,
+        coordinates: np.ndarray,
+        names: np.ndarray,
+        elements: np.ndarray,
+        residue_names: np.ndarray,
+        residue_numbers: np.ndarray,
+        bonds: np.ndarray,
+        links: np.ndarray,
+        box: Optional[np.ndarray] = None,
+    ):
+        self.coordinates = coordinates
+        self.names = names
+        self.elements = elements
+        self.residue_names = residue_names
+        self.residue_numbers = residue_numbers
+        self.bonds = bonds
+        self.links = links
+        self.box = box
+        self._adjacency = None
+
+    @classmethod
+    def from_templates(
+        cls, templates: List["MonomerTemplate"], coordinates: np.ndarray
+    ) -> "Structure":
+        """
+        Creates a structure from the templates of consecutive residues and the coordinates of all their atoms.
+        Consecutive residues with the same template are combined into runs, see `from_runs()`.
+
+        Args:
+            - `templates (List[MonomerTemplate])`: Templates of the residues.
+            - `coordinates (np.ndarray)`: Coordinates of all atoms of the residues, shape (N,3).
+
+        Returns:
+            - `structure (Structure)`: Structure of the residues.
+        """
+        runs = list()
+        for template in templates:
+            if runs and runs[-1][0] is template:
+                runs[-1][1] += 1
+            else:
+                runs.append([template, 1])
+
+        return cls.from_runs([tuple(run) for run in runs], coordinates)
+
+    @classmethod
+    def from_runs(
+        cls, runs: List[Tuple["MonomerTemplate", int]], coordinates: np.ndarray
+    ) -> "Structure":
+        """
+        Creates a structure from runs of repeated residues, e.g. the blocks of a sequence, and the coordinates of all their atoms.
+        The atoms, bonds and links of a run are created at once from the template of the run, so that the Python overhead
+        depends on the number of runs instead of the number of residues.
+
+        Args:
+            - `runs (List[Tuple[MonomerTemplate, int]])`: Templates and numbers of repetitions of the runs.
+            - `coordinates (np.ndarray)`: Coordinates of all atoms of the residues, shape (N,3).
+
+        Returns:
+            - `structure (Structure)`: Structure of the residues.
+        """
+        reps = np.array([count for _, count in runs], dtype=np.int64)
+        run_atom_counts = np.array([t.atom_count for t, _ in runs], dtype=np.int64)
+        atom_counts = np.repeat(run_atom_counts, reps)
+        offsets = np.concatenate(([0], np.cumsum(atom_counts)))
+        atom_count = int(offsets[-1])
+
+        if len(coordinates) != atom_count:
+            raise ValueError(
+                f"Expected coordinates of {atom_count} atoms, got {len(coordinates)}."
+            )
+
+        def concatenate(arrays, dtype):
+            return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+        # offsets of the first atoms of the residues of every run, shape (reps, 1)
+        run_offsets = np.split(offsets[:-1], np.cumsum(reps)[:-1])
+        run_offsets = [o[:, None] for o in run_offsets] if len(runs) > 0 else []
+
+        names = concatenate([np.tile(t.names, count) for t, count in runs], str)
+        elements = concatenate([np.tile(t.elements, count) for t, count in runs], str)
+        residue_names = np.repeat(
+            np.array([t.name for t, _ in runs], dtype=str), run_atom_counts * reps
+        )
+        residue_numbers = np.repeat(np.arange(1, len(atom_counts) + 1), atom_counts)
+
+        bonds = concatenate(
+            [
+                (t.bonds()[None, :, :] + o[:, :, None]).reshape(-1, 2)
+                for (t, _), o in zip(runs, run_offsets)
+            ],
+            np.int64,
+        ).reshape(-1, 2)
+        bonds = np.unique(np.sort(bonds, axis=1), axis=0)
+        # neighbours of polymer building blocks can point to atoms outside of the chain, some list the atom itself
+        bonds = bonds[
+            (bonds[:, 0] >= 0)
+            & (bonds[:, 1] < atom_count)
+            & (bonds[:, 0] != bonds[:, 1])
+        ]
+
+        links = concatenate(
+            [(t.link[None, :] + o).reshape(-1) for (t, _), o in zip(runs, run_offsets)],
+            np.int64,
+        )
+        links = np.stack((links[:-1], links[1:]), axis=1)
+
+        return cls(
+            coordinates=np.asarray(coordinates, dtype=float).reshape(-1, 3),
+            names=names,
+            elements=elements,
+            residue_names=residue_names,
+            residue_numbers=residue_numbers,
+            bonds=bonds,
+            links=links,
+        )
+
+    @classmethod
+    def concatenate(
+        cls, structures: List["Structure"], box: Optional[np.ndarray] = None
+    ) -> "Structure":
+        """
+        Combines several chains into one structure. The atoms and residues of the chains are numbered consecutively.
+
+        Args:
+            - `structures (List[Structure])`: Structures of the chains.
+            - `box (Optional[np.ndarray])`: Edge lengths of the periodic simulation cell. Defaults to None.
+
+        Returns:
+            - `structure (Structure)`: Structure of all chains.
+        """
+        atom_offsets = np.cumsum([0] + [s.atom_count for s in structures])
+        residue_offsets = np.cumsum([0] + [s.residue_count for s in structures])
+
+        def concatenate(arrays, dtype, shape=(0,)):
+            return np.concatenate(arrays) if arrays else np.empty(shape, dtype=dtype)
+
+        return cls(
+            coordinates=concatenate([s.coordinates for s in structures], float, (0, 3)),
+            names=concatenate([s.names for s in structures], str),
+            elements=concatenate([s.elements for s in structures], str),
+            residue_names=concatenate([s.residue_names for s in structures], str),
+            residue_numbers=concatenate(
+                [
+                    s.residue_numbers + offset
+                    for s, offset in zip(structures, residue_offsets)
+                ],
+                np.int64,
+            ),
+            bonds=concatenate(
+                [s.bonds + offset for s, offset in zip(structures, atom_offsets)],
+                np.int64,
+                (0, 2),
+            ),
+            links=concatenate(
+                [s.links + offset for s, offset in zip(structures, atom_offsets)],
+                np.int64,
+                (0, 2),
+            ),
+            box=None if box is None else np.asarray(box, dtype=float),
+        )
+
+    @property
+    def atom_count(self) -> int:
+        """Number of atoms in the structure."""
+        return len(self.coordinates)
+
+    @property
+    def residue_count(self) -> int:
+        """Number of residues in the structure."""
+        return int(self.residue_numbers[-1]) if len(self.residue_numbers) else 0
+
+    def neighbours(self, index: int) -> np.ndarray:
+        """
+        Returns the indices of the atoms, which are explicitly bonded to an atom. The adjacency of all
+        atoms is built once from the bonds on the first call.
+
+        Args:
+            - `index (int)`: Index of the atom.
+
+        Returns:
+            - `(np.ndarray)`: Indices of the bonded atoms.
+        """
+        if self._adjacency is None:
+            self._adjacency = BondGraph.from_edges(self.bonds, self.atom_count)
+
+        return self._adjacency.neighbours(index).astype(np.int64)
+
+    def bond_graph(self) -> BondGraph:
+        """
+        Returns the bond graph of the explicit bonds and the links.
+
+        Returns:
+            - `(BondGraph)`: Bond graph of all bonds.
+        """
+        return BondGraph.from_edges(
+            np.concatenate((self.bonds, self.links)), self.atom_count
+        )
+
+    def exclusions(self) -> np.ndarray:
+        """
+        Returns the pairs of atoms, which are separated by one or two bonds (1-2 and 1-3 pairs) over the explicit bonds
+        and the links. These pairs are usually excluded from non-bonded interactions.
+
+        Returns:
+            - `(np.ndarray)`: Unique pairs of atom indices with i < j, shape (K,2).
+        """
+        graph = self.bond_graph()
+        degrees = graph.degrees
+        ends = np.repeat(graph.indptr[1:], degrees)
+        indices = graph.indices.astype(np.int64)
+
+        # two neighbours of the same atom form a 1-3 pair, the neighbours of an atom are sorted
+        pairs = [graph.edges]
+        for offset in range(1, int(degrees.max(initial=0))):
+            positions = np.flatnonzero(np.arange(len(indices)) + offset < ends)
+            pairs.append(
+                np.stack((indices[positions], indices[positions + offset]), axis=1)
+            )
+
+        pairs = np.concatenate(pairs)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+
+        # unique 1d keys i * N + j are much faster than unique rows for large structures
+        keys = _unique_keys(pairs[:, 0] * self.atom_count + pairs[:, 1])
+
+        return np.stack(np.divmod(keys, self.atom_count), axis=1)
+
+    def __getitem__(self, index: int) -> AtomView:
+        if not -self.atom_count <= index < self.atom_count:
+            raise IndexError(f"Atom index {index} out of range.")
+        return AtomView(self, index % self.atom_count)
+
+    def __iter__(self):
+        return (AtomView(self, index) for index in range(self.atom_count))
+
+    def __repr__(self):
+        return f"Structure({self.residue_count} residues, {self.atom_count} atoms, {len(self.bonds)} bonds)"
+
+    def __len__(self):
+        return self.atom_count
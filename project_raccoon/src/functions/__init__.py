@@ -1,9 +1,40 @@
-from .standard import generate_file, generate_sequence, calc_minimal_distance
+from .standard import (
+    generate_file,
+    generate_sequence,
+    calc_minimal_distance,
+    build_structure,
+)
+from .pdb import (
+    PDBAtoms,
+    PDBError,
+    write_pdb,
+    write_models,
+    read_pdb,
+    read_pdb_atoms,
+    read_bond_graph,
+    read_conect,
+    validate_pdb,
+    close_PDB,
+)
+from .contacts import Contacts, close_contacts, write_contacts
+from .ensemble import generate_ensemble
+from .box import build_box
+from .relax import relax_structure
+from .thresholds import ClashThresholds, VDW_RADII
+from .collision import (
+    CollisionIndex,
+    CellList,
+    PeriodicCellList,
+    KDTreeIndex,
+    BoundingSphereIndex,
+)
 from .util import (
     pdb_to_xyz,
     check_pdb_file,
     visualize_pdb_file,
     check_minimal_distance,
+    minimal_distance,
+    check_close_contacts,
     get_elements_and_coords_from_pdb,
     get_links_from_pdb,
 )
@@ -0,0 +1,149 @@
+from ..data import Monomers, Sequence, Structure
+from ..typing import List, Dict, Optional
+from .standard import grow_chain, GrowthError
+from .collision import PeriodicCellList
+
+import numpy as np
+
+ELEMENT_MASSES = {
+    "H": 1.008,
+    "C": 12.011,
+    "N": 14.007,
+    "O": 15.999,
+    "F": 18.998,
+    "P": 30.974,
+    "S": 32.06,
+    "Cl": 35.45,
+    "Br": 79.904,
+    "I": 126.904,
+    # dummy atoms of the monomer library carry no mass
+    "D": 0.0,
+}
+"""Atomic masses in g/mol, which are used to calculate the size of a simulation box from its density."""
+
+# conversion of g/mol / (g/cm^3) to Å^3
+_MOLAR_VOLUME_TO_A3 = 1e24 / 6.02214076e23
+
+
+def sequence_mass(
+    monomers: Monomers, sequence: Sequence, masses: Optional[Dict[str, float]] = None
+) -> float:
+    """
+    Calculates the molar mass of a chain from the elements of its atoms.
+
+    Args:
+        - `monomers (Monomers)`: Monomers object.
+        - `sequence (Sequence)`: Sequence object.
+        - `masses (Optional[Dict[str, float]])`: Masses of elements in g/mol, which override or extend `ELEMENT_MASSES`, e.g. for united atoms. Defaults to None.
+
+    Returns:
+        - `(float)`: Molar mass in g/mol.
+    """
+    masses = {**ELEMENT_MASSES, **(masses or dict())}
+
+    mass = 0.0
+    for index, reps in zip(sequence.index, sequence.reps):
+        for atom in monomers[index].atoms:
+            if atom.element not in masses:
+                raise ValueError(
+                    f"Unknown mass of element {atom.element} in monomer {monomers[index].name}, please pass it with `masses`."
+                )
+            mass += reps * masses[atom.element]
+
+    return mass
+
+
+def build_box(
+    monomers: Monomers,
+    sequences: List[Sequence],
+    counts: List[int],
+    density: Optional[float] = None,
+    box: Optional[np.ndarray] = None,
+    trr: float = 1,
+    masses: Optional[Dict[str, float]] = None,
+    max_attempts: int = 10,
+    rng: Optional[np.random.Generator] = None,
+    **kwargs,
+) -> Structure:
+    """
+    Packs many chains into a rectangular periodic simulation cell, e.g. to build a polymer melt. The chains are grown
+    one after another with `grow_chain()` from random starting points in the cell. All chains share a periodic cell list,
+    so that every trial position is checked against nearby atoms of all chains with the minimum image convention.
+    The chains are kept whole, i.e. their coordinates are not wrapped into the cell.
+
+    Args:
+        - `monomers (Monomers)`: Monomers object.
+        - `sequences (List[Sequence])`: Sequences of the chains, e.g. from several sequence files.
+        - `counts (List[int])`: Number of chains of every sequence.
+        - `density (Optional[float])`: Target density in g/cm^3 of a cubic cell. Either `density` or `box` has to be given.
+        - `box (Optional[np.ndarray])`: Edge lengths in Å of the cell.
+        - `trr (float)`: Threshold for minimal distance.
+        - `masses (Optional[Dict[str, float]])`: Masses of elements in g/mol, which override or extend `ELEMENT_MASSES`. Defaults to None.
+        - `max_attempts (int)`: Number of starting points, which are tried for every chain.
+        - `rng (Optional[np.random.Generator])`: Random number generator. Defaults to None, i.e. the global `np.random` state.
+        - `**kwargs`: Additional arguments of `grow_chain()`, e.g. `damping_factor`, `batch_size` or `thresholds`.
+
+    Returns:
+        - `structure (Structure)`: Structure of all chains with the periodic cell.
+    """
+
+    if len(sequences) != len(counts):
+        raise ValueError(
+            f"Expected a number of chains for each of the {len(sequences)} sequences, got {len(counts)}."
+        )
+
+    if (density is None) == (box is None):
+        raise ValueError("Either the density or the box of the cell has to be given.")
+
+    if box is None:
+        mass = sum(
+            count * sequence_mass(monomers, sequence, masses)
+            for sequence, count in zip(sequences, counts)
+        )
+        box = np.full(3, np.cbrt(mass / density * _MOLAR_VOLUME_TO_A3))
+
+    box = np.asarray(box, dtype=float).reshape(3)
+    random = np.random if rng is None else rng
+
+    atom_count = sum(
+        count * sequence.atom_count(monomers)
+        for sequence, count in zip(sequences, counts)
+    )
+    # with element-pair thresholds, the cells have to cover the largest threshold
+    cutoff = trr
+    thresholds = kwargs.get("thresholds")
+    if thresholds is not None:
+        elements = [
+            monomers[index].template.elements
+            for sequence in sequences
+            for index in sequence.index
+        ]
+        cutoff = thresholds.cutoff(thresholds.types(np.concatenate(elements)))
+
+    placed_atoms = PeriodicCellList(cutoff, box, capacity=atom_count)
+
+    chains = list()
+    for sequence, count in zip(sequences, counts):
+        for _ in range(count):
+            for attempt in range(max_attempts):
+                try:
+                    chain, _ = grow_chain(
+                        monomers,
+                        sequence,
+                        trr=trr,
+                        rng=rng,
+                        placed_atoms=placed_atoms,
+                        origin=random.uniform(0, box),
+                        **kwargs,
+                    )
+                    break
+                except GrowthError:
+                    if attempt == max_attempts - 1:
+                        raise GrowthError(
+                            f"Could not place chain {len(chains) + 1} after {max_attempts} attempts. "
+                            "Please lower the density or the threshold `trr`."
+                        )
+
+            chains.append(chain)
+
+    return Structure.concatenate(chains, box=box)
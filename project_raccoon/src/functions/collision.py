@@ -0,0 +1,591 @@
+from ..typing import List, Dict, Tuple, Optional
+from ..data import CoordinateBuffer
+
+import numpy as np
+
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+
+# cell coordinates are packed into a single int64 key with 21 bits per dimension
+_KEY_BITS = 21
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+
+# key offsets of a cell and its 26 neighbouring cells, the packing is linear in the cell coordinates
+_NEIGHBOUR_KEY_OFFSETS = np.array(
+    [
+        (i << (2 * _KEY_BITS)) + (j << _KEY_BITS) + k
+        for i in (-1, 0, 1)
+        for j in (-1, 0, 1)
+        for k in (-1, 0, 1)
+    ],
+    dtype=np.int64,
+)
+
+# offsets of the integer coordinates of a cell and its 26 neighbouring cells
+_NEIGHBOUR_CELL_OFFSETS = np.array(
+    [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)],
+    dtype=np.int64,
+)
+
+
+class CollisionIndex:
+    """
+    Base class of the incremental collision indices of already placed atoms, which are used by the semi random walk.
+    The coordinates of the atoms are stored in a `CoordinateBuffer`, which is preallocated for `capacity` atoms.
+    Subclasses implement `_index()` to index newly added atoms and `min_distance()`.
+    """
+
+    cutoff: float
+    """Collision threshold, atoms closer than the cutoff clash."""
+
+    def __init__(self, cutoff: float, capacity: int = 1024):
+        if cutoff <= 0:
+            raise ValueError(
+                f"The cutoff of the collision index has to be positive, got {cutoff}."
+            )
+
+        self.cutoff = float(cutoff)
+        self._buffer = CoordinateBuffer(capacity)
+        self._types = np.zeros(max(int(capacity), 1), dtype=np.int64)
+
+    @property
+    def points(self) -> np.ndarray:
+        """Coordinates of shape (N,3) of all atoms in the index."""
+        return self._buffer.to_numpy()
+
+    @property
+    def types(self) -> np.ndarray:
+        """Integer types of shape (N,) of all atoms in the index, e.g. element codes of `ClashThresholds`."""
+        return self._types[: len(self._buffer)]
+
+    def add(self, points: np.ndarray, types: Optional[np.ndarray] = None) -> None:
+        """
+        Adds the atoms of a committed residue to the index.
+
+        Args:
+            - `points (np.ndarray)`: Coordinates of shape (N,3).
+            - `types (Optional[np.ndarray])`: Integer types of the atoms of shape (N,), which select the thresholds of `clashing_pairs()`. Defaults to None, i.e. type 0.
+        """
+        start = len(self._buffer)
+        self._buffer.append(points)
+        stop = len(self._buffer)
+
+        if stop > len(self._types):
+            self._types = np.resize(self._types, self._buffer.capacity)
+        self._types[start:stop] = 0 if types is None else types
+
+        self._index(start, stop)
+
+    def truncate(self, size: int) -> None:
+        """
+        Removes all atoms with an index of at least `size` from the index, e.g. the atoms of undone residues.
+
+        Args:
+            - `size (int)`: Number of atoms, which are kept.
+        """
+        size = min(int(size), len(self._buffer))
+        self._unindex(size)
+        self._buffer.truncate(size)
+
+    def _index(self, start: int, stop: int) -> None:
+        """Indexes the stored atoms with indices in [start, stop)."""
+        raise NotImplementedError
+
+    def _unindex(self, size: int) -> None:
+        """Removes the stored atoms with an index of at least `size` from the index."""
+        raise NotImplementedError
+
+    def min_distance(self, points: np.ndarray) -> float:
+        """
+        Calculates the minimal distance between the given points and the stored atoms.
+
+        Args:
+            - `points (np.ndarray)`: Coordinates of shape (N,3).
+
+        Returns:
+            - `(float)`: Minimal distance, exact below `cutoff`. Larger values only guarantee that no stored atom is closer than `cutoff`.
+        """
+        raise NotImplementedError
+
+    def clashes(self, points: np.ndarray) -> bool:
+        """Returns True if any stored atom is closer than `cutoff` to one of the given points."""
+        return self.min_distance(points) < self.cutoff
+
+    def clashing(self, points: np.ndarray) -> np.ndarray:
+        """
+        Checks every given point for clashes in a single vectorized query, e.g. the atoms of a batch of trial placements.
+
+        Args:
+            - `points (np.ndarray)`: Coordinates of shape (N,3).
+
+        Returns:
+            - `(np.ndarray)`: Boolean mask of shape (N,), True if a stored atom is closer than `cutoff` to the point.
+        """
+        raise NotImplementedError
+
+    def clashing_pairs(
+        self,
+        points: np.ndarray,
+        types: np.ndarray,
+        thresholds: np.ndarray,
+        excluded: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Checks every given point for clashes with thresholds, which depend on the types of both atoms, e.g. their elements.
+        A stored atom of type i and a point of type j clash if they are closer than `thresholds[i, j]`. The thresholds may
+        not exceed `cutoff`.
+
+        Args:
+            - `points (np.ndarray)`: Coordinates of shape (N,3).
+            - `types (np.ndarray)`: Integer types of the points of shape (N,).
+            - `thresholds (np.ndarray)`: Thresholds of all pairs of types.
+            - `excluded (Optional[np.ndarray])`: Pairs of a stored atom and the index of a point of shape (M,2), which never clash, e.g. bonded atoms. Defaults to None.
+
+        Returns:
+            - `(np.ndarray)`: Boolean mask of shape (N,), True if a stored atom is closer than its threshold to the point.
+        """
+        point_indices, atoms, distances = self.close_pairs(points)
+        close = distances < thresholds[self.types[atoms], types[point_indices]]
+
+        if excluded is not None and len(excluded) > 0:
+            keys = atoms * len(points) + point_indices
+            close &= ~np.isin(keys, excluded[:, 0] * len(points) + excluded[:, 1])
+
+        return np.bincount(point_indices[close], minlength=len(points)) > 0
+
+    def close_pairs(
+        self, points: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds all pairs of given points and stored atoms, which are closer than `cutoff`.
+
+        Args:
+            - `points (np.ndarray)`: Coordinates of shape (N,3).
+
+        Returns:
+            - `(Tuple[np.ndarray, np.ndarray, np.ndarray])`: Indices of the points, indices of the stored atoms and distances of the pairs.
+        """
+        raise NotImplementedError
+
+    def __len__(self):
+        return len(self._buffer)
+
+
+class CellList(CollisionIndex):
+    """
+    Incremental uniform grid (cell list) of already placed atoms. The edge length of the cubic cells is equal
+    to the collision threshold, so that every atom closer than the threshold to a trial position is located
+    in the same or in one of the 26 neighbouring cells of that position.
+    """
+
+    def __init__(self, cutoff: float, capacity: int = 1024):
+        super().__init__(cutoff, capacity)
+        self._cells: Dict[int, List[int]] = dict()
+
+    def _cell_keys(self, cells: np.ndarray) -> np.ndarray:
+        """Packs integer cell coordinates of shape (N,3) into unique int64 keys."""
+        cells = cells + _KEY_OFFSET
+        return (
+            (cells[:, 0] << (2 * _KEY_BITS)) | (cells[:, 1] << _KEY_BITS) | cells[:, 2]
+        )
+
+    def _cells_of(self, points: np.ndarray) -> np.ndarray:
+        """Returns the integer cell coordinates of shape (N,3) of the given points."""
+        return np.floor(points / self.cutoff).astype(np.int64)
+
+    def _index(self, start: int, stop: int) -> None:
+        keys = self._cell_keys(self._cells_of(self._buffer[start:stop]))
+        for key, idx in zip(keys.tolist(), range(start, stop)):
+            self._cells.setdefault(key, []).append(idx)
+
+    def _unindex(self, size: int) -> None:
+        keys = self._cell_keys(self._cells_of(self._buffer[size:]))
+        for key in set(keys.tolist()):
+            # the indices in a cell are sorted, since atoms are only appended
+            cell = self._cells[key]
+            while cell and cell[-1] >= size:
+                cell.pop()
+            if not cell:
+                del self._cells[key]
+
+    def neighbours(self, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the indices of all stored atoms in the cells around the given points. Every stored atom
+        closer than `cutoff` to one of the points is contained in the result.
+
+        Args:
+            - `points (np.ndarray)`: Coordinates of shape (N,3).
+
+        Returns:
+            - `(np.ndarray)`: Indices of the candidate atoms.
+        """
+        cells = self._cells_of(np.asarray(points, dtype=float).reshape(-1, 3))
+        keys = np.unique(self._cell_keys(cells))
+        keys = np.unique(keys[:, None] + _NEIGHBOUR_KEY_OFFSETS)
+
+        candidates = list()
+        for key in keys.tolist():
+            cell = self._cells.get(key)
+            if cell is not None:
+                candidates.extend(cell)
+
+        return np.array(candidates, dtype=np.int64)
+
+    def distances(self, points1: np.ndarray, points2: np.ndarray) -> np.ndarray:
+        """
+        Calculates the distance matrix of two sets of points.
+
+        Args:
+            - `points1 (np.ndarray)`: Coordinates of shape (N,3).
+            - `points2 (np.ndarray)`: Coordinates of shape (M,3).
+
+        Returns:
+            - `(np.ndarray)`: Distances of shape (N,M).
+        """
+        return cdist(points1, points2)
+
+    def min_distance(self, points: np.ndarray) -> float:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        candidates = self.neighbours(points)
+
+        if len(candidates) == 0:
+            return np.inf
+
+        return np.min(self.distances(self._buffer[candidates], points))
+
+    def clashing(self, points: np.ndarray) -> np.ndarray:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        candidates = self.neighbours(points)
+
+        if len(candidates) == 0:
+            return np.zeros(len(points), dtype=bool)
+
+        return np.any(
+            self.distances(self._buffer[candidates], points) < self.cutoff, axis=0
+        )
+
+    def close_pairs(
+        self, points: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        candidates = self.neighbours(points)
+
+        if len(candidates) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+
+        distances = self.distances(self._buffer[candidates], points)
+        atoms, point_indices = np.nonzero(distances < self.cutoff)
+
+        return point_indices, candidates[atoms], distances[atoms, point_indices]
+
+
+class PeriodicCellList(CellList):
+    """
+    Cell list of atoms in a rectangular periodic simulation cell. The atoms can be stored with unwrapped coordinates,
+    e.g. of whole chains, they are wrapped into the cell for indexing. Distances are calculated with the minimum image
+    convention. The cell is divided into at least one cell per dimension with an edge length of at least the cutoff.
+    """
+
+    box: np.ndarray
+    """Edge lengths of shape (3,) of the periodic cell."""
+
+    def __init__(self, cutoff: float, box: np.ndarray, capacity: int = 1024):
+        super().__init__(cutoff, capacity)
+
+        self.box = np.asarray(box, dtype=float).reshape(3)
+        if np.any(self.box <= 0):
+            raise ValueError(
+                f"The edge lengths of the periodic cell have to be positive, got {self.box}."
+            )
+
+        self._shape = np.maximum(np.floor(self.box / self.cutoff), 1).astype(np.int64)
+        self._edges = self.box / self._shape
+
+    def _cells_of(self, points: np.ndarray) -> np.ndarray:
+        cells = np.floor(np.asarray(points) / self._edges).astype(np.int64)
+        return cells % self._shape
+
+    def distances(self, points1: np.ndarray, points2: np.ndarray) -> np.ndarray:
+        """Calculates the distance matrix of shape (N,M) of two sets of points with the minimum image convention."""
+        delta = points1[:, None, :] - points2[None, :, :]
+        delta -= self.box * np.round(delta / self.box)
+
+        return np.sqrt(np.einsum("ijk,ijk->ij", delta, delta))
+
+    def neighbours(self, points: np.ndarray) -> np.ndarray:
+        cells = self._cells_of(np.asarray(points, dtype=float).reshape(-1, 3))
+        _, first = np.unique(self._cell_keys(cells), return_index=True)
+        cells = cells[first]
+
+        # the neighbouring cells wrap around the periodic boundaries
+        cells = (cells[:, None, :] + _NEIGHBOUR_CELL_OFFSETS) % self._shape
+        keys = np.unique(self._cell_keys(cells.reshape(-1, 3)))
+
+        candidates = list()
+        for key in keys.tolist():
+            cell = self._cells.get(key)
+            if cell is not None:
+                candidates.extend(cell)
+
+        return np.array(candidates, dtype=np.int64)
+
+
+class KDTreeIndex(CollisionIndex):
+    """
+    Incremental KD-tree of already placed atoms. Rebuilding a `scipy.spatial.cKDTree` after every residue
+    is too expensive, hence the tree is only rebuilt every `rebuild_every` residues and the atoms of the
+    residues added since then (the tail) are checked by brute force. The tail is checked first, since
+    clashes with the most recently placed residues are the most likely ones in a growing chain.
+    """
+
+    rebuild_every: int
+    """Number of added residues after which the tree is rebuilt."""
+
+    def __init__(self, cutoff: float, capacity: int = 1024, rebuild_every: int = 32):
+        super().__init__(cutoff, capacity)
+
+        if rebuild_every < 1:
+            raise ValueError(
+                f"The tree has to be rebuilt at least every residue, got rebuild_every={rebuild_every}."
+            )
+
+        self.rebuild_every = int(rebuild_every)
+        self._tree = None
+        self._tree_size = 0
+        self._pending = 0
+
+    def _index(self, start: int, stop: int) -> None:
+        self._pending += 1
+
+        if self._pending >= self.rebuild_every:
+            self._tree = cKDTree(self._buffer[:stop].copy())
+            self._tree_size = stop
+            self._pending = 0
+
+    def _unindex(self, size: int) -> None:
+        if size < self._tree_size:
+            self._tree = cKDTree(self._buffer[:size].copy()) if size > 0 else None
+            self._tree_size = size
+            self._pending = 0
+
+    def _tail_min_distance(self, points: np.ndarray) -> float:
+        """Minimal distance between the points and the atoms, which are not yet in the tree."""
+        if self._tree_size == len(self._buffer):
+            return np.inf
+
+        return np.min(cdist(self._buffer[self._tree_size :], points))
+
+    def _tree_min_distance(self, points: np.ndarray) -> float:
+        """Minimal distance between the points and the atoms in the tree, `np.inf` beyond the cutoff."""
+        if self._tree is None:
+            return np.inf
+
+        distances, _ = self._tree.query(points, k=1, distance_upper_bound=self.cutoff)
+
+        return np.min(distances)
+
+    def min_distance(self, points: np.ndarray) -> float:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+
+        return min(self._tail_min_distance(points), self._tree_min_distance(points))
+
+    def clashes(self, points: np.ndarray) -> bool:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+
+        # early exit, the tree does not need to be queried
+        if self._tail_min_distance(points) < self.cutoff:
+            return True
+
+        return self._tree_min_distance(points) < self.cutoff
+
+    def clashing(self, points: np.ndarray) -> np.ndarray:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        mask = np.zeros(len(points), dtype=bool)
+
+        if self._tree_size < len(self._buffer):
+            tail = self._buffer[self._tree_size :]
+            mask |= np.any(cdist(tail, points) < self.cutoff, axis=0)
+
+        if self._tree is not None:
+            distances, _ = self._tree.query(
+                points, k=1, distance_upper_bound=self.cutoff
+            )
+            mask |= distances < self.cutoff
+
+        return mask
+
+    def close_pairs(
+        self, points: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        empty = np.empty(0, dtype=np.int64)
+        point_indices, atoms, distances = empty, empty, np.empty(0)
+
+        if self._tree is not None:
+            pairs = cKDTree(points).sparse_distance_matrix(
+                self._tree, self.cutoff, output_type="ndarray"
+            )
+            # the sparse distance matrix contains pairs up to and including the cutoff
+            pairs = pairs[pairs["v"] < self.cutoff]
+            point_indices, atoms, distances = pairs["i"], pairs["j"], pairs["v"]
+
+        if self._tree_size < len(self._buffer):
+            tail = cdist(self._buffer[self._tree_size :], points)
+            tail_atoms, tail_points = np.nonzero(tail < self.cutoff)
+            point_indices = np.concatenate((point_indices, tail_points))
+            atoms = np.concatenate((atoms, tail_atoms + self._tree_size))
+            distances = np.concatenate((distances, tail[tail_atoms, tail_points]))
+
+        return point_indices.astype(np.int64), atoms.astype(np.int64), distances
+
+
+class BoundingSphereIndex(CollisionIndex):
+    """
+    Two-level collision index of already placed residues. Every added block of atoms, i.e. a committed residue, is enclosed
+    by a bounding sphere around its centroid. A query encloses the given points, e.g. a trial placement of a residue, by a
+    bounding sphere and tests it against the spheres of all residues first. The points are then tested against the spheres
+    of the overlapping residues and only the atoms of residues, which still overlap, are checked by distance. In a long chain,
+    most trials are resolved at the residue level with one sphere test per residue.
+    """
+
+    def __init__(self, cutoff: float, capacity: int = 1024):
+        super().__init__(cutoff, capacity)
+
+        self._centers = CoordinateBuffer(capacity)
+        self._radii = np.empty(max(int(capacity), 1))
+        # the atoms of residue i have the indices in [starts[i], starts[i + 1])
+        self._starts = np.zeros(max(int(capacity), 1) + 1, dtype=np.int64)
+
+    @property
+    def residue_count(self) -> int:
+        """Number of residues in the index."""
+        return len(self._centers)
+
+    @staticmethod
+    def bounding_sphere(points: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Returns the centroid and the radius of a sphere around the centroid, which encloses all points."""
+        center = points.mean(axis=0)
+        return center, float(np.sqrt(np.max(np.sum((points - center) ** 2, axis=1))))
+
+    def _index(self, start: int, stop: int) -> None:
+        if stop == start:
+            return
+
+        count = self.residue_count
+        if count == len(self._radii):
+            self._radii = np.resize(self._radii, 2 * count)
+            self._starts = np.resize(self._starts, 2 * count + 1)
+
+        center, radius = self.bounding_sphere(self._buffer[start:stop])
+        self._centers.append(center)
+        self._radii[count] = radius
+        self._starts[count] = start
+        self._starts[count + 1] = stop
+
+    def _unindex(self, size: int) -> None:
+        count = self.residue_count
+        kept = int(np.searchsorted(self._starts[:count], size, side="left"))
+        self._centers.truncate(kept)
+
+        # a partially removed residue gets the sphere of its kept atoms
+        if kept > 0 and self._starts[kept] > size:
+            self._centers.truncate(kept - 1)
+            self._index(int(self._starts[kept - 1]), size)
+
+    def neighbours(self, points: np.ndarray) -> np.ndarray:
+        """
+        Returns the indices of all stored atoms in residues, whose bounding spheres are closer than `cutoff` to one of the
+        given points. Every stored atom closer than `cutoff` to one of the points is contained in the result.
+
+        Args:
+            - `points (np.ndarray)`: Coordinates of shape (N,3).
+
+        Returns:
+            - `(np.ndarray)`: Indices of the candidate atoms.
+        """
+        count = self.residue_count
+        if count == 0 or len(points) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        centers = self._centers.to_numpy()
+        reach = self._radii[:count] + self.cutoff
+
+        # residue level: the sphere of the query against the spheres of all residues
+        center, radius = self.bounding_sphere(points)
+        near = np.flatnonzero(
+            np.sum((centers - center) ** 2, axis=1) <= (reach + radius) ** 2
+        )
+
+        # point level: the points against the spheres of the overlapping residues
+        if len(near) > 0:
+            near = near[
+                np.any(cdist(centers[near], points) <= reach[near, None], axis=1)
+            ]
+
+        starts = self._starts[near]
+        lengths = self._starts[near + 1] - starts
+        offsets = np.cumsum(lengths) - lengths
+
+        return np.repeat(starts - offsets, lengths) + np.arange(np.sum(lengths))
+
+    def min_distance(self, points: np.ndarray) -> float:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        candidates = self.neighbours(points)
+
+        if len(candidates) == 0:
+            return np.inf
+
+        return np.min(cdist(self._buffer[candidates], points))
+
+    def clashing(self, points: np.ndarray) -> np.ndarray:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        candidates = self.neighbours(points)
+
+        if len(candidates) == 0:
+            return np.zeros(len(points), dtype=bool)
+
+        return np.any(cdist(self._buffer[candidates], points) < self.cutoff, axis=0)
+
+    def close_pairs(
+        self, points: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        candidates = self.neighbours(points)
+
+        if len(candidates) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0)
+
+        distances = cdist(self._buffer[candidates], points)
+        atoms, point_indices = np.nonzero(distances < self.cutoff)
+
+        return point_indices, candidates[atoms], distances[atoms, point_indices]
+
+
+COLLISION_BACKENDS = {
+    "grid": CellList,
+    "kdtree": KDTreeIndex,
+    "spheres": BoundingSphereIndex,
+}
+"""Available collision backends of the semi random walk."""
+
+
+def create_collision_index(backend: str, cutoff: float, **kwargs) -> CollisionIndex:
+    """
+    Creates an empty collision index.
+
+    Args:
+        - `backend (str)`: Name of the collision backend, one of `COLLISION_BACKENDS`.
+        - `cutoff (float)`: Collision threshold.
+        - `**kwargs`: Additional arguments of the collision backend.
+
+    Returns:
+        - `(CollisionIndex)`: Empty collision index.
+    """
+    if backend not in COLLISION_BACKENDS:
+        raise ValueError(
+            f"Unknown collision backend {backend}; available backends are {', '.join(COLLISION_BACKENDS)}"
+        )
+
+    return COLLISION_BACKENDS[backend](cutoff, **kwargs)
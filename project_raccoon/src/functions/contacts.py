@@ -0,0 +1,145 @@
+from ..data import BondGraph, Structure
+from ..typing import NamedTuple
+
+import csv
+import numpy as np
+
+from scipy.spatial import cKDTree
+
+
+class Contacts(NamedTuple):
+    """Close contacts of non-bonded atom pairs in a structure, sorted by residue pair and distance."""
+
+    first: np.ndarray
+    """Indices of the first atoms of the pairs, shape (K,)."""
+    second: np.ndarray
+    """Indices of the second atoms of the pairs, shape (K,)."""
+    distances: np.ndarray
+    """Distances of the pairs, shape (K,)."""
+
+
+def close_contacts(
+    structure: Structure, cutoff: float, same_residue: bool = True
+) -> Contacts:
+    """
+    Finds all atom pairs of a structure, which are closer than `cutoff`. Pairs separated by one or two bonds (1-2 and 1-3
+    pairs) over the explicit bonds and the links are excluded, see `Structure.exclusions()`. The pairs are found with a
+    KD-tree neighbour list, so that large structures can be screened without a distance matrix, and only the close pairs
+    are looked up in the bond graph. In a periodic cell,
+    distances are calculated with the minimum image convention.
+
+    Args:
+        - `structure (Structure)`: Structure to check.
+        - `cutoff (float)`: Distance below which a pair of atoms is in contact.
+        - `same_residue (bool)`: If True, pairs of atoms of the same residue are included, e.g. to find clashes within
+          a rotated residue. If False, only pairs of different residues are listed.
+
+    Returns:
+        - `(Contacts)`: Contacts, the first atom of every pair has the lower residue number and index.
+    """
+    if cutoff <= 0:
+        raise ValueError(f"The cutoff has to be positive, got {cutoff}.")
+
+    coordinates = structure.coordinates
+    # the sliding midpoint rule builds the tree faster than the median and queries it as fast
+    if structure.box is None:
+        tree = cKDTree(coordinates, balanced_tree=False)
+    else:
+        # the remainder of a small negative value can round up to the edge of the cell, which the tree rejects
+        wrapped = np.minimum(
+            coordinates % structure.box, np.nextafter(structure.box, 0)
+        )
+        tree = cKDTree(wrapped, boxsize=structure.box, balanced_tree=False)
+
+    pairs = tree.query_pairs(cutoff, output_type="ndarray").astype(np.int64)
+    pairs = np.sort(pairs, axis=1)
+
+    residues = structure.residue_numbers
+    if not same_residue:
+        pairs = pairs[residues[pairs[:, 0]] != residues[pairs[:, 1]]]
+
+    deltas = coordinates[pairs[:, 0]] - coordinates[pairs[:, 1]]
+    if structure.box is not None:
+        deltas -= structure.box * np.round(deltas / structure.box)
+    distances = np.linalg.norm(deltas, axis=1)
+
+    # the query includes pairs at the cutoff
+    close = distances < cutoff
+    pairs, distances = pairs[close], distances[close]
+
+    # only the few close pairs are looked up in the bond graph, instead of listing all 1-2 and 1-3 pairs of the structure
+    excluded = _excluded(structure.bond_graph(), pairs)
+    pairs, distances = pairs[~excluded], distances[~excluded]
+
+    order = np.lexsort((distances, residues[pairs[:, 1]], residues[pairs[:, 0]]))
+
+    return Contacts(pairs[order, 0], pairs[order, 1], distances[order])
+
+
+def _bonded(graph: BondGraph, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Returns a mask of the atom pairs, which are bonded in a bond graph."""
+    count = graph.atom_count
+    # the edges are sorted pairs with i < j, so that their keys i * N + j are sorted
+    keys = graph.edges[:, 0] * count + graph.edges[:, 1]
+    queries = np.minimum(first, second) * count + np.maximum(first, second)
+
+    positions = np.minimum(np.searchsorted(keys, queries), max(len(keys) - 1, 0))
+    return keys[positions] == queries if len(keys) > 0 else np.zeros(len(queries), bool)
+
+
+def _excluded(graph: BondGraph, pairs: np.ndarray) -> np.ndarray:
+    """Returns a mask of the atom pairs, which are separated by one or two bonds (1-2 and 1-3 pairs) in a bond graph."""
+    excluded = _bonded(graph, pairs[:, 0], pairs[:, 1])
+
+    # a 1-3 pair is bonded over a neighbour of its first atom
+    counts = graph.degrees[pairs[:, 0]]
+    rows = np.repeat(np.arange(len(pairs)), counts)
+    positions = np.arange(len(rows)) + np.repeat(
+        graph.indptr[pairs[:, 0]] - (np.cumsum(counts) - counts), counts
+    )
+    neighbours = graph.indices[positions].astype(np.int64)
+    excluded[rows[_bonded(graph, neighbours, pairs[rows, 1])]] = True
+
+    return excluded
+
+
+def write_contacts(structure: Structure, contacts: Contacts, fpath: str) -> None:
+    """
+    Writes close contacts as CSV file with one row per atom pair. The rows are grouped by residue pair and sorted by
+    distance within every group. Atoms are given by their serial numbers, i.e. index + 1.
+
+    Args:
+        - `structure (Structure)`: Structure of the contacts.
+        - `contacts (Contacts)`: Contacts, e.g. from `close_contacts()`.
+        - `fpath (str)`: Path to the CSV file.
+    """
+    first, second = contacts.first, contacts.second
+
+    columns = [
+        structure.residue_numbers[first].tolist(),
+        structure.residue_names[first].tolist(),
+        structure.residue_numbers[second].tolist(),
+        structure.residue_names[second].tolist(),
+        (first + 1).tolist(),
+        structure.names[first].tolist(),
+        (second + 1).tolist(),
+        structure.names[second].tolist(),
+        [f"{distance:.4f}" for distance in contacts.distances.tolist()],
+    ]
+
+    with open(fpath, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "residue_1",
+                "residue_name_1",
+                "residue_2",
+                "residue_name_2",
+                "serial_1",
+                "name_1",
+                "serial_2",
+                "name_2",
+                "distance",
+            ]
+        )
+        writer.writerows(zip(*columns))
@@ -0,0 +1,136 @@
+from ..data import Monomers, Sequence, Structure
+from ..typing import List, Optional, Tuple
+from .standard import grow_chain, GrowthStatistics
+from .pdb import write_pdb, write_models
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+
+def ensemble_paths(outpath: str, count: int) -> List[Path]:
+    """
+    Returns the numbered output paths of an ensemble, e.g. `out_01.pdb` to `out_10.pdb` for `out.pdb` and 10 chains.
+
+    Args:
+        - `outpath (str)`: Path of the output file, which is numbered.
+        - `count (int)`: Number of chains.
+
+    Returns:
+        - `(List[Path])`: Paths of the chains.
+    """
+    outpath = Path(outpath)
+    width = len(str(count))
+
+    return [
+        outpath.with_name(f"{outpath.stem}_{i:0{width}d}{outpath.suffix}")
+        for i in range(1, count + 1)
+    ]
+
+
+# monomers, sequence, explicit bonds and growth arguments of the ensemble, which are sent to every worker once
+_member_setup: Optional[Tuple[Monomers, Sequence, bool, dict]] = None
+
+
+def _init_members(
+    monomers: Monomers, sequence: Sequence, explicit_bonds: bool, kwargs: dict
+) -> None:
+    """Stores the arguments, which are shared by all chains of an ensemble, in the worker process."""
+    global _member_setup
+    _member_setup = (monomers, sequence, explicit_bonds, kwargs)
+
+
+def _build_member(
+    seed: np.random.SeedSequence, outpath: Optional[Path]
+) -> Tuple[Optional[Structure], GrowthStatistics]:
+    """
+    Grows a single chain of an ensemble with its own random number generator, see `_init_members()`. If `outpath` is given,
+    the chain is written by the worker and only the statistics are returned.
+    """
+    monomers, sequence, explicit_bonds, kwargs = _member_setup
+
+    structure, statistics = grow_chain(
+        monomers, sequence, rng=np.random.default_rng(seed), **kwargs
+    )
+
+    if outpath is None:
+        return structure, statistics
+
+    write_pdb(structure, outpath, explicit_bonds=explicit_bonds)
+
+    return None, statistics
+
+
+def generate_ensemble(
+    monomers: Monomers,
+    sequence: Sequence,
+    count: int,
+    outpath: str,
+    explicit_bonds: bool = False,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    multi_model: bool = False,
+    **kwargs,
+) -> List[GrowthStatistics]:
+    """
+    Generates an ensemble of independent conformations of the same sequence, e.g. starting structures for replica simulations.
+    The chains are grown in parallel by a process pool. Every chain gets its own random number generator, which is seeded
+    from `seed` with `np.random.SeedSequence.spawn()`, so that the ensemble does not depend on the number of workers
+    and is reproducible for a given seed.
+
+    Args:
+        - `monomers (Monomers)`: Monomers object.
+        - `sequence (Sequence)`: Sequence object.
+        - `count (int)`: Number of chains.
+        - `outpath (str)`: Path to the output file. Without `multi_model`, the chains are written to numbered files, see `ensemble_paths()`.
+        - `explicit_bonds (bool)`: If True, explicit bonds are generated.
+        - `seed (Optional[int])`: Master seed of the ensemble. Defaults to None, i.e. fresh entropy from the operating system.
+        - `workers (Optional[int])`: Number of worker processes. Defaults to None, i.e. the number of CPUs. With one worker, the chains are grown in this process.
+        - `multi_model (bool)`: If True, all chains are written as models to a single PDB file.
+        - `**kwargs`: Additional arguments of `grow_chain()`, e.g. `trr` or `collision_backend`.
+
+    Returns:
+        - `(List[GrowthStatistics])`: Backtracking counters of the chains.
+    """
+
+    if count < 1:
+        raise ValueError(f"An ensemble needs at least one chain, got count={count}.")
+
+    seeds = np.random.SeedSequence(seed).spawn(count)
+    paths = [None] * count if multi_model else ensemble_paths(outpath, count)
+
+    # the tasks only carry the seed and the path, the shared arguments are passed once per worker
+    setup = (monomers, sequence, explicit_bonds, kwargs)
+
+    if workers == 1:
+        _init_members(*setup)
+        results = map(_build_member, seeds, paths)
+        return _collect(results, outpath, explicit_bonds, multi_model)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_members, initargs=setup
+    ) as executor:
+        results = executor.map(_build_member, seeds, paths)
+        return _collect(results, outpath, explicit_bonds, multi_model)
+
+
+def _collect(
+    results, outpath: str, explicit_bonds: bool, multi_model: bool
+) -> List[GrowthStatistics]:
+    """Collects the statistics of the chains in order and writes the models as they are finished."""
+    statistics = list()
+
+    if not multi_model:
+        for _, member_statistics in results:
+            statistics.append(member_statistics)
+        return statistics
+
+    def structures():
+        for structure, member_statistics in results:
+            statistics.append(member_statistics)
+            yield structure
+
+    write_models(structures(), outpath, explicit_bonds=explicit_bonds)
+
+    return statistics
@@ -0,0 +1,976 @@
+from ..data import BondGraph, Structure
+from ..typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import os
+import numpy as np
+
+# The ATOM records are formatted column-wise into a byte matrix with one row per line. The column
+# layout follows the fixed columns of the PDB format (1-based, inclusive):
+#  1- 6 record name   7-11 serial      13-16 atom name   18-20 residue name   22 chain identifier
+# 23-26 residue seq.  31-38 x          39-46 y           47-54 z              55-60 occupancy
+# 61-66 temp. factor  77-78 element
+_ATOM_RECORD_WIDTH = 80
+
+# serial and residue numbers wrap around if they exceed the width of their columns
+_MAX_SERIAL = 100000
+_MAX_RESIDUE_NUMBER = 10000
+
+# number of lines, which are formatted and written at once
+_CHUNK_SIZE = 65536
+
+# number of bytes, which are read and parsed at once
+_READ_CHUNK_SIZE = 1 << 24
+
+_SPACE = ord(" ")
+_ZERO = ord("0")
+_NEWLINE = ord("\n")
+
+
+def _int_columns(values: np.ndarray, width: int) -> np.ndarray:
+    """Formats integers right-justified into a byte matrix of shape (N, width), like `f"{value:>{width}d}"`."""
+    values = np.asarray(values, dtype=np.int64)
+    negative = values < 0
+    values = np.abs(values)
+
+    columns = np.full((len(values), width), _SPACE, dtype=np.uint8)
+    digits = np.ones(len(values), dtype=np.int64)
+
+    for position in range(width):
+        power = 10**position
+        shown = (values >= power) | (position == 0)
+        digits += shown & (position > 0)
+        columns[:, width - 1 - position] = np.where(
+            shown, _ZERO + (values // power) % 10, _SPACE
+        )
+
+    if np.any(digits + negative > width):
+        raise ValueError(f"Integer values do not fit into a column of width {width}.")
+
+    rows = np.flatnonzero(negative)
+    columns[rows, width - 1 - digits[rows]] = ord("-")
+
+    return columns
+
+
+def _float_columns(values: np.ndarray, width: int, decimals: int) -> np.ndarray:
+    """Formats floats right-justified into a byte matrix of shape (N, width), like `f"{value:>{width}.{decimals}f}"`."""
+    values = np.asarray(values, dtype=float)
+    scaled = values * 10**decimals
+    rounded = np.rint(scaled)
+
+    # ties after scaling are rounded like python, which rounds the exact binary value
+    for row in np.flatnonzero(np.abs(scaled - np.trunc(scaled)) == 0.5):
+        rounded[row] = int(f"{values[row]:.{decimals}f}".replace(".", ""))
+
+    scaled = rounded.astype(np.int64)
+    negative = scaled < 0
+    scaled = np.abs(scaled)
+
+    columns = np.empty((len(scaled), width), dtype=np.uint8)
+
+    # integer part with the sign, the decimal point and the zero padded fractional part
+    integers = np.where(negative, -(scaled // 10**decimals), scaled // 10**decimals)
+    columns[:, : width - decimals - 1] = _int_columns(integers, width - decimals - 1)
+
+    # a sign is lost for values between -1 and 0, since their integer part is 0
+    rows = np.flatnonzero(negative & (scaled < 10**decimals))
+    if len(rows) > 0:
+        if width - decimals - 3 < 0:
+            raise ValueError(f"Float values do not fit into a column of width {width}.")
+        columns[rows, width - decimals - 3] = ord("-")
+
+    columns[:, width - decimals - 1] = ord(".")
+    for position in range(decimals):
+        columns[:, width - 1 - position] = _ZERO + (scaled // 10**position) % 10
+
+    return columns
+
+
+def _str_columns(values: np.ndarray, width: int, right: bool = False) -> np.ndarray:
+    """Formats strings left- or right-justified into a byte matrix of shape (N, width). Longer strings are truncated."""
+    # the code points of the (ASCII) unicode strings are the bytes of the columns
+    values = np.asarray(values).astype(f"U{width}")
+    columns = values.view(np.uint32).reshape(len(values), width).astype(np.uint8)
+
+    if right:
+        # move the characters to the end of the column
+        lengths = np.count_nonzero(columns, axis=1)
+        source = np.arange(width)[None, :] - (width - lengths)[:, None]
+        columns = np.where(
+            source >= 0,
+            np.take_along_axis(columns, np.clip(source, 0, width - 1), axis=1),
+            0,
+        )
+
+    columns[columns == 0] = _SPACE
+
+    return columns
+
+
+def _atom_records(structure: Structure, start: int, stop: int) -> bytes:
+    """Formats the ATOM records of the atoms with indices in [start, stop)."""
+    count = stop - start
+    lines = np.full((count, _ATOM_RECORD_WIDTH + 1), _SPACE, dtype=np.uint8)
+
+    coordinates = structure.coordinates[start:stop]
+
+    lines[:, 0:6] = np.frombuffer(b"ATOM  ", dtype=np.uint8)
+    lines[:, 6:11] = _int_columns(np.arange(start + 1, stop + 1) % _MAX_SERIAL, 5)
+    lines[:, 12:16] = _str_columns(structure.names[start:stop], 4)
+    lines[:, 17:20] = _str_columns(structure.residue_names[start:stop], 3, right=True)
+    lines[:, 21] = ord("A")
+    lines[:, 22:26] = _int_columns(
+        structure.residue_numbers[start:stop] % _MAX_RESIDUE_NUMBER, 4
+    )
+    lines[:, 30:38] = _float_columns(coordinates[:, 0], 8, 3)
+    lines[:, 38:46] = _float_columns(coordinates[:, 1], 8, 3)
+    lines[:, 46:54] = _float_columns(coordinates[:, 2], 8, 3)
+    lines[:, 54:60] = np.frombuffer(b"  1.00", dtype=np.uint8)
+    lines[:, 60:66] = np.frombuffer(b"  0.00", dtype=np.uint8)
+    lines[:, 76:78] = _str_columns(structure.elements[start:stop], 2, right=True)
+    lines[:, _ATOM_RECORD_WIDTH] = ord("\n")
+
+    return lines.tobytes()
+
+
+def _conect_records(bonds: np.ndarray) -> bytes:
+    """Formats CONECT records for bonds given as pairs of serial numbers."""
+    lines = np.full((len(bonds), 17), _SPACE, dtype=np.uint8)
+
+    lines[:, 0:6] = np.frombuffer(b"CONECT", dtype=np.uint8)
+    lines[:, 6:11] = _int_columns(bonds[:, 0] % _MAX_SERIAL, 5)
+    lines[:, 11:16] = _int_columns(bonds[:, 1] % _MAX_SERIAL, 5)
+    lines[:, 16] = ord("\n")
+
+    return lines.tobytes()
+
+
+def _check_coordinates(structure: Structure) -> None:
+    """Raises a ValueError naming the first atom, whose coordinates are not finite or do not fit into the 8 columns of an ATOM record."""
+    coordinates = structure.coordinates
+
+    # only large or invalid values can be too long, their formatting is checked exactly
+    candidates = np.flatnonzero(
+        np.any(~np.isfinite(coordinates) | (np.abs(coordinates) >= 999.999), axis=1)
+    )
+    for index in candidates:
+        for axis, value in zip("xyz", coordinates[index]):
+            if not np.isfinite(value) or len(f"{value:.3f}") > 8:
+                raise ValueError(
+                    f"The {axis} coordinate {value} of atom {index + 1} ({structure.names[index]}) does not fit into the "
+                    "PDB format, which allows coordinates from -999.999 to 9999.999."
+                )
+
+
+def write_pdb(structure: Structure, fpath: str, explicit_bonds: bool = False) -> None:
+    """
+    Writes a structure to a PDB file, including the bonds between linked atoms and optionally the explicit bonds.
+    The periodic cell of a structure is written as CRYST1 record.
+    The records are formatted column-wise for blocks of atoms and written in large blocks. Serial numbers larger
+    than 99999 and residue numbers larger than 9999 wrap around, as they do in GROMACS. The CONECT records are sorted by
+    their first atom, so that `read_pdb()` can resolve the wrapped serial numbers. Coordinates, which do not fit into
+    the columns of the ATOM records, raise a ValueError before the file is written.
+
+    Args:
+        - `structure (Structure)`: Structure to write.
+        - `fpath (str)`: Path to the output file.
+        - `explicit_bonds (bool)`: If True, the explicit bonds are written.
+    """
+    _check_coordinates(structure)
+
+    with open(fpath, "wb") as f:
+        _write_cell(f, structure)
+        _write_atoms(f, structure)
+        _write_bonds(f, structure, explicit_bonds)
+
+    # no need for sorting beacuse the atoms are already sorted ( consecutive numbering) and the bonds are written after all atoms
+    close_PDB(fpath, structure.atom_count)
+
+
+def write_models(
+    structures: Iterable[Structure], fpath: str, explicit_bonds: bool = False
+) -> int:
+    """
+    Writes structures with the same topology, e.g. an ensemble of conformations of one sequence, as MODEL records
+    to a single PDB file. The structures are written as they are consumed, so they can be passed as a generator.
+    The bonds are written once after the last model. The coordinates of each model are checked before it is written.
+
+    Args:
+        - `structures (Iterable[Structure])`: Structures to write.
+        - `fpath (str)`: Path to the output file.
+        - `explicit_bonds (bool)`: If True, the explicit bonds are written.
+
+    Returns:
+        - `(int)`: Number of written models.
+    """
+    structure = None
+    count = 0
+
+    with open(fpath, "wb") as f:
+        for count, model in enumerate(structures, start=1):
+            if structure is not None and model.atom_count != structure.atom_count:
+                raise ValueError(
+                    f"Model {count} has {model.atom_count} atoms, but model 1 has {structure.atom_count} atoms."
+                )
+            _check_coordinates(model)
+            if structure is None:
+                _write_cell(f, model)
+            structure = model
+
+            f.write(f"MODEL     {count:>4}\n".encode())
+            _write_atoms(f, model)
+            f.write(b"ENDMDL\n")
+
+        if structure is not None:
+            _write_bonds(f, structure, explicit_bonds)
+
+    close_PDB(fpath, count * structure.atom_count if structure is not None else 0)
+
+    return count
+
+
+def _write_cell(f, structure: Structure) -> None:
+    """Writes the CRYST1 record of the periodic simulation cell of a structure to a binary file, if it has one."""
+    if structure.box is None:
+        return
+
+    a, b, c = structure.box
+    f.write(
+        f"CRYST1{a:9.3f}{b:9.3f}{c:9.3f}{90:7.2f}{90:7.2f}{90:7.2f} P 1           1\n".encode()
+    )
+
+
+def _write_atoms(f, structure: Structure) -> None:
+    """Writes the ATOM records of a structure in chunks to a binary file."""
+    for start in range(0, structure.atom_count, _CHUNK_SIZE):
+        stop = min(start + _CHUNK_SIZE, structure.atom_count)
+        f.write(_atom_records(structure, start, stop))
+
+
+def _write_bonds(f, structure: Structure, explicit_bonds: bool) -> None:
+    """
+    Writes the CONECT records of the links and optionally the explicit bonds of a structure to a binary file. The records
+    are sorted by their first atom, which is the lower one, so that wrapped serial numbers can be resolved by their order.
+    """
+    bonds = structure.links + 1
+    if explicit_bonds:
+        bonds = np.concatenate((structure.bonds + 1, bonds))
+
+    bonds = np.sort(bonds.reshape(-1, 2), axis=1)
+    bonds = bonds[np.lexsort((bonds[:, 1], bonds[:, 0]))]
+
+    for start in range(0, len(bonds), _CHUNK_SIZE):
+        f.write(_conect_records(bonds[start : start + _CHUNK_SIZE]))
+
+
+def close_PDB(fpath: str, atom_count: int):
+    """
+    Closes a PDB file by adding the END statement and the number of atoms.
+
+    Args:
+        - `file_path (str)`: Path to the file.
+        - `atom_count (int)`: Number of atoms.
+
+    """
+
+    with open(fpath, "a") as file:
+        file.write(
+            "MASTER    {:>5}{:>5}{:>5}{:>5}{:>5}{:>5}{:>5}{:>5}{:>5}{:>5}{:>5}{:>5}\n".format(
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                0,
+                atom_count % _MAX_SERIAL,
+                0,
+                atom_count % _MAX_SERIAL,
+                0,
+            )
+        )
+        file.write("END")
+
+
+class PDBAtoms(NamedTuple):
+    """Columns of the ATOM and HETATM records of a PDB file."""
+
+    serials: np.ndarray
+    """Serial numbers, shape (N,)."""
+    names: np.ndarray
+    """Atom names, shape (N,)."""
+    residue_names: np.ndarray
+    """Residue names, shape (N,)."""
+    chains: np.ndarray
+    """Chain identifiers, shape (N,)."""
+    residue_numbers: np.ndarray
+    """Residue sequence numbers as written in the file, shape (N,)."""
+    coordinates: np.ndarray
+    """Coordinates, shape (N,3)."""
+    elements: np.ndarray
+    """Elements, the first letter of the atom name if the element column is empty, shape (N,)."""
+
+
+def _byte_blocks(fpath: str, chunk_size: int, memory_map: bool) -> Iterable[np.ndarray]:
+    """Yields the bytes of a file in blocks of at most `chunk_size` bytes, read or memory-mapped."""
+    if memory_map:
+        if os.path.getsize(fpath) == 0:
+            return
+        data = np.memmap(fpath, dtype=np.uint8, mode="r")
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+    else:
+        with open(fpath, "rb") as f:
+            while block := f.read(chunk_size):
+                yield np.frombuffer(block, dtype=np.uint8)
+
+
+def _line_blocks(
+    fpath: str, chunk_size: int, memory_map: bool
+) -> Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Yields blocks of whole lines of a file as the bytes of the block and the start and length of every line,
+    without the line breaks.
+    """
+    rest = np.empty(0, dtype=np.uint8)
+
+    for block in _byte_blocks(fpath, chunk_size, memory_map):
+        newlines = np.flatnonzero(block == _NEWLINE)
+        if len(newlines) == 0:
+            rest = np.concatenate((rest, block))
+            continue
+
+        buffer = np.concatenate((rest, block[: newlines[-1] + 1]))
+        rest = np.array(block[newlines[-1] + 1 :])
+        ends = newlines + len(buffer) - newlines[-1] - 1
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        yield buffer, starts, ends - starts
+
+    if len(rest) > 0:
+        yield rest, np.zeros(1, dtype=np.int64), np.array([len(rest)])
+
+
+def _columns(
+    buffer: np.ndarray, starts: np.ndarray, lengths: np.ndarray, first: int, last: int
+) -> np.ndarray:
+    """
+    Cuts the fixed columns [first, last) of lines into a byte matrix of shape (N, last - first). Columns beyond the end of
+    a line and carriage returns are filled with spaces.
+    """
+    columns = np.full((len(starts), last - first), _SPACE, dtype=np.uint8)
+
+    # adjacent lines of equal length, e.g. the ATOM records of a chain, are a strided view of the buffer
+    adjacent = (starts[1:] == starts[:-1] + lengths[:-1] + 1) & (
+        lengths[1:] == lengths[:-1]
+    )
+    bounds = np.concatenate(([0], np.flatnonzero(~adjacent) + 1, [len(starts)]))
+
+    if 64 * (len(bounds) - 1) <= len(starts):
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            width = min(lengths[start], last) - first
+            if width > 0:
+                columns[start:stop, :width] = np.lib.stride_tricks.as_strided(
+                    buffer[starts[start] + first :],
+                    shape=(stop - start, width),
+                    strides=(lengths[start] + 1, 1),
+                    writeable=False,
+                )
+    else:
+        offsets = np.arange(first, last)
+        # blocks of rows keep the index matrix small
+        for row in range(0, len(starts), _CHUNK_SIZE):
+            rows = slice(row, row + _CHUNK_SIZE)
+            indices = np.minimum(starts[rows, None] + offsets, len(buffer) - 1)
+            columns[rows] = np.where(
+                offsets < lengths[rows, None], buffer[indices], _SPACE
+            )
+
+    columns[columns == ord("\r")] = _SPACE
+
+    return columns
+
+
+# classes of the bytes of a decimal number, other bytes are invalid
+_NO_NUMBER, _NUMBER_SIGN, _DIGIT = 0, 1, 2
+_NUMBER_BYTES = np.zeros(256, dtype=np.uint8)
+_NUMBER_BYTES[[_SPACE, ord("."), ord("-"), ord("+")]] = _NUMBER_SIGN
+_NUMBER_BYTES[_ZERO : _ZERO + 10] = _DIGIT
+
+
+def _invalid_numbers(columns: np.ndarray) -> np.ndarray:
+    """Returns which rows of a byte matrix of shape (N, width) are no decimal numbers, e.g. blanks or letters."""
+    return _invalid_codes(np.ascontiguousarray(columns.T))
+
+
+def _invalid_codes(codes: np.ndarray) -> np.ndarray:
+    """Like `_invalid_numbers()` for the transposed byte matrix of shape (width, N), whose columns are contiguous."""
+    digits = np.zeros(codes.shape[1], dtype=bool)
+    invalid = np.zeros(codes.shape[1], dtype=bool)
+
+    for classes in _NUMBER_BYTES[codes]:
+        digits |= classes == _DIGIT
+        invalid |= classes == _NO_NUMBER
+
+    return invalid | ~digits
+
+
+def _parse_digits(columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses the decimal numbers of a byte matrix of shape (N, width) into their digits as integers and their numbers of
+    decimals, e.g. `-12.345` into `-12345` and `3`. Integers are exact and the division by the power of ten is correctly
+    rounded, like `float()`.
+    """
+    codes = np.ascontiguousarray(columns.T)
+    is_digit = _NUMBER_BYTES[codes] == _DIGIT
+
+    invalid = _invalid_codes(codes)
+    if np.any(invalid):
+        value = columns[np.argmax(invalid)].tobytes().decode(errors="replace")
+        raise ValueError(f"Invalid number '{value}' in a fixed column of a PDB record.")
+
+    values = np.zeros(len(columns), dtype=np.int64)
+    decimals = np.zeros(len(columns), dtype=np.int64)
+    point = np.zeros(len(columns), dtype=bool)
+
+    for code, digit in zip(codes, is_digit):
+        values = np.where(digit, 10 * values + (code - _ZERO), values)
+        decimals += digit & point
+        point |= code == ord(".")
+
+    negative = np.any(codes == ord("-"), axis=0)
+
+    return np.where(negative, -values, values), decimals
+
+
+def _parse_ints(columns: np.ndarray) -> np.ndarray:
+    """Parses the right-justified integers of a byte matrix of shape (N, width)."""
+    return _parse_digits(columns)[0]
+
+
+def _parse_floats(columns: np.ndarray) -> np.ndarray:
+    """Parses the floats of a byte matrix of shape (N, width)."""
+    values, decimals = _parse_digits(columns)
+    return values / 10.0**decimals
+
+
+def _parse_strings(columns: np.ndarray) -> np.ndarray:
+    """Parses the strings of a byte matrix of shape (N, width) without surrounding spaces."""
+    width = columns.shape[1]
+    values = np.ascontiguousarray(columns).view(f"S{width}").ravel()
+    return np.char.strip(values).astype(str)
+
+
+def _parse_atoms(records: np.ndarray) -> PDBAtoms:
+    """Parses the columns of ATOM and HETATM records given as byte matrix of shape (N, 80)."""
+    names = _parse_strings(records[:, 12:16])
+    elements = _parse_strings(records[:, 76:78])
+    missing = elements == ""
+    elements[missing] = names[missing].astype("U1")
+
+    return PDBAtoms(
+        serials=_parse_ints(records[:, 6:11]),
+        names=names,
+        residue_names=_parse_strings(records[:, 17:20]),
+        chains=_parse_strings(records[:, 21:22]),
+        residue_numbers=_parse_ints(records[:, 22:26]),
+        coordinates=np.stack(
+            [_parse_floats(records[:, start : start + 8]) for start in (30, 38, 46)],
+            axis=1,
+        ).reshape(-1, 3),
+        elements=elements,
+    )
+
+
+def _parse_conect(records: np.ndarray) -> np.ndarray:
+    """Parses CONECT records given as byte matrix of shape (N, 31) into bonds between serial numbers."""
+    fields = np.array(records[:, 6:31]).reshape(-1, 5, 5)
+    present = np.any(fields != _SPACE, axis=2)
+    fields[~present] = _ZERO
+    serials = _parse_ints(fields.reshape(-1, 5)).reshape(-1, 5)
+
+    # every bonded atom of a record forms a pair with the first atom
+    rows, columns = np.nonzero(present[:, 1:])
+    return np.stack((serials[rows, 0], serials[rows, columns + 1]), axis=1)
+
+
+def _read_records(
+    fpath: str, chunk_size: int, memory_map: bool
+) -> Tuple[PDBAtoms, np.ndarray, Optional[np.ndarray]]:
+    """Reads the atoms of the first model, the bonds between serial numbers of the CONECT records and the cell of a PDB file."""
+    records = {
+        name: np.frombuffer(name, dtype=np.uint8)
+        for name in (b"ATOM  ", b"HETATM", b"CONECT", b"CRYST1", b"ENDMDL")
+    }
+    atom_blocks, conect_blocks = list(), list()
+    box = None
+    in_model = True
+
+    for buffer, starts, lengths in _line_blocks(fpath, chunk_size, memory_map):
+        names = _columns(buffer, starts, lengths, 0, 6)
+        is_record = {
+            name: np.all(names == record, axis=1) for name, record in records.items()
+        }
+
+        if in_model:
+            atoms = is_record[b"ATOM  "] | is_record[b"HETATM"]
+            ends = np.flatnonzero(is_record[b"ENDMDL"])
+            if len(ends) > 0:
+                atoms[ends[0] :] = False
+                in_model = False
+            if np.any(atoms):
+                atom_blocks.append(
+                    _parse_atoms(_columns(buffer, starts[atoms], lengths[atoms], 0, 80))
+                )
+
+        conect = is_record[b"CONECT"]
+        if np.any(conect):
+            conect_blocks.append(
+                _parse_conect(_columns(buffer, starts[conect], lengths[conect], 0, 31))
+            )
+
+        cells = np.flatnonzero(is_record[b"CRYST1"])
+        if box is None and len(cells) > 0:
+            cell = _columns(buffer, starts[cells[:1]], lengths[cells[:1]], 0, 33)
+            box = np.concatenate(
+                [_parse_floats(cell[:, start : start + 9]) for start in (6, 15, 24)]
+            )
+
+    if len(atom_blocks) > 0:
+        atoms = PDBAtoms(*(np.concatenate(values) for values in zip(*atom_blocks)))
+    else:
+        atoms = PDBAtoms(
+            serials=np.empty(0, dtype=np.int64),
+            names=np.empty(0, dtype=str),
+            residue_names=np.empty(0, dtype=str),
+            chains=np.empty(0, dtype=str),
+            residue_numbers=np.empty(0, dtype=np.int64),
+            coordinates=np.empty((0, 3)),
+            elements=np.empty(0, dtype=str),
+        )
+
+    conect = np.concatenate(conect_blocks) if conect_blocks else np.empty((0, 2))
+
+    return atoms, conect.astype(np.int64).reshape(-1, 2), box
+
+
+def read_pdb_atoms(
+    fpath: str, chunk_size: int = _READ_CHUNK_SIZE, memory_map: bool = False
+) -> PDBAtoms:
+    """
+    Reads the ATOM and HETATM records of the first model of a PDB file into arrays. The file is read in blocks of
+    `chunk_size` bytes, every block is cut into its fixed columns at once and the columns are parsed in bulk. Columns
+    may touch, e.g. negative coordinates or five digit serial numbers.
+
+    Args:
+        - `fpath (str)`: Path to the PDB file.
+        - `chunk_size (int)`: Number of bytes, which are read and parsed at once.
+        - `memory_map (bool)`: If True, the file is memory-mapped instead of read.
+
+    Returns:
+        - `(PDBAtoms)`: Columns of the atoms.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"The chunk size has to be positive, got {chunk_size}.")
+
+    return _read_records(fpath, chunk_size, memory_map)[0]
+
+
+def read_pdb(
+    fpath: str, chunk_size: int = _READ_CHUNK_SIZE, memory_map: bool = False
+) -> Structure:
+    """
+    Reads the ATOM and HETATM records, the CONECT records and the periodic cell of the first model of a PDB file into a
+    structure. The records are read from their fixed columns, see `read_pdb_atoms()`. The residues are numbered consecutively
+    from 1 in the order of the atoms, a new residue starts when the residue name, the residue number or the chain identifier
+    changes. All bonds of the CONECT records are stored as explicit bonds. Serial numbers, which wrap around after
+    99999, are resolved by the order of the records, like `write_pdb()` writes them.
+
+    Args:
+        - `fpath (str)`: Path to the PDB file.
+        - `chunk_size (int)`: Number of bytes, which are read and parsed at once.
+        - `memory_map (bool)`: If True, the file is memory-mapped instead of read.
+
+    Returns:
+        - `structure (Structure)`: Structure of the atoms in the file.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"The chunk size has to be positive, got {chunk_size}.")
+
+    atoms, conect, box = _read_records(fpath, chunk_size, memory_map)
+
+    # a new residue starts, when the residue name, chain identifier or number differ from the previous atom
+    new_residue = np.ones(len(atoms.serials), dtype=np.int64)
+    new_residue[1:] = (
+        (atoms.residue_names[1:] != atoms.residue_names[:-1])
+        | (atoms.chains[1:] != atoms.chains[:-1])
+        | (atoms.residue_numbers[1:] != atoms.residue_numbers[:-1])
+    )
+
+    return Structure(
+        coordinates=atoms.coordinates,
+        names=atoms.names,
+        elements=atoms.elements,
+        residue_names=atoms.residue_names,
+        residue_numbers=np.cumsum(new_residue),
+        bonds=_resolve_serials(atoms.serials, conect).edges,
+        links=np.empty((0, 2), dtype=np.int64),
+        box=box,
+    )
+
+
+def read_bond_graph(
+    fpath: str, chunk_size: int = _READ_CHUNK_SIZE, memory_map: bool = False
+) -> BondGraph:
+    """
+    Reads the bonds of the CONECT records of a PDB file into a bond graph of the atoms of the first model, in the same
+    pass as the atoms. A CONECT record may list up to four bonded atoms, bonds listed twice or in both directions
+    are stored once.
+
+    Args:
+        - `fpath (str)`: Path to the PDB file.
+        - `chunk_size (int)`: Number of bytes, which are read and parsed at once.
+        - `memory_map (bool)`: If True, the file is memory-mapped instead of read.
+
+    Returns:
+        - `(BondGraph)`: Bond graph of the atom indices, i.e. the order of the atoms in the file.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"The chunk size has to be positive, got {chunk_size}.")
+
+    atoms, conect, _ = _read_records(fpath, chunk_size, memory_map)
+
+    return _resolve_serials(atoms.serials, conect)
+
+
+def read_conect(
+    fpath: str, chunk_size: int = _READ_CHUNK_SIZE, memory_map: bool = False
+) -> np.ndarray:
+    """
+    Reads the unique bonds of the CONECT records of a PDB file as pairs of serial numbers, as they are written in the
+    file. The bonds are resolved like in `read_bond_graph()` and sorted by their atom indices, the lower one first.
+
+    Args:
+        - `fpath (str)`: Path to the PDB file.
+        - `chunk_size (int)`: Number of bytes, which are read and parsed at once.
+        - `memory_map (bool)`: If True, the file is memory-mapped instead of read.
+
+    Returns:
+        - `(np.ndarray)`: Bonds as pairs of serial numbers, shape (M,2).
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"The chunk size has to be positive, got {chunk_size}.")
+
+    atoms, conect, _ = _read_records(fpath, chunk_size, memory_map)
+
+    return atoms.serials[_resolve_serials(atoms.serials, conect).edges].reshape(-1, 2)
+
+
+def _resolve_serials(serials: np.ndarray, pairs: np.ndarray) -> BondGraph:
+    """
+    Converts bonds between serial numbers into the bond graph of the atom indices. Serial numbers, which wrap around after
+    99999 like in `write_pdb()`, are resolved by the order of the records: the atoms are unwrapped in the order of the
+    ATOM records, the first atoms of the CONECT records in the order of the records, which have to be sorted by their
+    first atom, and every bonded atom is the nearest unwrapped atom to the first atom.
+    """
+    order = np.argsort(serials, kind="stable")
+    ordered = serials[order]
+
+    if len(pairs) > 0 and np.any(ordered[1:] == ordered[:-1]):
+        serials = _unwrap_serials(serials)
+        if np.any(np.diff(serials) <= 0):
+            raise ValueError(
+                "The CONECT records cannot be assigned, since the serial numbers of the atoms are not unique."
+            )
+        order, ordered = np.arange(len(serials)), serials
+
+        firsts = _unwrap_serials(pairs[:, 0])
+        turns = np.round((firsts - pairs[:, 1]) / _MAX_SERIAL).astype(np.int64)
+        pairs = np.stack((firsts, pairs[:, 1] + _MAX_SERIAL * turns), axis=1)
+
+    positions = np.searchsorted(ordered, pairs)
+    known = positions < len(ordered)
+    known[known] = ordered[positions[known]] == pairs[known]
+
+    if not np.all(known):
+        raise ValueError(
+            f"CONECT record refers to the unknown atom serial {pairs[~known][0] % _MAX_SERIAL}."
+        )
+
+    return BondGraph.from_edges(order[positions], len(serials))
+
+
+def _unwrap_serials(serials: np.ndarray) -> np.ndarray:
+    """Unwraps serial numbers, which wrap around after 99999, every decrease starts a new turn."""
+    turns = np.zeros(len(serials), dtype=np.int64)
+    turns[1:] = np.cumsum(serials[1:] < serials[:-1])
+    return serials + _MAX_SERIAL * turns
+
+
+class PDBError(NamedTuple):
+    """Error of a PDB file found by `validate_pdb()`."""
+
+    line: int
+    """Line number starting at 1, 0 for errors of the whole file."""
+    record: str
+    """Name of the record, e.g. ATOM or CONECT."""
+    message: str
+    """Description of the error."""
+
+
+def _report(
+    errors: List[PDBError],
+    lines: np.ndarray,
+    names: np.ndarray,
+    message: str,
+    *values: np.ndarray,
+) -> None:
+    """Appends an error for every line, the message is formatted with the values of the line."""
+    for line, name, *line_values in zip(
+        lines.tolist(), names.tolist(), *(value.tolist() for value in values)
+    ):
+        errors.append(
+            PDBError(
+                line,
+                name.decode(errors="replace").strip(),
+                message.format(*line_values),
+            )
+        )
+
+
+def _conect_fields(
+    buffer: np.ndarray, starts: np.ndarray, lengths: np.ndarray, first: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Parses the five serial numbers of CONECT records from the columns [first, first + 25) into an array of shape (N,5),
+    with a mask of the present numbers and a mask of the records with an invalid number.
+    """
+    fields = np.array(_columns(buffer, starts, lengths, first, first + 25))
+    fields = fields.reshape(-1, 5, 5)
+    present = np.any(fields != _SPACE, axis=2)
+    invalid = present & _invalid_numbers(fields.reshape(-1, 5)).reshape(-1, 5)
+    wrong = np.any(invalid, axis=1)
+
+    fields[~present | wrong[:, None]] = _ZERO
+    serials = _parse_ints(fields.reshape(-1, 5)).reshape(-1, 5)
+
+    return serials, present & ~wrong[:, None], wrong
+
+
+def validate_pdb(
+    fpath: str, chunk_size: int = _READ_CHUNK_SIZE, memory_map: bool = False
+) -> List[PDBError]:
+    """
+    Validates a PDB file in a single pass over its lines, without any external tools or network access. No record may be
+    wider than 80 columns, ATOM and HETATM records have to reach the coordinates and CONECT records have to list at least
+    one bonded atom. The serial numbers and coordinates have to be numbers. The serial numbers of the atoms have to
+    increase by one within every model and wrap around after 99999, like `write_pdb()` writes them. All atoms of the
+    CONECT records have to exist. The atom count of the MASTER record, see `close_PDB()`, has to match the number of ATOM
+    and HETATM records and the last record has to be END.
+
+    Files of former versions of `write_pdb()` left-justify the serial numbers one column to the right and separate the
+    MASTER fields only by whitespace. The serial numbers, the bonded atoms and the atom count are also read in this layout
+    and only reported, if neither layout is valid.
+
+    Args:
+        - `fpath (str)`: Path to the PDB file.
+        - `chunk_size (int)`: Number of bytes, which are read and checked at once.
+        - `memory_map (bool)`: If True, the file is memory-mapped instead of read.
+
+    Returns:
+        - `(List[PDBError])`: Errors sorted by line number, empty for a valid file.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"The chunk size has to be positive, got {chunk_size}.")
+
+    errors: List[PDBError] = list()
+    atom_serials, conect_lines = list(), list()
+    # serial numbers, present numbers and invalid records of the CONECT records in the fixed and the former layout
+    conect_fields: List[Tuple[np.ndarray, ...]] = list()
+    masters: List[Tuple[int, List[int]]] = list()
+    atom_count = 0
+
+    # the last serial number and its model, which are carried over to the next block of lines
+    previous, previous_model = -1, -1
+    model = 0
+    line_count = 0
+    last_record, last_line = b"", 0
+
+    for buffer, starts, lengths in _line_blocks(fpath, chunk_size, memory_map):
+        lines = line_count + np.arange(1, len(starts) + 1)
+        line_count += len(starts)
+
+        names = np.ascontiguousarray(_columns(buffer, starts, lengths, 0, 6))
+        names = names.view("S6").ravel()
+
+        # a carriage return is not a column
+        widths = lengths.copy()
+        filled = lengths > 0
+        widths[filled] -= buffer[starts[filled] + lengths[filled] - 1] == ord("\r")
+
+        def report(rows: np.ndarray, message: str, *values: np.ndarray) -> None:
+            _report(errors, lines[rows], names[rows], message, *values)
+
+        too_wide = np.flatnonzero(widths > _ATOM_RECORD_WIDTH)
+        report(
+            too_wide, "Record has {} columns, at most 80 are allowed.", widths[too_wide]
+        )
+
+        atoms = (names == b"ATOM  ") | (names == b"HETATM")
+        atom_count += int(np.count_nonzero(atoms))
+        short = np.flatnonzero(atoms & (widths < 54))
+        report(short, "Record has {} columns, the coordinates need 54.", widths[short])
+
+        # serial numbers of the atoms and of TER records
+        serials = np.full(len(starts), -1, dtype=np.int64)
+
+        rows = np.flatnonzero(atoms & (widths >= 11))
+        columns = _columns(buffer, starts[rows], lengths[rows], 6, 11)
+        invalid = _invalid_numbers(columns)
+        # the former layout left-justifies the serial numbers in the columns 8 to 12, which only differs for 5 digits
+        shifted = _columns(buffer, starts[rows], lengths[rows], 6, 12)
+        shifted_invalid = _invalid_numbers(shifted)
+        report(
+            rows[invalid & shifted_invalid],
+            "Invalid serial number '{}'.",
+            _parse_strings(columns[invalid & shifted_invalid]),
+        )
+        serials[rows[~invalid]] = _parse_ints(columns[~invalid])
+        serials[rows[~shifted_invalid]] = _parse_ints(shifted[~shifted_invalid])
+        atom_serials.append(serials[rows[~(invalid & shifted_invalid)]])
+
+        rows = np.flatnonzero(atoms & (widths >= 54))
+        columns = _columns(buffer, starts[rows], lengths[rows], 30, 54)
+        for start in range(0, 24, 8):
+            invalid = _invalid_numbers(columns[:, start : start + 8])
+            report(
+                rows[invalid],
+                "Invalid coordinate '{}'.",
+                _parse_strings(columns[invalid, start : start + 8]),
+            )
+
+        rows = np.flatnonzero((names == b"TER   ") & (widths >= 11))
+        columns = _columns(buffer, starts[rows], lengths[rows], 6, 11)
+        numbered = np.any(columns != _SPACE, axis=1) & ~_invalid_numbers(columns)
+        serials[rows[numbered]] = _parse_ints(columns[numbered])
+
+        # the serial numbers restart in every model
+        models = model + np.cumsum(names == b"MODEL ")
+        model = int(models[-1])
+
+        rows = np.flatnonzero(serials >= 0)
+        if len(rows) > 0:
+            current, current_models = serials[rows], models[rows]
+            before = np.concatenate(([previous], current[:-1]))
+            before_models = np.concatenate(([previous_model], current_models[:-1]))
+            broken = (current_models == before_models) & (
+                current != (before + 1) % _MAX_SERIAL
+            )
+            report(
+                rows[broken],
+                "Serial number {} does not follow {}.",
+                current[broken],
+                before[broken],
+            )
+            previous, previous_model = int(current[-1]), int(current_models[-1])
+
+        conect = names == b"CONECT"
+        short = np.flatnonzero(conect & (widths < 16))
+        report(short, "Record has {} columns, a bonded atom needs 16.", widths[short])
+
+        rows = np.flatnonzero(conect & (widths >= 16))
+        conect_lines.append(lines[rows])
+        conect_fields.append(
+            _conect_fields(buffer, starts[rows], lengths[rows], 6)
+            + _conect_fields(buffer, starts[rows], lengths[rows], 7)
+        )
+
+        rows = np.flatnonzero(names == b"MASTER")
+        columns = _columns(buffer, starts[rows], lengths[rows], 50, 55)
+        invalid = (widths[rows] < 55) | _invalid_numbers(columns)
+        counts = np.full(len(rows), -1, dtype=np.int64)
+        counts[~invalid] = _parse_ints(columns[~invalid])
+
+        # the atom count is the ninth number of the record, also in the former layout
+        for row, count, column in zip(rows.tolist(), counts.tolist(), columns):
+            fields = bytes(buffer[starts[row] : starts[row] + lengths[row]]).split()
+            shifted = int(fields[9]) if len(fields) > 9 and fields[9].isdigit() else -1
+            if count >= 0 or shifted >= 0:
+                masters.append((int(lines[row]), [count, shifted]))
+            elif widths[row] < 55:
+                report(
+                    np.array([row]),
+                    "Record has {} columns, the atom count needs 55.",
+                    widths[[row]],
+                )
+            else:
+                report(
+                    np.array([row]),
+                    "Invalid atom count '{}'.",
+                    _parse_strings(column[None]),
+                )
+
+        records = np.flatnonzero(widths > 0)
+        if len(records) > 0:
+            last_record, last_line = names[records[-1]], int(lines[records[-1]])
+
+    known = np.concatenate(atom_serials) if atom_serials else np.empty(0, np.int64)
+    if conect_fields:
+        lines = np.concatenate(conect_lines)
+        serials, present, wrong, shifted, shifted_present, shifted_wrong = (
+            np.concatenate(values) for values in zip(*conect_fields)
+        )
+        unknown = present & ~np.isin(serials, known)
+        shifted_unknown = shifted_present & ~np.isin(shifted, known)
+
+        # a record, which is valid in the former layout, is no error
+        former = ~shifted_wrong & ~np.any(shifted_unknown, axis=1)
+        wrong &= ~former
+        unknown &= ~former[:, None]
+
+        # the unknown atoms of a record are reported in the layout, which matches more of its atoms
+        closer = (wrong & ~shifted_wrong) | (
+            ~shifted_wrong & (np.sum(shifted_unknown, axis=1) < np.sum(unknown, axis=1))
+        )
+        wrong &= ~closer
+        unknown[closer] = shifted_unknown[closer]
+        serials[closer] = shifted[closer]
+
+        for line in lines[wrong].tolist():
+            errors.append(
+                PDBError(
+                    line, "CONECT", "Invalid atom serial number in the bonded atoms."
+                )
+            )
+        rows, columns = np.nonzero(unknown)
+        for line, serial in sorted(
+            set(zip(lines[rows].tolist(), serials[rows, columns].tolist()))
+        ):
+            errors.append(
+                PDBError(
+                    line,
+                    "CONECT",
+                    f"Bonded atom with serial number {serial} does not exist.",
+                )
+            )
+
+    if len(masters) == 0:
+        errors.append(PDBError(0, "MASTER", "The MASTER record is missing."))
+    for line, counts in masters:
+        # the former layout does not wrap the atom count
+        if not {atom_count % _MAX_SERIAL, atom_count} & set(counts):
+            count = counts[0] if counts[0] >= 0 else counts[1]
+            errors.append(
+                PDBError(
+                    line,
+                    "MASTER",
+                    f"Atom count {count} does not match the {atom_count} ATOM and HETATM records.",
+                )
+            )
+
+    if last_record.strip() != b"END":
+        errors.append(
+            PDBError(last_line, "END", "The last record of the file is not END.")
+        )
+
+    return sorted(errors)
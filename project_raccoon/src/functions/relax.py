@@ -0,0 +1,309 @@
+from ..data import Structure
+from ..typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from scipy.spatial import cKDTree
+
+
+class RelaxationStatistics(NamedTuple):
+    """Result of the soft-clash relaxation of a structure."""
+
+    steps: int
+    """Number of minimization steps."""
+    energy: float
+    """Final energy of the soft repulsion and the bond restraints."""
+    min_distance: float
+    """Final minimal distance between non-bonded atoms of different residues."""
+    max_deviation: float
+    """Final maximal deviation of the bonds and compression of the 1-3 pairs between different residues from their initial length."""
+
+
+def rotation_matrices(vectors: np.ndarray) -> np.ndarray:
+    """
+    Converts rotation vectors (axis times angle) into rotation matrices with the Rodrigues formula.
+
+    Args:
+        - `vectors (np.ndarray)`: Rotation vectors of shape (N,3).
+
+    Returns:
+        - `(np.ndarray)`: Rotation matrices of shape (N,3,3).
+    """
+    vectors = np.asarray(vectors, dtype=float).reshape(-1, 3)
+    angles = np.linalg.norm(vectors, axis=1)
+    axes = vectors / np.where(angles > 0, angles, 1)[:, None]
+
+    cross = np.zeros((len(vectors), 3, 3))
+    cross[:, 0, 1], cross[:, 0, 2] = -axes[:, 2], axes[:, 1]
+    cross[:, 1, 0], cross[:, 1, 2] = axes[:, 2], -axes[:, 0]
+    cross[:, 2, 0], cross[:, 2, 1] = -axes[:, 1], axes[:, 0]
+
+    sin = np.sin(angles)[:, None, None]
+    cos = np.cos(angles)[:, None, None]
+
+    return np.eye(3) + sin * cross + (1 - cos) * (cross @ cross)
+
+
+class _SoftClashPotential:
+    """
+    Soft repulsion `(distance - r)**2` between atoms of different residues closer than `distance`. Atoms separated by one or two
+    bonds are excluded from the repulsion. Across residues, the bonds (links and explicit bonds) are restrained harmonically by
+    `strength * (r - r0)**2` to their initial length `r0`, and 1-3 pairs are kept from getting closer than their initial distance.
+    The repulsive pairs are taken from a Verlet list, which is rebuilt with a KD-tree if an atom moved by more than half of the skin.
+    """
+
+    def __init__(
+        self, structure: Structure, distance: float, skin: float, strength: float
+    ):
+        self.distance = distance
+        self.skin = skin
+        self.strength = strength
+        self.box = structure.box
+
+        self.residues = np.unique(structure.residue_numbers, return_inverse=True)[1]
+
+        # 1-2 and 1-3 pairs are excluded from the repulsion, they are encoded as i * N + j with i < j
+        excluded = structure.exclusions()
+        self._atom_count = structure.atom_count
+        self._excluded = excluded[:, 0] * self._atom_count + excluded[:, 1]
+
+        edges = structure.bond_graph().edges
+        bonded = np.zeros(len(excluded), dtype=bool)
+        bonded[
+            np.searchsorted(
+                self._excluded, edges[:, 0] * self._atom_count + edges[:, 1]
+            )
+        ] = True
+
+        # within the rigid residues these distances are kept anyway, across residues they are restrained
+        different = self.residues[excluded[:, 0]] != self.residues[excluded[:, 1]]
+        self.restraints = excluded[different]
+        self.bonded = bonded[different]
+        self.restraint_lengths = np.linalg.norm(
+            self._deltas(structure.coordinates, self.restraints), axis=1
+        )
+
+        self._pairs = None
+        self._reference = None
+
+    def _deltas(self, coordinates: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+        """Distance vectors of atom pairs, with the minimum image convention in a periodic cell."""
+        deltas = coordinates[pairs[:, 0]] - coordinates[pairs[:, 1]]
+        if self.box is not None:
+            deltas -= self.box * np.round(deltas / self.box)
+        return deltas
+
+    def _update_pairs(self, coordinates: np.ndarray) -> None:
+        """Rebuilds the Verlet list, if an atom moved by more than half of the skin since the last build."""
+        if self._pairs is not None:
+            moved = np.max(np.linalg.norm(coordinates - self._reference, axis=1))
+            if moved <= 0.5 * self.skin:
+                return
+
+        if self.box is None:
+            tree = cKDTree(coordinates)
+        else:
+            tree = cKDTree(coordinates % self.box, boxsize=self.box)
+
+        pairs = tree.query_pairs(self.distance + self.skin, output_type="ndarray")
+        pairs = pairs[self.residues[pairs[:, 0]] != self.residues[pairs[:, 1]]]
+        pairs = np.sort(pairs, axis=1)
+        keys = pairs[:, 0] * self._atom_count + pairs[:, 1]
+
+        self._pairs = pairs[~np.isin(keys, self._excluded)]
+        self._reference = coordinates.copy()
+
+    def min_distance(self, coordinates: np.ndarray) -> float:
+        """Minimal distance between the atom pairs of the repulsion, infinite beyond the Verlet list."""
+        self._update_pairs(coordinates)
+
+        if len(self._pairs) == 0:
+            return np.inf
+
+        return float(
+            np.min(np.linalg.norm(self._deltas(coordinates, self._pairs), axis=1))
+        )
+
+    def _stretches(
+        self, coordinates: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Distance vectors, lengths and deviations of the restrained pairs, 1-3 pairs only deviate if they are compressed."""
+        deltas = self._deltas(coordinates, self.restraints)
+        lengths = np.linalg.norm(deltas, axis=1)
+        stretches = lengths - self.restraint_lengths
+        stretches = np.where(self.bonded, stretches, np.minimum(stretches, 0))
+        return deltas, lengths, stretches
+
+    def max_deviation(self, coordinates: np.ndarray) -> float:
+        """Maximal deviation of the restrained distances from their initial length."""
+        return float(np.max(np.abs(self._stretches(coordinates)[2]), initial=0))
+
+    def __call__(self, coordinates: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Returns the energy and the forces of shape (N,3) on the atoms."""
+        self._update_pairs(coordinates)
+        forces = np.zeros_like(coordinates)
+
+        deltas = self._deltas(coordinates, self._pairs)
+        lengths = np.linalg.norm(deltas, axis=1)
+        close = lengths < self.distance
+        deltas, lengths, pairs = deltas[close], lengths[close], self._pairs[close]
+
+        overlaps = self.distance - lengths
+        energy = np.sum(overlaps**2)
+        pair_forces = (2 * overlaps / np.maximum(lengths, 1e-12))[:, None] * deltas
+        _accumulate(forces, pairs, pair_forces)
+
+        if len(self.restraints) > 0:
+            deltas, lengths, stretches = self._stretches(coordinates)
+            energy += self.strength * np.sum(stretches**2)
+            pair_forces = (-2 * self.strength * stretches / np.maximum(lengths, 1e-12))[
+                :, None
+            ] * deltas
+            _accumulate(forces, self.restraints, pair_forces)
+
+        return float(energy), forces
+
+
+def _accumulate(forces: np.ndarray, pairs: np.ndarray, pair_forces: np.ndarray) -> None:
+    """Adds the forces of atom pairs to the first and subtracts them from the second atom of every pair."""
+    for axis in range(3):
+        forces[:, axis] += np.bincount(
+            pairs[:, 0], weights=pair_forces[:, axis], minlength=len(forces)
+        )
+        forces[:, axis] -= np.bincount(
+            pairs[:, 1], weights=pair_forces[:, axis], minlength=len(forces)
+        )
+
+
+def relax_structure(
+    structure: Structure,
+    distance: float = 1.0,
+    max_steps: int = 1000,
+    max_displacement: float = 0.1,
+    skin: Optional[float] = None,
+    tolerance: float = 0.1,
+    strength: float = 1.0,
+) -> Tuple[Structure, RelaxationStatistics]:
+    """
+    Pushes overlapping atoms of different residues apart by minimizing a soft repulsive potential with the FIRE algorithm
+    (Bitzek et al., 2006), while the residues are moved as rigid bodies, i.e. their internal geometry is kept. Atoms of different
+    residues, which are separated by one or two bonds, do not repel each other, but their bonds are restrained to the initial
+    length and their 1-3 pairs are kept from getting closer than initially. The residues are translated by the total force and rotated by the torque on their atoms. The minimization stops as soon
+    as all other atoms of different residues are at least `distance` apart and the restrained distances deviate by at most `tolerance`.
+
+    Args:
+        - `structure (Structure)`: Structure to relax, e.g. grown with a loose threshold `trr`.
+        - `distance (float)`: Target minimal distance between atoms of different residues.
+        - `max_steps (int)`: Maximum number of minimization steps.
+        - `max_displacement (float)`: Maximal displacement of an atom per step.
+        - `skin (Optional[float])`: Skin of the Verlet list. Defaults to None, i.e. half of `distance`.
+        - `tolerance (float)`: Maximal deviation of the bonds and the compression of the 1-3 pairs between different residues.
+        - `strength (float)`: Strength of the restraints of these pairs relative to the repulsion.
+
+    Returns:
+        - `(Tuple[Structure, RelaxationStatistics])`: Relaxed structure and the result of the minimization.
+    """
+
+    if distance <= 0:
+        raise ValueError(f"The target distance has to be positive, got {distance}.")
+
+    # the repulsion reaches slightly beyond the target, since it only vanishes asymptotically
+    potential = _SoftClashPotential(
+        structure, 1.05 * distance, 0.5 * distance if skin is None else skin, strength
+    )
+    residues = potential.residues
+    masses = np.bincount(residues)[:, None].astype(float)
+
+    def per_residue(values: np.ndarray) -> np.ndarray:
+        return np.stack(
+            [np.bincount(residues, weights=values[:, axis]) for axis in range(3)],
+            axis=1,
+        )
+
+    # parameters of FIRE
+    time_step, max_time_step = 0.1, 1.0
+    mixing, start_mixing = 0.1, 0.1
+    positive_steps = 0
+
+    coordinates = np.array(structure.coordinates, dtype=float)
+    velocities = np.zeros((len(masses), 3))
+    angular_velocities = np.zeros((len(masses), 3))
+
+    energy, forces = potential(coordinates)
+
+    steps = 0
+    while steps < max_steps and (
+        potential.min_distance(coordinates) < distance
+        or potential.max_deviation(coordinates) > tolerance
+    ):
+        steps += 1
+
+        # total force and torque on the rigid residues
+        centers = per_residue(coordinates) / masses
+        arms = coordinates - centers[residues]
+        inertia = np.bincount(residues, weights=np.sum(arms**2, axis=1))[:, None]
+        inertia = np.maximum(inertia, 1e-6)
+        translation_forces = per_residue(forces)
+        torques = per_residue(np.cross(arms, forces))
+
+        generalized_forces = np.concatenate((translation_forces, torques))
+        generalized_velocities = np.concatenate((velocities, angular_velocities))
+        power = np.sum(generalized_forces * generalized_velocities)
+
+        if power > 0:
+            # mix the velocities towards the direction of the forces
+            force_norm = np.linalg.norm(generalized_forces)
+            if force_norm > 0:
+                generalized_velocities = (
+                    1 - mixing
+                ) * generalized_velocities + mixing * np.linalg.norm(
+                    generalized_velocities
+                ) * generalized_forces / force_norm
+            positive_steps += 1
+            if positive_steps > 5:
+                time_step = min(1.1 * time_step, max_time_step)
+                mixing *= 0.99
+        else:
+            generalized_velocities[:] = 0
+            time_step *= 0.5
+            mixing = start_mixing
+            positive_steps = 0
+
+        velocities, angular_velocities = np.split(generalized_velocities, 2)
+        velocities = velocities + time_step * translation_forces / masses
+        angular_velocities = angular_velocities + time_step * torques / inertia
+
+        translations = time_step * velocities
+        rotations = time_step * angular_velocities
+
+        # no atom moves further than the maximal displacement
+        displacements = translations[residues] + np.cross(rotations[residues], arms)
+        largest = np.max(np.linalg.norm(displacements, axis=1), initial=0)
+        if largest > max_displacement:
+            translations *= max_displacement / largest
+            rotations *= max_displacement / largest
+
+        coordinates = (
+            centers[residues]
+            + np.einsum("nij,nj->ni", rotation_matrices(rotations)[residues], arms)
+            + translations[residues]
+        )
+        energy, forces = potential(coordinates)
+
+    relaxed = Structure(
+        coordinates=coordinates,
+        names=structure.names,
+        elements=structure.elements,
+        residue_names=structure.residue_names,
+        residue_numbers=structure.residue_numbers,
+        bonds=structure.bonds,
+        links=structure.links,
+        box=structure.box,
+    )
+
+    return relaxed, RelaxationStatistics(
+        steps,
+        energy,
+        potential.min_distance(coordinates),
+        potential.max_deviation(coordinates),
+    )
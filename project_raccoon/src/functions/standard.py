@@ -1,7 +1,11 @@
-from ..data import Monomer, Monomers, Sequence, Atom
+from ..data import Monomer, Monomers, MonomerTemplate, Sequence, Atom, Structure
 
-from ..typing import List, Dict, Optional
+from ..typing import List, Dict, Optional, Union, Tuple, NamedTuple
 from ..util import eps
+from .collision import CollisionIndex, create_collision_index
+from .thresholds import ClashThresholds
+from .pdb import write_pdb, close_PDB
+from .relax import relax_structure
 
 import numpy as np
 from rich.console import Console
@@ -109,8 +113,11 @@ def get_rand_shift(
     z_min: float,
     z_max: float,
     z_bias: float,
+    size: Optional[int] = None,
+    rng: Optional[np.random.Generator] = None,
 ):
     """Creates a random shift in all directions with and without bias. Setting r_(min, _max) = 1 creates a linear shift for debugging. No default values needed.
+       If `size` is given, a batch of `size` random shifts is drawn at once.
 
     Args:
        - `x_min (float)`: Lower bound for the x direction.
@@ -120,284 +127,1086 @@ def get_rand_shift(
        - `z_min (float)`: Lower bound for the z direction.
        - `z_max (float)`: Upper bound for the z direction.
        - `z_bias (float)`: Bias for the z direction.
+       - `size (Optional[int])`: Number of shifts to draw. Defaults to None.
+       - `rng (Optional[np.random.Generator])`: Random number generator. Defaults to None, i.e. the global `np.random` state.
 
     Returns:
-        - `(np.ndarray)`: 3d vector with shape (3,)
+        - `(np.ndarray)`: 3d vector with shape (3,) or array of shape (size,3) if `size` is given.
     """
-    x = np.random.uniform(x_min, x_max)
-    y = np.random.uniform(y_min, y_max)
-    z = z_bias * np.random.uniform(z_min, z_max)
-    return np.array([x, y, z])
+    random = np.random if rng is None else rng
+    x = random.uniform(x_min, x_max, size)
+    y = random.uniform(y_min, y_max, size)
+    z = z_bias * random.uniform(z_min, z_max, size)
+    return np.array([x, y, z]) if size is None else np.stack((x, y, z), axis=1)
+
+
+def get_rand_rotation(
+    size: Optional[int] = None, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """Creates uniformly distributed random rotation matrices from random unit quaternions (Shoemake, 1992).
+       If `size` is given, a batch of `size` rotations is drawn at once.
+
+    Args:
+       - `size (Optional[int])`: Number of rotations to draw. Defaults to None.
+       - `rng (Optional[np.random.Generator])`: Random number generator. Defaults to None, i.e. the global `np.random` state.
+
+    Returns:
+        - `(np.ndarray)`: Rotation matrix with shape (3,3) or array of shape (size,3,3) if `size` is given.
+    """
+    random = np.random if rng is None else rng
+    u1, u2, u3 = random.uniform(0, 1, (3, 1 if size is None else size))
+
+    w = np.sqrt(1 - u1) * np.sin(2 * np.pi * u2)
+    x = np.sqrt(1 - u1) * np.cos(2 * np.pi * u2)
+    y = np.sqrt(u1) * np.sin(2 * np.pi * u3)
+    z = np.sqrt(u1) * np.cos(2 * np.pi * u3)
+
+    rotations = np.stack(
+        (
+            np.stack(
+                (1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)),
+                axis=1,
+            ),
+            np.stack(
+                (2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)),
+                axis=1,
+            ),
+            np.stack(
+                (2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)),
+                axis=1,
+            ),
+        ),
+        axis=1,
+    )
+
+    return rotations[0] if size is None else rotations
+
+
+def rotate_template(template: MonomerTemplate, rotations: np.ndarray) -> np.ndarray:
+    """
+    Rotates the coordinates of a monomer template around the linked atom, which is bonded to the previous residue.
+
+    Args:
+        - `template (MonomerTemplate)`: Template of the monomer.
+        - `rotations (np.ndarray)`: Rotation matrix of shape (3,3) or a batch of shape (K,3,3).
+
+    Returns:
+        - `(np.ndarray)`: Rotated coordinates of shape (N,3) or (K,N,3).
+    """
+    pivot = template.coordinates[template.link[0]]
+
+    return np.einsum("...ij,nj->...ni", rotations, template.coordinates - pivot) + pivot
+
+
+class AdaptiveShift:
+    """
+    Adaptive controller of the random shift of the semi random walk. It keeps track of the acceptance rate of the trial shifts
+    and scales the shift box and the bias of the shift configuration on the fly, such that about `target_iterations` trials are
+    needed per residue. If too few trials are accepted, the shifts are widened, which moves residues further away from the chain.
+    If most trials are accepted, the shifts are narrowed towards compact chains. The scale is bounded by `min_scale` and `max_scale`.
+    """
+
+    target_iterations: float
+    """Targeted number of trials per residue, i.e. the inverse of the targeted acceptance rate."""
+    min_scale: float
+    """Lower bound of the scale."""
+    max_scale: float
+    """Upper bound of the scale."""
+    gain: float
+    """Largest relative change of the scale per update."""
+    smoothing: float
+    """Weight of a new observation in the moving average of the acceptance rate."""
+    scale: float
+    """Current scale of the shift box and the bias."""
+    acceptance: float
+    """Moving average of the acceptance rate."""
+
+    def __init__(
+        self,
+        target_iterations: float = 8,
+        min_scale: float = 0.5,
+        max_scale: float = 3.0,
+        gain: float = 0.1,
+        smoothing: float = 0.2,
+    ):
+        if target_iterations < 1:
+            raise ValueError(
+                f"At least one trial per residue is needed, got target_iterations={target_iterations}."
+            )
+
+        if not 0 < min_scale <= 1 <= max_scale:
+            raise ValueError(
+                f"The bounds of the scale have to enclose 1, got {min_scale} and {max_scale}."
+            )
+
+        self.target_iterations = float(target_iterations)
+        self.min_scale = float(min_scale)
+        self.max_scale = float(max_scale)
+        self.gain = float(gain)
+        self.smoothing = float(smoothing)
+        self.scale = 1.0
+        self.acceptance = 1.0 / self.target_iterations
+
+    def shift_conf(self, shift_conf: List[float]) -> List[float]:
+        """
+        Scales the shift box in x and y direction and the bias in z direction of a shift configuration.
+
+        Args:
+            - `shift_conf (List(float))`: Shift configuration for RandShift()
+
+        Returns:
+            - `(List(float))`: Scaled shift configuration.
+        """
+        x_min, x_max, y_min, y_max, z_min, z_max, z_bias = shift_conf
+
+        return [
+            self.scale * x_min,
+            self.scale * x_max,
+            self.scale * y_min,
+            self.scale * y_max,
+            z_min,
+            z_max,
+            self.scale * z_bias,
+        ]
+
+    def update(self, trials: int, accepted: int) -> None:
+        """
+        Updates the acceptance rate and the scale after a number of trials.
+
+        Args:
+            - `trials (int)`: Number of evaluated trials.
+            - `accepted (int)`: Number of trials without clashes.
+        """
+        self.acceptance += self.smoothing * (accepted / trials - self.acceptance)
+
+        target = 1.0 / self.target_iterations
+        change = np.clip((target - self.acceptance) / target, -1, 1) * self.gain
+        self.scale = float(
+            np.clip(self.scale * np.exp(change), self.min_scale, self.max_scale)
+        )
+
+
+class ResidueThresholds(NamedTuple):
+    """Element-pair clash thresholds of a residue, which is placed by the semi random walk, see `ClashThresholds`."""
+
+    types: np.ndarray
+    """Types of the atoms of the residue, shape (n,)."""
+    matrix: np.ndarray
+    """Thresholds of all pairs of types."""
+    excluded: np.ndarray
+    """Pairs of a placed atom and an atom of the residue of shape (M,2), which never clash, e.g. across the link."""
+
+
+def _link_exclusions(
+    previous: MonomerTemplate, start: int, monomer: MonomerTemplate
+) -> np.ndarray:
+    """
+    Returns the pairs of atoms of the placed previous residue, which starts at atom `start`, and atoms of the next residue,
+    which are separated by one or two bonds across the link between them.
+    """
+    if len(previous.link) == 0 or len(monomer.link) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    def bonded(template: MonomerTemplate, atom: int) -> np.ndarray:
+        neighbours = template.neighbour_indices[
+            template.neighbour_indptr[atom] : template.neighbour_indptr[atom + 1]
+        ]
+        return neighbours[(neighbours >= 0) & (neighbours < template.atom_count)]
+
+    first, second = int(previous.link[-1]), int(monomer.link[0])
+    pairs = [(first, second)]
+    pairs += [(first, atom) for atom in bonded(monomer, second).tolist()]
+    pairs += [(atom, second) for atom in bonded(previous, first).tolist()]
+
+    return np.array(pairs, dtype=np.int64) + [start, 0]
+
+
+def _clashing(
+    placed_atoms: CollisionIndex,
+    trial_coordinates: np.ndarray,
+    thresholds: ResidueThresholds,
+) -> np.ndarray:
+    """Checks the atoms of trials of shape (K,n,3) for clashes with the element-pair thresholds, returns a mask of shape (K*n,)."""
+    trials, atoms, _ = trial_coordinates.shape
+    excluded = np.concatenate(
+        [thresholds.excluded + [0, trial * atoms] for trial in range(trials)]
+    )
+
+    return placed_atoms.clashing_pairs(
+        trial_coordinates.reshape(-1, 3),
+        np.tile(thresholds.types, trials),
+        thresholds.matrix,
+        excluded,
+    )
 
 
 def get_semi_random_walk_shift(
-    polypeptide_coordinates: np.array,
-    monomer: Monomer,
+    polypeptide_coordinates: Union[np.array, CollisionIndex],
+    monomer: Union[Monomer, MonomerTemplate],
     trr: float,
     cshift: List[float],
     shift_conf: List[float],
     max_iter: int = 1e3,
-) -> np.ndarray:
+    batch_size: int = 1,
+    rng: Optional[np.random.Generator] = None,
+    controller: Optional[AdaptiveShift] = None,
+    rotate: bool = False,
+    thresholds: Optional[ResidueThresholds] = None,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
     """Self-Avoiding Random Walk to prevent infinite forces upon energy minimization.
         Combines RandShift() and MinimalDistance(). Returns k, which can be used to add onto the new monomer.
         Treshshold of trr=1 should be sufficient to prevent infinite forces. If the function fails to find a valid shift, it will return None.
+        If a `CollisionIndex` of the previous monomers is passed, the trial positions are only checked against nearby atoms and the check stops at the first clash.
+        With `batch_size > 1`, batches of random shifts are drawn and evaluated in a single vectorized distance query and the first valid shift of a batch is used.
+        With an `AdaptiveShift` controller, the shift configuration is scaled by the controller, which is updated after every evaluated trial or batch.
+        With `rotate`, every trial additionally rotates the monomer by a random rotation around its linked atom to the previous residue, see `rotate_template()`.
+        With `thresholds`, the thresholds depend on the elements of both atoms instead of `trr` and the atoms around the link are not checked. This needs a `CollisionIndex` with the types of the atoms.
 
     Args:
-        - `polypetide_coordinates (np.ndarray, (3,N))`: Array of all coordinates of the atoms in the previous monomers.
-        - `monomer (Monomer)`: Monomer from raccoon.src.data
+        - `polypetide_coordinates (Union[np.ndarray, CollisionIndex])`: Array of all coordinates of the atoms in the previous monomers or a collision index of them.
+        - `monomer (Union[Monomer, MonomerTemplate])`: Monomer from raccoon.src.data or its template
         - `trr (float)`: Threshold for minimal distance.
         - `cshift (List(float))`: Cartesian shift.
         - `shift_conf (List(float))`: Shift configuration for RandShift()
         - `max_iter (int)`: Maximum number of iterations.
+        - `batch_size (int)`: Number of random shifts which are evaluated at once.
+        - `rng (Optional[np.random.Generator])`: Random number generator. Defaults to None, i.e. the global `np.random` state.
+        - `controller (Optional[AdaptiveShift])`: Adaptive controller of the shift configuration. Defaults to None.
+        - `rotate (bool)`: If True, the monomer is randomly rotated in every trial.
+        - `thresholds (Optional[ResidueThresholds])`: Element-pair thresholds of the monomer. Defaults to None, i.e. `trr` for all pairs.
 
     Returns:
-        - `k (np.ndarray)`: 3d vector with shape (3,) if successful, else False.
+        - `k (Union[np.ndarray, Tuple[np.ndarray, np.ndarray]])`: 3d vector with shape (3,) if successful, else False. With `rotate`, a tuple of the shift and the rotation matrix of shape (3,3).
     """
 
-    monomer_coordinates = monomer.coordinates_to_numpy() + cshift
-    minimal_distance = 0
+    template = monomer if isinstance(monomer, MonomerTemplate) else monomer.template
+
+    if thresholds is not None and not isinstance(
+        polypeptide_coordinates, CollisionIndex
+    ):
+        raise ValueError(
+            "Element-pair thresholds need a collision index of the previous monomers."
+        )
+
+    if batch_size > 1:
+        return _get_batched_semi_random_walk_shift(
+            polypeptide_coordinates,
+            template,
+            cshift,
+            trr,
+            shift_conf,
+            max_iter,
+            batch_size,
+            rng,
+            controller,
+            rotate,
+            thresholds,
+        )
+
+    monomer_coordinates = template.coordinates + cshift
+    rotation = None
+    clash = True
     cnt = 0
 
-    while minimal_distance < trr and cnt < max_iter:
-        k = get_rand_shift(*shift_conf)
+    while clash and cnt < max_iter:
+        conf = shift_conf if controller is None else controller.shift_conf(shift_conf)
+        k = get_rand_shift(*conf, rng=rng)
+
+        if rotate:
+            rotation = get_rand_rotation(rng=rng)
+            monomer_coordinates = rotate_template(template, rotation) + cshift
+
         updated_monomer_coordinates = monomer_coordinates + k
 
-        minimal_distance = calc_minimal_distance(
-            coords1=polypeptide_coordinates, coords2=updated_monomer_coordinates
-        )
+        if thresholds is not None:
+            clash = np.any(
+                _clashing(
+                    polypeptide_coordinates,
+                    updated_monomer_coordinates[None],
+                    thresholds,
+                )
+            )
+        elif isinstance(polypeptide_coordinates, CollisionIndex):
+            clash = polypeptide_coordinates.clashes(updated_monomer_coordinates)
+        else:
+            minimal_distance = calc_minimal_distance(
+                coords1=polypeptide_coordinates, coords2=updated_monomer_coordinates
+            )
+            clash = minimal_distance < trr
+
+        if controller is not None:
+            controller.update(1, int(not clash))
 
         cnt += 1
 
-    return k if cnt < max_iter else False
+    if clash:
+        return False
 
+    return (k, rotation) if rotate else k
 
-def generate_file(
+
+def _get_batched_semi_random_walk_shift(
+    polypeptide_coordinates: Union[np.array, CollisionIndex],
+    template: MonomerTemplate,
+    cshift: np.ndarray,
+    trr: float,
+    shift_conf: List[float],
+    max_iter: int,
+    batch_size: int,
+    rng: Optional[np.random.Generator] = None,
+    controller: Optional[AdaptiveShift] = None,
+    rotate: bool = False,
+    thresholds: Optional[ResidueThresholds] = None,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """Batched version of the semi random walk, see `get_semi_random_walk_shift()`.
+
+    Args:
+        - `polypetide_coordinates (Union[np.ndarray, CollisionIndex])`: Array of all coordinates of the atoms in the previous monomers or a collision index of them.
+        - `template (MonomerTemplate)`: Template of the monomer.
+        - `cshift (np.ndarray)`: Cartesian shift.
+        - `trr (float)`: Threshold for minimal distance.
+        - `shift_conf (List(float))`: Shift configuration for RandShift()
+        - `max_iter (int)`: Maximum number of iterations.
+        - `batch_size (int)`: Number of random shifts which are evaluated at once.
+        - `rng (Optional[np.random.Generator])`: Random number generator.
+        - `controller (Optional[AdaptiveShift])`: Adaptive controller of the shift configuration.
+        - `rotate (bool)`: If True, the monomer is randomly rotated in every trial.
+        - `thresholds (Optional[ResidueThresholds])`: Element-pair thresholds of the monomer.
+
+    Returns:
+        - `k (Union[np.ndarray, Tuple[np.ndarray, np.ndarray]])`: 3d vector with shape (3,) if successful, else False. With `rotate`, a tuple of the shift and the rotation matrix.
+    """
+    monomer_coordinates = template.coordinates + cshift
+    cnt = 0
+
+    while cnt < max_iter:
+        size = int(min(batch_size, max_iter - cnt))
+        conf = shift_conf if controller is None else controller.shift_conf(shift_conf)
+        shifts = get_rand_shift(*conf, size=size, rng=rng)
+
+        if rotate:
+            rotations = get_rand_rotation(size=size, rng=rng)
+            monomer_coordinates = rotate_template(template, rotations) + cshift
+
+        trial_coordinates = (
+            np.broadcast_to(
+                monomer_coordinates, (size,) + monomer_coordinates.shape[-2:]
+            )
+            + shifts[:, None, :]
+        )
+
+        if thresholds is not None:
+            clashing = _clashing(polypeptide_coordinates, trial_coordinates, thresholds)
+        elif isinstance(polypeptide_coordinates, CollisionIndex):
+            # all trial placements of the batch are checked as one array of shape (size * atoms, 3)
+            clashing = polypeptide_coordinates.clashing(
+                trial_coordinates.reshape(-1, 3)
+            )
+        else:
+            distance_matrix = cdist(
+                polypeptide_coordinates, trial_coordinates.reshape(-1, 3)
+            )
+            clashing = np.any(
+                (distance_matrix < trr) & (distance_matrix >= 2 * eps), axis=0
+            )
+
+        valid = np.flatnonzero(~clashing.reshape(size, -1).any(axis=1))
+
+        if controller is not None:
+            controller.update(size, len(valid))
+
+        if len(valid) > 0:
+            if rotate:
+                return shifts[valid[0]], rotations[valid[0]]
+            return shifts[valid[0]]
+
+        cnt += size
+
+    return False
+
+
+SHIFT_CONF = (-1, 1, -1, 1, -1, 1, 1)
+"""Default shift configuration (x_min, x_max, y_min, y_max, z_min, z_max, z_bias) of the semi random walk."""
+
+
+class GrowthError(Exception):
+    """Raised if a chain cannot be grown within the maximum number of backtracking steps."""
+
+
+class GrowthStatistics(NamedTuple):
+    """Counters of the backtracking, which was needed to grow a chain."""
+
+    backtracks: int
+    """Number of failed semi random walk steps, which were resolved by backtracking."""
+    residues_undone: int
+    """Total number of residues, which were undone."""
+    max_depth: int
+    """Largest number of residues undone in a single backtracking step."""
+    log_weight: Optional[float] = None
+    """Logarithm of the Rosenbluth weight of the chain, None for the semi random walk."""
+
+
+def _controller(adaptive: Union[bool, AdaptiveShift]) -> Optional[AdaptiveShift]:
+    """Returns the adaptive controller of a growth, a new controller for True and None for False."""
+    if isinstance(adaptive, AdaptiveShift):
+        return adaptive
+
+    return AdaptiveShift() if adaptive else None
+
+
+def _residue_runs(
+    monomers: Monomers, sequence: Sequence
+) -> List[Tuple[MonomerTemplate, int]]:
+    """
+    Returns the runs of repeated residues of a sequence as templates and numbers of repetitions. The templates are created
+    once per monomer and orientation and cached by the monomers, consecutive blocks with the same template are merged into one run.
+    """
+    runs = list()
+    for index, inverted, reps in zip(sequence.index, sequence.inverted, sequence.reps):
+        if inverted:
+            template = monomers.inverted_template(index)
+        else:
+            template = monomers[index].template
+
+        if runs and runs[-1][0] is template:
+            runs[-1] = (template, runs[-1][1] + reps)
+        elif reps > 0:
+            runs.append((template, reps))
+
+    return runs
+
+
+def _residue_templates(monomers: Monomers, sequence: Sequence) -> List[MonomerTemplate]:
+    """Returns the templates of all residues of a sequence, repeated residues share their template, see `_residue_runs()`."""
+    residues = list()
+    for template, reps in _residue_runs(monomers, sequence):
+        residues.extend([template] * reps)
+
+    return residues
+
+
+def _place(
+    template: MonomerTemplate, cshift: np.ndarray, rotation: Optional[np.ndarray]
+) -> np.ndarray:
+    """Coordinates of a placed residue, which is rotated around its linked atom before the shift."""
+    if rotation is None:
+        return template.coordinates + cshift
+
+    return rotate_template(template, rotation) + cshift
+
+
+def grow_chain(
     monomers: Monomers,
     sequence: Sequence,
-    explicit_bonds: bool,
-    outpath: str,
     trr: float = 1,
-    shift_conf: List[float] = [-1, 1, -1, 1, -1, 1, 1],
+    shift_conf: Optional[List[float]] = None,
     damping_factor: float = 0.5,
-    suppress_messages: bool = True,
-    cycle_cnt: int = 0,
-    max_cycles: int = 100,
-):
-    """Central function of the modul: adds monomers to a polymer peptide chain and writes it directly to a PDB file.
-    If more than 10 cycles are needed to generate a valid structure, the function will raise an error.
+    max_backtracks: int = 100,
+    backtrack_depth: int = 4,
+    collision_backend: str = "grid",
+    batch_size: int = 16,
+    rng: Optional[np.random.Generator] = None,
+    placed_atoms: Optional[CollisionIndex] = None,
+    origin: Optional[np.ndarray] = None,
+    adaptive: Union[bool, AdaptiveShift] = False,
+    rotate: bool = False,
+    thresholds: Optional[ClashThresholds] = None,
+) -> Tuple[Structure, GrowthStatistics]:
+    """Grows a polymer peptide chain residue by residue with the semi random walk. If no valid shift is found for a residue,
+    the last `backtrack_depth` residues are undone and the chain is regrown from there. Repeated failures at the same
+    residue undo multiples of `backtrack_depth` residues. If more than `max_backtracks` backtracking steps are needed,
+    the function will raise an error.
 
     Args:
        - `monomers (Monomers)`: Monomers object.
        - `sequence (Sequence)`: Sequence object.
-       - `explicit_bonds (bool)`: If True, explicit bonds are generated.
-       - `outpath (str)`: Path to the output file.
        - `trr (float)`: Threshold for minimal distance.
-       - `shift_cartesian (list(float))`: Cartesian shift of dimensions x,y,z.
+       - `shift_conf (Optional[list(float)])`: Shift configuration for the random shift, the last entry is replaced by the damped atom count of each residue. Defaults to `SHIFT_CONF`.
        - `damping_factor (float)`: Damping factor for the shift.
-       - `suppress_messages (bool)`: If True, messages are suppressed.
-       - `cycle_cnt (int)`: Current cycle count.
-       - `max_cycles (int)`: Maximum number of cycles.
+       - `max_backtracks (int)`: Maximum number of backtracking steps.
+       - `backtrack_depth (int)`: Number of residues, which are undone by a backtracking step.
+       - `collision_backend (str)`: Collision index of the semi random walk, "grid" (cell list), "kdtree" or "spheres" (bounding spheres of the residues).
+       - `batch_size (int)`: Number of random shifts, which are evaluated at once by the semi random walk.
+       - `rng (Optional[np.random.Generator])`: Random number generator. Defaults to None, i.e. the global `np.random` state.
+       - `placed_atoms (Optional[CollisionIndex])`: Collision index, which is shared with other chains, e.g. in a simulation box. The atoms of the chain are added to it. Defaults to None, i.e. a new index of `collision_backend`.
+       - `origin (Optional[np.ndarray])`: Cartesian shift of the first residue. Defaults to None, i.e. the origin.
+       - `adaptive (Union[bool, AdaptiveShift])`: If True or an `AdaptiveShift` controller, the shift configuration is adapted to the acceptance rate of the trials.
+       - `rotate (bool)`: If True, every trial placement is randomly rotated around the atom linked to the previous residue, see `rotate_template()`.
+       - `thresholds (Optional[ClashThresholds])`: Element-pair thresholds, which replace `trr`. Atoms separated by one or two bonds across a link are not checked. Defaults to None.
+
+    Returns:
+        - `(Tuple[Structure, GrowthStatistics])`: Structure of the chain and the backtracking counters.
     """
 
-    if cycle_cnt >= max_cycles:
-        raise Exception(
-            f"""Exceeded maximum number of cycles ({max_cycles}) to generate a valid structure.\n
+    if backtrack_depth < 1:
+        raise ValueError(
+            f"At least one residue has to be undone per backtracking step, got backtrack_depth={backtrack_depth}."
+        )
+
+    # residues are placed by shifting the read-only coordinate arrays of their templates
+    residues = _residue_templates(monomers, sequence)
+
+    cutoff = trr
+    if thresholds is not None:
+        # the types are encoded once per template of a run
+        template_types = dict()
+        for residue in residues:
+            if id(residue) not in template_types:
+                template_types[id(residue)] = thresholds.types(residue.elements)
+        residue_types = [template_types[id(residue)] for residue in residues]
+        cutoff = thresholds.cutoff(np.concatenate(list(template_types.values())))
+
+    # collision index of all placed atoms, updated after every committed residue.
+    # Its coordinate buffer is preallocated for the whole chain.
+    if placed_atoms is None:
+        placed_atoms = create_collision_index(
+            collision_backend, cutoff=cutoff, capacity=sequence.atom_count(monomers)
+        )
+
+    if thresholds is not None and placed_atoms.cutoff < cutoff:
+        raise ValueError(
+            f"The cutoff of the collision index ({placed_atoms.cutoff}) has to be at least the largest threshold {cutoff}."
+        )
+
+    placed = list()
+    # cartesian shift and atom count after each placed residue, the atoms of other chains come first
+    cshifts = [np.zeros(3) if origin is None else np.asarray(origin, dtype=float)]
+    atom_counts = [len(placed_atoms)]
+
+    backtracks = 0
+    residues_undone = 0
+    max_depth = 0
+    failures = 0
+    failed_at = -1
+
+    # the bias of the shift is set per residue on a copy, the configuration of the caller is not modified
+    shift_conf = list(SHIFT_CONF if shift_conf is None else shift_conf)
+    controller = _controller(adaptive)
+
+    while len(placed) < len(residues):
+        monomer = residues[len(placed)]
+        shift_conf[6] = float(monomer.atom_count) * damping_factor
+
+        residue_thresholds = None
+        if thresholds is not None:
+            excluded = np.empty((0, 2), dtype=np.int64)
+            if placed:
+                excluded = _link_exclusions(placed[-1], atom_counts[-2], monomer)
+            residue_thresholds = ResidueThresholds(
+                residue_types[len(placed)], thresholds.matrix, excluded
+            )
+
+        m = get_semi_random_walk_shift(
+            placed_atoms,
+            monomer,
+            trr=trr,
+            cshift=cshifts[-1],
+            shift_conf=shift_conf,
+            batch_size=batch_size,
+            rng=rng,
+            controller=controller,
+            rotate=rotate,
+            thresholds=residue_thresholds,
+        )
+
+        if m is False:
+            if backtracks >= max_backtracks:
+                placed_atoms.truncate(atom_counts[0])
+                raise GrowthError(
+                    f"""Exceeded maximum number of backtracking steps ({max_backtracks}) to generate a valid structure.\n
                 Please reparameterize the semi random walk. You can increase the treshold `trr`,\n
                 reduce the damping factor `damping_factor`, play with the parameters in to generate\n
-                the random shift vector `shift_conf`, or increase `max_cycles`."""
+                the random shift vector `shift_conf` or let them adapt with `adaptive`, or increase\n
+                `max_backtracks` or `backtrack_depth`."""
+                )
+
+            # undo more residues, if the walk is stuck at the same residue
+            failures = failures + 1 if len(placed) <= failed_at else 1
+            failed_at = max(failed_at, len(placed))
+
+            depth = min(backtrack_depth * failures, len(placed))
+            keep = len(placed) - depth
+
+            del placed[keep:]
+            del cshifts[keep + 1 :]
+            del atom_counts[keep + 1 :]
+            placed_atoms.truncate(atom_counts[-1])
+
+            backtracks += 1
+            residues_undone += depth
+            max_depth = max(max_depth, depth)
+            continue
+
+        if len(placed) >= failed_at:
+            failures = 0
+
+        rotation = None
+        if rotate:
+            m, rotation = m
+
+        cshift = cshifts[-1] + m
+        placed_atoms.add(
+            _place(monomer, cshift, rotation),
+            None if thresholds is None else residue_types[len(placed)],
         )
 
-    atom_count = 0
-    res_count = 0
+        placed.append(monomer)
+        cshifts.append(cshift)
+        atom_counts.append(atom_counts[-1] + monomer.atom_count)
 
-    with open(outpath, "w") as f:
-        cshift = np.zeros(3)
-        atom_count = 0
+    structure = Structure.from_templates(
+        placed, placed_atoms.points[atom_counts[0] :].copy()
+    )
 
-        links = list()
-        links_explicit = list()
-        coordinates = np.zeros((1, 3))
+    return structure, GrowthStatistics(backtracks, residues_undone, max_depth)
 
-        if not suppress_messages:
-            console = Console()
-            console.print("Generating Coordinates")
-
-        for index, inverted, reps in zip(
-            sequence.index, sequence.inverted, sequence.reps
-        ):
-            monomer = monomers[index]
-
-            if inverted:
-                monomer = monomer.invert()
-
-            for rep in range(reps):
-                shift_conf[6] = float(monomer.atom_count) * damping_factor
-
-                m = get_semi_random_walk_shift(
-                    coordinates,
-                    monomer,
-                    trr=trr,
-                    cshift=cshift,
-                    shift_conf=shift_conf,
-                )
 
-                if not np.all(m):
-                    generate_file(
-                        monomers,
-                        sequence,
-                        explicit_bonds,
-                        outpath,
-                        trr,
-                        shift_conf,
-                        damping_factor,
-                        suppress_messages,
-                        cycle_cnt + 1,
-                        max_cycles,
-                    )
+def soft_weights(
+    placed_atoms: CollisionIndex,
+    trial_coordinates: np.ndarray,
+    trr: float,
+    strength: float = 1.0,
+) -> np.ndarray:
+    """
+    Scores trial placements of a residue by a soft repulsion from the placed atoms. Every pair of a trial atom and
+    a placed atom closer than the cutoff of the collision index contributes `strength * (1 - r / cutoff)**2` to the
+    energy E of the trial, the weight of the trial is exp(-E). Trials with a pair closer than `trr` have the weight 0.
 
-                    # end the current function call and continue with the next one
-                    return
+    Args:
+        - `placed_atoms (CollisionIndex)`: Collision index of the placed atoms, its cutoff is the range of the repulsion.
+        - `trial_coordinates (np.ndarray)`: Coordinates of the trial placements of shape (K,N,3).
+        - `trr (float)`: Threshold for minimal distance.
+        - `strength (float)`: Strength of the repulsion in units of the thermal energy.
 
-                cshift = cshift + m
+    Returns:
+        - `(np.ndarray)`: Weights of the trials of shape (K,).
+    """
+    trials, atoms, _ = trial_coordinates.shape
+    points, _, distances = placed_atoms.close_pairs(trial_coordinates.reshape(-1, 3))
+    trial_indices = points // atoms
 
-                updated_monomer = monomer.update(atom_count, cshift)
+    energies = strength * np.bincount(
+        trial_indices,
+        weights=(1 - distances / placed_atoms.cutoff) ** 2,
+        minlength=trials,
+    )
+    weights = np.exp(-energies)
+    weights[np.bincount(trial_indices[distances < trr], minlength=trials) > 0] = 0
 
-                coordinates = np.vstack(
-                    (coordinates, updated_monomer.coordinates_to_numpy())
-                )
+    return weights
 
-                pairs = []
 
-                # Probably not the most efficient method to get all the explicit links, it works however
-                # updated_monomer.get_explicit_links() gets a list of all links of every atom in a monomer
-                # iterate through that list and create pairs
+def grow_chain_rosenbluth(
+    monomers: Monomers,
+    sequence: Sequence,
+    trr: float = 1,
+    shift_conf: Optional[List[float]] = None,
+    damping_factor: float = 0.5,
+    trials: int = 64,
+    soft_range: Optional[float] = None,
+    strength: float = 1.0,
+    perm: bool = False,
+    enrich: float = 3.0,
+    prune: float = 0.3,
+    max_prunes: int = 1000,
+    max_backtracks: int = 100,
+    backtrack_depth: int = 4,
+    collision_backend: str = "grid",
+    rng: Optional[np.random.Generator] = None,
+    placed_atoms: Optional[CollisionIndex] = None,
+    origin: Optional[np.ndarray] = None,
+    adaptive: Union[bool, AdaptiveShift] = False,
+    rotate: bool = False,
+) -> Tuple[Structure, GrowthStatistics]:
+    """Grows a polymer peptide chain with configurational bias (Rosenbluth) instead of taking the first valid shift.
+    For every residue, `trials` random shifts are scored with `soft_weights()` and one of them is chosen with a probability
+    proportional to its weight, which steers the chain into open space. The Rosenbluth weight of the chain is the product
+    of the mean trial weights of all residues.
+
+    With `perm`, the chain is grown by the pruned-enriched Rosenbluth method: if the weight of a partial chain exceeds `enrich`
+    times the mean weight of all partial chains of the same length, which were grown so far, a copy of the chain with another
+    trial placement is kept for later (enrichment). Below `prune` times the mean weight, the chain is discarded with probability 1/2
+    (pruning). Both copies of an enriched chain and the surviving pruned chains carry corrected weights. A chain is only pruned while
+    a kept copy exists and at most `max_prunes` times, a pruned chain continues from the last kept copy and is not counted as dead end.
+
+    If all trials of a residue clash, the last `backtrack_depth` residues are undone as by `grow_chain()`, or the growth continues
+    from the last kept copy within these residues. If more than `max_backtracks` of these dead ends occur, the function will raise an error.
 
-                if explicit_bonds == True:
-                    if not suppress_messages:
-                        console.print("Generating Explicit Bonds")
+    Args:
+       - `monomers (Monomers)`: Monomers object.
+       - `sequence (Sequence)`: Sequence object.
+       - `trr (float)`: Threshold for minimal distance.
+       - `shift_conf (Optional[list(float)])`: Shift configuration for the random shift, the last entry is replaced by the damped atom count of each residue. Defaults to `SHIFT_CONF`.
+       - `damping_factor (float)`: Damping factor for the shift.
+       - `trials (int)`: Number of trial placements per residue.
+       - `soft_range (Optional[float])`: Range of the soft repulsion. Defaults to None, i.e. 1.5 times `trr` or the cutoff of `placed_atoms`.
+       - `strength (float)`: Strength of the soft repulsion in units of the thermal energy.
+       - `perm (bool)`: If True, partial chains are pruned and enriched.
+       - `enrich (float)`: Ratio to the mean weight above which a partial chain is enriched.
+       - `prune (float)`: Ratio to the mean weight below which a partial chain is pruned.
+       - `max_prunes (int)`: Maximum number of pruned chains.
+       - `max_backtracks (int)`: Maximum number of dead ends.
+       - `backtrack_depth (int)`: Number of residues, which are undone at a dead end, more if the growth is stuck at the same residue.
+       - `collision_backend (str)`: Collision index of the placed atoms, "grid" (cell list), "kdtree" or "spheres" (bounding spheres of the residues).
+       - `rng (Optional[np.random.Generator])`: Random number generator. Defaults to None, i.e. the global `np.random` state.
+       - `placed_atoms (Optional[CollisionIndex])`: Collision index, which is shared with other chains, its cutoff is the range of the soft repulsion. Defaults to None, i.e. a new index of `collision_backend`.
+       - `origin (Optional[np.ndarray])`: Cartesian shift of the first residue. Defaults to None, i.e. the origin.
+       - `adaptive (Union[bool, AdaptiveShift])`: If True or an `AdaptiveShift` controller, the shift configuration is adapted to the acceptance rate of the trials.
+       - `rotate (bool)`: If True, every trial placement is randomly rotated around the atom linked to the previous residue, see `rotate_template()`.
 
-                    for index, neighbor in enumerate(
-                        updated_monomer.get_explicit_links()
-                    ):
-                        for n in neighbor:
-                            pairs.append((index + 1 + atom_count, n))
-                    unique_pairs = set()
+    Returns:
+        - `(Tuple[Structure, GrowthStatistics])`: Structure of the chain and the counters of the dead ends, including the Rosenbluth weight.
+    """
 
-                    # search for duplicate touples and only keep the non-duplicates
+    if trials < 1:
+        raise ValueError(
+            f"At least one trial per residue is needed, got trials={trials}."
+        )
 
-                    for item in pairs:
-                        if (item not in unique_pairs) and (
-                            tuple(reversed(item)) not in unique_pairs
-                        ):
-                            unique_pairs.add(item)
+    residues = _residue_templates(monomers, sequence)
+    random = np.random if rng is None else rng
 
-                    for items in unique_pairs:
-                        links_explicit.extend(items)
+    if placed_atoms is None:
+        placed_atoms = create_collision_index(
+            collision_backend,
+            cutoff=1.5 * trr if soft_range is None else soft_range,
+            capacity=sequence.atom_count(monomers),
+        )
 
-                else:
-                    pass
-
-                atom_count += updated_monomer.atom_count
-                res_count += 1
-
-                # add the C-Terminus link and/or the N-Terminus link
-                links.extend(updated_monomer.link)
-
-                for atom in updated_monomer.atoms:
-                    # formatting coordinates to 3 decimal places
-                    x = f"{atom.x:.3f}"
-                    y = f"{atom.y:.3f}"
-                    z = f"{atom.z:.3f}"
-
-                    f.write(
-                        "{:>0}{:<7}{:<5}{:<5}{:<4}{:<3}{:<6}{:<8}{:<8}{:<10}{:<7}{:<14}{}\n".format(
-                            "",
-                            "ATOM",
-                            atom.index,
-                            atom.ff_identifier,
-                            updated_monomer.name,
-                            "A",
-                            res_count,
-                            x,
-                            y,
-                            z,
-                            1.0,
-                            0.0,
-                            atom.element,
-                        )
-                    )
+    if placed_atoms.cutoff < trr:
+        raise ValueError(
+            f"The range of the soft repulsion ({placed_atoms.cutoff}) has to be at least the threshold trr={trr}."
+        )
 
-        # extra loop needed, since iterator has to be set to [::2] instead of [::1] for non-explicit bonds
-
-        if explicit_bonds == True:
-            for i in range(0, len(links_explicit) - 1, 2):
-                f.write(
-                    "{:>0}{:<7}{:<5}{:<5}{:<4}{:<3}{:<6}{:<8}{:<8}{:<10}{:<7}{:<14}{}\n".format(
-                        "",
-                        "CONECT",
-                        links_explicit[i],
-                        links_explicit[i + 1],
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                        "",
-                    )
+    placed = list()
+    # cartesian shift, atom count and logarithmic weight after each placed residue
+    cshifts = [np.zeros(3) if origin is None else np.asarray(origin, dtype=float)]
+    atom_counts = [len(placed_atoms)]
+    log_weights = [0.0]
+
+    # copies of partial chains as (number of residues, shift and rotation of the next residue, logarithmic weight)
+    branches = list()
+    # logarithm of the summed weights and number of partial chains of every length, which estimate the mean weight
+    log_sums = np.full(len(residues) + 1, -np.inf)
+    visits = np.zeros(len(residues) + 1)
+
+    backtracks = 0
+    residues_undone = 0
+    max_depth = 0
+    failures = 0
+    failed_at = -1
+    prunes = 0
+
+    shift_conf = list(SHIFT_CONF if shift_conf is None else shift_conf)
+    controller = _controller(adaptive)
+
+    while len(placed) < len(residues):
+        n = len(placed)
+        monomer = residues[n]
+        shift_conf[6] = float(monomer.atom_count) * damping_factor
+
+        conf = shift_conf if controller is None else controller.shift_conf(shift_conf)
+        shifts = get_rand_shift(*conf, size=trials, rng=rng)
+        if rotate:
+            rotations = get_rand_rotation(size=trials, rng=rng)
+            coordinates = rotate_template(monomer, rotations)
+        else:
+            rotations = [None] * trials
+            coordinates = monomer.coordinates[None, :, :]
+        trial_coordinates = coordinates + (cshifts[-1] + shifts)[:, None, :]
+        weights = soft_weights(placed_atoms, trial_coordinates, trr, strength)
+        total = weights.sum()
+
+        if controller is not None:
+            controller.update(trials, np.count_nonzero(weights))
+
+        alive = total > 0
+        pruned = False
+        if alive:
+            choice = random.choice(trials, p=weights / total)
+            shift, rotation = shifts[choice], rotations[choice]
+            log_weight = log_weights[-1] + np.log(total / trials)
+
+            if perm:
+                log_sums[n + 1] = np.logaddexp(log_sums[n + 1], log_weight)
+                visits[n + 1] += 1
+                ratio = np.exp(log_weight - log_sums[n + 1] + np.log(visits[n + 1]))
+
+                if ratio > enrich and np.count_nonzero(weights) > 1:
+                    others = weights.copy()
+                    others[choice] = 0
+                    other = random.choice(trials, p=others / others.sum())
+                    log_weight -= np.log(2)
+                    branches.append((n, shifts[other], rotations[other], log_weight))
+                elif ratio < prune and branches and prunes < max_prunes:
+                    pruned = random.uniform() < 0.5
+                    prunes += pruned
+                    log_weight += np.log(2)
+
+        if pruned:
+            # a pruned chain continues from the last kept copy, which is no dead end
+            keep, shift, rotation, log_weight = branches.pop()
+        elif not alive:
+            if backtracks >= max_backtracks:
+                placed_atoms.truncate(atom_counts[0])
+                raise GrowthError(
+                    f"""Exceeded maximum number of dead ends ({max_backtracks}) to generate a valid structure.\n
+                Please increase the number of trials `trials`, lower the treshold `trr` or the strength of the\n
+                soft repulsion `strength`, or increase `max_backtracks`."""
                 )
 
-        # write bonds in file
-        if not suppress_messages:
-            console.print("Writing to File")
-        for i in range(0, len(links) - 1, 1):
-            f.write(
-                "{:>0}{:<7}{:<5}{:<5}{:<4}{:<3}{:<6}{:<8}{:<8}{:<10}{:<7}{:<14}{}\n".format(
-                    "",
-                    "CONECT",
-                    links[i],
-                    links[i + 1],
-                    "",
-                    "",
-                    "",
-                    "",
-                    "",
-                    "",
-                    "",
-                    "",
-                    "",
-                    "",
-                )
+            # undo more residues, if the growth is stuck at the same residue
+            failures = failures + 1 if n <= failed_at else 1
+            failed_at = max(failed_at, n)
+            keep, shift = max(n - backtrack_depth * failures, 0), None
+
+            # a kept copy is only used within the residues to undo, older copies stay valid
+            if branches and branches[-1][0] >= keep:
+                keep, shift, rotation, log_weight = branches.pop()
+            else:
+                branches = [branch for branch in branches if branch[0] < keep]
+
+            backtracks += 1
+            residues_undone += n - keep
+            max_depth = max(max_depth, n - keep)
+        elif n >= failed_at:
+            failures = 0
+
+        if pruned or not alive:
+            del placed[keep:]
+            del cshifts[keep + 1 :]
+            del atom_counts[keep + 1 :]
+            del log_weights[keep + 1 :]
+            placed_atoms.truncate(atom_counts[-1])
+
+            if shift is None:
+                continue
+
+            monomer = residues[keep]
+
+        cshift = cshifts[-1] + shift
+        placed_atoms.add(_place(monomer, cshift, rotation))
+
+        placed.append(monomer)
+        cshifts.append(cshift)
+        atom_counts.append(atom_counts[-1] + monomer.atom_count)
+        log_weights.append(log_weight)
+
+    structure = Structure.from_templates(
+        placed, placed_atoms.points[atom_counts[0] :].copy()
+    )
+
+    return structure, GrowthStatistics(
+        backtracks, residues_undone, max_depth, float(log_weights[-1])
+    )
+
+
+GROWTH_STRATEGIES = ("walk", "rosenbluth", "perm")
+"""Available growth strategies of `generate_file()` and `build_structure()`."""
+
+
+def _grow(
+    growth: str,
+    monomers: Monomers,
+    sequence: Sequence,
+    backtrack_depth: int,
+    batch_size: int,
+    **kwargs,
+) -> Tuple[Structure, GrowthStatistics]:
+    """Grows a chain with a growth strategy, the options of the semi random walk are only used by the walk."""
+    if growth == "walk":
+        return grow_chain(
+            monomers,
+            sequence,
+            backtrack_depth=backtrack_depth,
+            batch_size=batch_size,
+            **kwargs,
+        )
+    elif growth in ("rosenbluth", "perm"):
+        if kwargs.pop("thresholds", None) is not None:
+            raise ValueError(
+                "Element-pair thresholds are only supported by the growth strategy walk."
             )
+        return grow_chain_rosenbluth(
+            monomers,
+            sequence,
+            perm=growth == "perm",
+            backtrack_depth=backtrack_depth,
+            **kwargs,
+        )
+    else:
+        raise ValueError(
+            f"Unknown growth strategy {growth}; available strategies are {', '.join(GROWTH_STRATEGIES)}"
+        )
+
 
-    # no need for sorting beacuse the atoms are already sorted ( consecutive numbering) and the bonds are written after all atoms
-    # sort_PDB(outpath)
-    close_PDB(outpath, atom_count)
+def _relax(structure: Structure, distance: float, tolerance: float = 0.1) -> Structure:
+    """
+    Relaxes the soft clashes of a grown structure and raises an error, if the target distance is not reached or the bonds
+    between the residues are distorted.
+    """
+    structure, statistics = relax_structure(structure, distance, tolerance=tolerance)
+
+    if statistics.min_distance < distance or statistics.max_deviation > tolerance:
+        raise GrowthError(
+            f"""The relaxation reached a minimal distance of {statistics.min_distance:.3f} instead of {distance}
+                and distorted the bonds between residues by up to {statistics.max_deviation:.3f}.\n
+                Please increase the treshold `trr` of the growth or lower the target distance `relax`."""
+        )
+
+    return structure
+
+
+def generate_file(
+    monomers: Monomers,
+    sequence: Sequence,
+    explicit_bonds: bool,
+    outpath: str,
+    trr: float = 1,
+    shift_conf: Optional[List[float]] = None,
+    damping_factor: float = 0.5,
+    suppress_messages: bool = True,
+    max_backtracks: int = 100,
+    backtrack_depth: int = 4,
+    collision_backend: str = "grid",
+    batch_size: int = 16,
+    rng: Optional[np.random.Generator] = None,
+    growth: str = "walk",
+    relax: Optional[float] = None,
+    adaptive: bool = False,
+    rotate: bool = False,
+    thresholds: Optional[ClashThresholds] = None,
+) -> GrowthStatistics:
+    """Central function of the modul: adds monomers to a polymer peptide chain and writes it to a PDB file.
+    By default, the chain is grown with `grow_chain()`, which backtracks a few residues if the semi random walk fails.
+    If more than `max_backtracks` backtracking steps are needed to generate a valid structure, the function will raise an error.
+
+    Args:
+       - `monomers (Monomers)`: Monomers object.
+       - `sequence (Sequence)`: Sequence object.
+       - `explicit_bonds (bool)`: If True, explicit bonds are generated.
+       - `outpath (str)`: Path to the output file.
+       - `trr (float)`: Threshold for minimal distance.
+       - `shift_conf (Optional[list(float)])`: Shift configuration for the random shift. Defaults to `SHIFT_CONF`.
+       - `damping_factor (float)`: Damping factor for the shift.
+       - `suppress_messages (bool)`: If True, messages are suppressed.
+       - `max_backtracks (int)`: Maximum number of backtracking steps.
+       - `backtrack_depth (int)`: Number of residues, which are undone by a backtracking step.
+       - `collision_backend (str)`: Collision index of the semi random walk, "grid" (cell list), "kdtree" or "spheres" (bounding spheres of the residues).
+       - `batch_size (int)`: Number of random shifts, which are evaluated at once by the semi random walk.
+       - `rng (Optional[np.random.Generator])`: Random number generator. Defaults to None, i.e. the global `np.random` state.
+       - `growth (str)`: Growth strategy, "walk" (`grow_chain()`), "rosenbluth" or "perm" (`grow_chain_rosenbluth()`).
+       - `relax (Optional[float])`: Target minimal distance of a soft-clash relaxation after the growth, see `relax_structure()`. This allows to grow the chain with a looser threshold `trr`. Defaults to None, i.e. no relaxation.
+       - `adaptive (bool)`: If True, the shift configuration is adapted to the acceptance rate of the trials, see `AdaptiveShift`.
+       - `rotate (bool)`: If True, the residues are randomly rotated during the placement.
+       - `thresholds (Optional[ClashThresholds])`: Element-pair thresholds of the walk, which replace `trr`, see `ClashThresholds`. Defaults to None.
+
+    Returns:
+        - `(GrowthStatistics)`: Backtracking counters of the chain growth.
+    """
+
+    if not suppress_messages:
+        console = Console()
+        console.print("Generating Coordinates")
+
+    structure, statistics = _grow(
+        growth,
+        monomers,
+        sequence,
+        trr=trr,
+        shift_conf=shift_conf,
+        damping_factor=damping_factor,
+        max_backtracks=max_backtracks,
+        backtrack_depth=backtrack_depth,
+        collision_backend=collision_backend,
+        batch_size=batch_size,
+        rng=rng,
+        adaptive=adaptive,
+        rotate=rotate,
+        thresholds=thresholds,
+    )
+
+    if relax is not None:
+        if not suppress_messages:
+            console.print("Relaxing Soft Clashes")
+        structure = _relax(structure, relax)
+
+    if not suppress_messages:
+        console.print(
+            f"Backtracked {statistics.backtracks} times, {statistics.residues_undone} residues were undone."
+        )
+
+    if not suppress_messages:
+        console.print("Writing to File")
+
+    write_pdb(structure, outpath, explicit_bonds=explicit_bonds)
 
     if not suppress_messages:
         console.print(
-            f"Created PDB file with {res_count} residue and {atom_count} atoms to {outpath}.",
+            f"Created PDB file with {structure.residue_count} residue and {structure.atom_count} atoms to {outpath}.",
             style="bold green",
         )
 
+    return statistics
 
-def close_PDB(fpath: str, atom_count: int):
-    """
-    Closes a PDB file by adding the END statement and the number of atoms.
+
+def build_structure(
+    monomers: Monomers,
+    sequence: Sequence,
+    trr: float = 1,
+    shift_conf: Optional[List[float]] = None,
+    damping_factor: float = 0.5,
+    max_backtracks: int = 100,
+    backtrack_depth: int = 4,
+    collision_backend: str = "grid",
+    batch_size: int = 16,
+    rng: Optional[np.random.Generator] = None,
+    growth: str = "walk",
+    relax: Optional[float] = None,
+    adaptive: bool = False,
+    rotate: bool = False,
+    thresholds: Optional[ClashThresholds] = None,
+) -> Structure:
+    """Builds a polymer peptide chain in memory without writing it to a file, see `grow_chain()` and `grow_chain_rosenbluth()`.
 
     Args:
-        - `file_path (str)`: Path to the file.
-        - `atom_count (int)`: Number of atoms.
+       - `monomers (Monomers)`: Monomers object.
+       - `sequence (Sequence)`: Sequence object.
+       - `trr (float)`: Threshold for minimal distance.
+       - `shift_conf (Optional[list(float)])`: Shift configuration for the random shift, the last entry is replaced by the damped atom count of each residue. Defaults to `SHIFT_CONF`.
+       - `damping_factor (float)`: Damping factor for the shift.
+       - `max_backtracks (int)`: Maximum number of backtracking steps.
+       - `backtrack_depth (int)`: Number of residues, which are undone by a backtracking step.
+       - `collision_backend (str)`: Collision index of the semi random walk, "grid" (cell list), "kdtree" or "spheres" (bounding spheres of the residues).
+       - `batch_size (int)`: Number of random shifts, which are evaluated at once by the semi random walk.
+       - `rng (Optional[np.random.Generator])`: Random number generator. Defaults to None, i.e. the global `np.random` state.
+       - `growth (str)`: Growth strategy, "walk" (`grow_chain()`), "rosenbluth" or "perm" (`grow_chain_rosenbluth()`).
+       - `relax (Optional[float])`: Target minimal distance of a soft-clash relaxation after the growth, see `relax_structure()`. This allows to grow the chain with a looser threshold `trr`. Defaults to None, i.e. no relaxation.
+       - `adaptive (bool)`: If True, the shift configuration is adapted to the acceptance rate of the trials, see `AdaptiveShift`.
+       - `rotate (bool)`: If True, the residues are randomly rotated during the placement.
+       - `thresholds (Optional[ClashThresholds])`: Element-pair thresholds of the walk, which replace `trr`, see `ClashThresholds`. Defaults to None.
 
+    Returns:
+        - `structure (Structure)`: Array-backed structure of the chain.
     """
-
-    with open(fpath, "a") as file:
-        file.write(
-            "{:>0}{:<11}{:<5}{:<5}{:<4}{:<5}{:<5}{:<5}{:<5}{:<5}{:<5}{:<5}{:<5}{}\n".format(
-                "", "MASTER", 0, 0, 0, 0, 0, 0, 0, 0, atom_count, 0, atom_count, 0
-            )
-        )
-        file.write("END")
+    structure, _ = _grow(
+        growth,
+        monomers,
+        sequence,
+        trr=trr,
+        shift_conf=shift_conf,
+        damping_factor=damping_factor,
+        max_backtracks=max_backtracks,
+        backtrack_depth=backtrack_depth,
+        collision_backend=collision_backend,
+        batch_size=batch_size,
+        rng=rng,
+        adaptive=adaptive,
+        rotate=rotate,
+        thresholds=thresholds,
+    )
+
+    if relax is not None:
+        structure = _relax(structure, relax)
+
+    return structure
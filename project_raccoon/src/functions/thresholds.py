@@ -0,0 +1,83 @@
+from ..typing import Dict, Tuple, Optional, Iterable
+
+import numpy as np
+
+VDW_RADII = {
+    "H": 1.20,
+    "C": 1.70,
+    "N": 1.55,
+    "O": 1.52,
+    "F": 1.47,
+    "P": 1.80,
+    "S": 1.80,
+    "Cl": 1.75,
+    "Br": 1.85,
+    "I": 1.98,
+    # dummy atoms of the monomer library do not clash
+    "D": 0.0,
+}
+"""Van der Waals radii in Å (Bondi, 1964), which are used for the clash thresholds of element pairs."""
+
+
+class ClashThresholds:
+    """
+    Clash thresholds of element pairs for the semi random walk. The threshold of two elements is `scale` times the sum of
+    their van der Waals radii (`VDW_RADII` or `radii`), so that hydrogen atoms can come closer than heavy atoms. Thresholds of
+    single element pairs can be overridden with `pairs`, e.g. `{("H", "H"): 0.8}`. Elements are encoded as integer types,
+    which index the threshold matrix.
+    """
+
+    scale: float
+    """Ratio of the thresholds to the sums of the radii."""
+    elements: Tuple[str, ...]
+    """Elements, their position is their type."""
+    matrix: np.ndarray
+    """Thresholds of all pairs of types."""
+
+    def __init__(
+        self,
+        radii: Optional[Dict[str, float]] = None,
+        scale: float = 0.4,
+        pairs: Optional[Dict[Tuple[str, str], float]] = None,
+    ):
+        if scale <= 0:
+            raise ValueError(f"The scale of the radii has to be positive, got {scale}.")
+
+        self.scale = float(scale)
+        radii = {**VDW_RADII, **(radii or dict())}
+        self.elements = tuple(radii)
+        self._types = {element: i for i, element in enumerate(self.elements)}
+
+        values = np.array([radii[element] for element in self.elements])
+        self.matrix = scale * (values[:, None] + values[None, :])
+
+        for (first, second), threshold in (pairs or dict()).items():
+            i, j = self.types([first, second])
+            self.matrix[i, j] = self.matrix[j, i] = threshold
+
+        self.matrix.flags.writeable = False
+
+    def types(self, elements: Iterable[str]) -> np.ndarray:
+        """
+        Encodes elements as integer types.
+
+        Args:
+            - `elements (Iterable[str])`: Elements of the atoms.
+
+        Returns:
+            - `(np.ndarray)`: Types of the atoms.
+        """
+        types = list()
+        for element in elements:
+            if element not in self._types:
+                raise ValueError(
+                    f"Unknown van der Waals radius of element {element}, please pass it with `radii`."
+                )
+            types.append(self._types[element])
+
+        return np.array(types, dtype=np.int64)
+
+    def cutoff(self, types: np.ndarray) -> float:
+        """Returns the largest threshold between the given types, i.e. the cutoff of a collision index."""
+        types = np.unique(types)
+        return float(np.max(self.matrix[np.ix_(types, types)], initial=0))
@@ -2,12 +2,41 @@ from py3Dmol import view as py3Dmol
 import os
 import numpy as np
 
-from ..typing import Tuple, List
-from .standard import calc_minimal_distance
+from ..typing import Tuple, List, NamedTuple, Optional
+from ..util import eps
+from .pdb import (
+    PDBError,
+    read_pdb,
+    read_pdb_atoms,
+    read_conect,
+    validate_pdb,
+)
+from .contacts import Contacts, close_contacts, write_contacts
+
+from pathlib import Path
+
+from scipy.spatial import cKDTree
+
+# number of atoms, whose nearest neighbours are queried at once
+_QUERY_CHUNK_SIZE = 65536
+
+# number of errors of a pdb file, which are printed
+_PRINTED_ERRORS = 20
+
+
+class MinimalDistance(NamedTuple):
+    """Minimal distance between the atoms of a structure and the atom pair, which is closest."""
+
+    distance: float
+    """Minimal distance in Å, infinite for less than two atoms."""
+    first: int
+    """Index of the first atom of the pair, -1 for less than two atoms."""
+    second: int
+    """Index of the second atom of the pair, -1 for less than two atoms."""
 
 
 def get_elements_and_coords_from_pdb(fpath: str) -> Tuple[List[str], np.ndarray]:
-    """Returns the elements and coordinates from a pdb file.
+    """Returns the elements and coordinates of the atoms of the first model from a pdb file, see `read_pdb_atoms()`.
 
     Args:
        - `fpath (str)`: Path to pdb file.
@@ -15,39 +44,22 @@ def get_elements_and_coords_from_pdb(fpath: str) -> Tuple[List[str], np.ndarray]
     Returns:
         - `(Tuple[List[str], np.ndarray])`: Elements and coordinates.
     """
-    coords = list()
-    elements = list()
-
-    with open(fpath, "r") as f:
-        for line in f:
-            if line.startswith("ATOM"):
-                atom = line.split(" ")[1:]
-                atom = [l.strip() for l in atom if l.strip() != ""]
-                coords.append([float(x) for x in atom[5:8]])
-                elements.append(atom[-1])
+    atoms = read_pdb_atoms(fpath)
 
-    return elements, np.array(coords)
+    return atoms.elements.tolist(), atoms.coordinates
 
 
 def get_links_from_pdb(fpath: str) -> np.ndarray:
-    """Returns the links from a pdb file.
+    """Returns the unique links of the CONECT records of a pdb file as pairs of serial numbers, see `read_conect()`.
+       For the links as pairs of atom indices see `read_bond_graph()`.
 
     Args:
         - `fpath (str)`: Path to pdb file.
 
     Returns:
-        - `(np.ndarray)`: Links.
+        - `(np.ndarray)`: Links, shape (M,2).
     """
-    links = list()
-
-    with open(fpath, "r") as f:
-        for line in f:
-            if line.startswith("CONECT"):
-                link = line.split(" ")[1:]
-                link = [l for l in link if l.strip() != ""]
-                links.append([int(l) for l in link])
-
-    return np.array(links)
+    return read_conect(fpath)
 
 
 def pdb_to_xyz(fpath: str, suppress_messages=False) -> None:
@@ -66,21 +78,29 @@ def pdb_to_xyz(fpath: str, suppress_messages=False) -> None:
         print(f"PDB file was converted to xyz file {out_path}.")
 
 
-def check_pdb_file(fpath: str, suppress_messages: bool = True) -> None:
-    """Checks a pdb file for errors with the biopandas package.
-       If the file is valid, it prints the atom dataframe.
+def check_pdb_file(fpath: str, suppress_messages: bool = True) -> List[PDBError]:
+    """Checks a pdb file for errors with `validate_pdb()`, offline in a single pass over the file.
+       It prints the errors or that the file is valid.
 
     Args:
-        fpath (str): Path to pdb file.
-    """
-
-    from biopandas.pdb import PandasPdb
+        - `fpath (str)`: Path to pdb file.
+        - `suppress_messages (bool)`: If True, nothing is printed.
 
-    ppdb = PandasPdb().fetch_pdb("3eiy")
-    ppdb.read_pdb(fpath)
+    Returns:
+        - `(List[PDBError])`: Errors sorted by line number, empty for a valid file.
+    """
+    errors = validate_pdb(fpath)
 
     if not suppress_messages:
-        print(ppdb.df["ATOM"])
+        for error in errors[:_PRINTED_ERRORS]:
+            location = f"Line {error.line}, " if error.line > 0 else ""
+            print(f"{location}{error.record}: {error.message}")
+        if len(errors) > _PRINTED_ERRORS:
+            print(f"... and {len(errors) - _PRINTED_ERRORS} more errors.")
+        if len(errors) == 0:
+            print(f"{fpath} is a valid PDB file.")
+
+    return errors
 
 
 def visualize_pdb_file(fpath: str) -> None:
@@ -96,10 +116,108 @@ def visualize_pdb_file(fpath: str) -> None:
     view.show()
 
 
-def check_minimal_distance(fpath: str) -> None:
-    "Calculates the minimal distance from a given pdb file"
-    _, coords = get_elements_and_coords_from_pdb(fpath)
+def minimal_distance(
+    coords: np.ndarray, chunk_size: int = _QUERY_CHUNK_SIZE
+) -> MinimalDistance:
+    """
+    Calculates the minimal distance between the atoms of a structure and the closest atom pair with a KD-tree.
+    The nearest neighbours of the atoms are queried in chunks, so that the memory is bounded for large structures
+    and the time scales with O(N log N) instead of the full distance matrix of `calc_minimal_distance()`.
+    Like there, atoms at the same position are not considered as a pair.
+
+    Args:
+        - `coords (np.ndarray)`: Coordinates of shape (N,3).
+        - `chunk_size (int)`: Number of atoms, whose nearest neighbours are queried at once.
+
+    Returns:
+        - `(MinimalDistance)`: Minimal distance and the indices of the closest atom pair.
+    """
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    result = MinimalDistance(np.inf, -1, -1)
+
+    if len(coords) < 2:
+        return result
+
+    tree = cKDTree(coords)
+
+    for start in range(0, len(coords), chunk_size):
+        points = coords[start : start + chunk_size]
+        distances, neighbours = tree.query(points, k=2)
+
+        # the nearest neighbour of an atom is the atom itself or another atom at the same position
+        distances, neighbours = distances[:, 1], neighbours[:, 1]
+        for row in np.flatnonzero(distances < 2 * eps):
+            count = len(tree.query_ball_point(points[row], 2 * eps))
+            distances[row], neighbours[row] = np.inf, -1
+            if count < len(coords):
+                row_distances, row_neighbours = tree.query(points[row], k=count + 1)
+                distances[row], neighbours[row] = row_distances[-1], row_neighbours[-1]
+
+        row = int(np.argmin(distances))
+        if distances[row] < result.distance:
+            pair = sorted((start + row, int(neighbours[row])))
+            result = MinimalDistance(float(distances[row]), *pair)
+
+    return result
+
 
-    min_dist = calc_minimal_distance(coords, coords)
+def check_minimal_distance(fpath: str) -> MinimalDistance:
+    """Calculates the minimal distance from a given pdb file and prints it with the serial numbers of the closest atoms.
 
-    print(f"Minimal distance: {min_dist:.4f} Å")
+    Args:
+        - `fpath (str)`: Path to pdb file.
+
+    Returns:
+        - `(MinimalDistance)`: Minimal distance and the indices of the closest atom pair.
+    """
+    elements, coords = get_elements_and_coords_from_pdb(fpath)
+
+    result = minimal_distance(coords)
+
+    print(f"Minimal distance: {result.distance:.4f} Å")
+    if result.first >= 0:
+        print(
+            f"Closest atoms: {result.first + 1} ({elements[result.first]}) and {result.second + 1} ({elements[result.second]})"
+        )
+
+    return result
+
+
+def check_close_contacts(
+    fpath: str,
+    cutoff: float = 1.0,
+    outpath: Optional[str] = None,
+    same_residue: bool = True,
+) -> Contacts:
+    """Lists all non-bonded atom pairs of a pdb file closer than `cutoff` and writes them grouped by residue pair to a CSV file.
+       Atoms bonded by CONECT records and 1-3 pairs are excluded, see `close_contacts()`.
+
+    Args:
+        - `fpath (str)`: Path to pdb file.
+        - `cutoff (float)`: Distance below which a pair of atoms is in contact.
+        - `outpath (Optional[str])`: Path to the CSV file. Defaults to None, i.e. the path of the pdb file with the suffix `_contacts.csv`.
+        - `same_residue (bool)`: If True, pairs of atoms of the same residue are included. If False, only pairs of
+          different residues are listed.
+
+    Returns:
+        - `(Contacts)`: Close contacts.
+    """
+    structure = read_pdb(fpath)
+    contacts = close_contacts(structure, cutoff, same_residue=same_residue)
+
+    if outpath is None:
+        outpath = Path(fpath).with_name(f"{Path(fpath).stem}_contacts.csv")
+    write_contacts(structure, contacts, outpath)
+
+    # the contacts are sorted by residue pair, every change starts a new pair
+    residues = structure.residue_numbers
+    firsts, seconds = residues[contacts.first], residues[contacts.second]
+    residue_pairs = int(
+        np.count_nonzero((firsts[1:] != firsts[:-1]) | (seconds[1:] != seconds[:-1]))
+        + (len(firsts) > 0)
+    )
+    print(
+        f"Found {len(contacts.distances)} contacts below {cutoff} Å between {residue_pairs} residue pairs, written to {outpath}."
+    )
+
+    return contacts
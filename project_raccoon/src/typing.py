@@ -2,4 +2,4 @@ from pandas import DataFrame
 from numpy import float64 as float
 from numpy import int32 as int
 
-from typing import List, Dict, Tuple, NamedTuple, Union, Any, Optional
+from typing import List, Dict, Tuple, NamedTuple, Union, Any, Optional, Iterable
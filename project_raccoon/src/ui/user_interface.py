@@ -4,6 +4,7 @@ from ..functions import (
     generate_file,
     pdb_to_xyz,
     check_minimal_distance,
+    check_close_contacts,
     check_pdb_file,
 )
 
@@ -19,6 +20,7 @@ def choose_option() -> str:
             "Check PDB File",
             "Convert PDB to XYZ File",
             "Check Minimal Distance",
+            "Check Close Contacts",
             "Manage Monomers",
             "Exit",
         ],
@@ -102,6 +104,20 @@ def start_racoon(
                 check_minimal_distance(out_file)
                 option = choose_option()
 
+            elif option == "Check Close Contacts":
+                cutoff = text("Enter the contact distance in Å", default="1.0").ask()
+                try:
+                    same_residue = confirm(
+                        "Include atom pairs within a residue?", default=True
+                    ).ask()
+                    check_close_contacts(
+                        out_file, float(cutoff), same_residue=same_residue
+                    )
+                except Exception as e:
+                    console.print(f"Error: {e}", style="bold red")
+
+                option = choose_option()
+
             elif option == "Manage Monomers":
                 sec_option = manage_monomers()
 
@@ -4,7 +4,16 @@ from project_raccoon.src.typing import List, Dict
 
 from project_raccoon.src.util import MONOMERFILE
 
-from project_raccoon.src.data import Monomer, Monomers, Atom
+from project_raccoon.src.data import (
+    Monomer,
+    Monomers,
+    MonomerTemplate,
+    Atom,
+    Sequence,
+    BondGraph,
+    CoordinateBuffer,
+    Structure,
+)
 import numpy as np
 
 import importlib
@@ -210,6 +219,16 @@ class TestMonomerClass(TestCase):
 
         self.assertTrue(inv_monomer.inverted)  # inverted == True
 
+        # the atoms of the inverted monomer are copies, changing them keeps the original monomer
+        self.assertEqual(
+            [atom.to_list() for atom in inv_monomer.atoms],
+            [atom.to_list() for atom in monomer.atoms],
+        )
+        inv_monomer.atoms[0].x += 1.0
+        inv_monomer.atoms[0].neighbours.append(3)
+        self.assertEqual(monomer.atoms[0].x, -0.777)
+        self.assertEqual(monomer.atoms[0].neighbours, [2, 7])
+
     def test_get_atoms_from_bs_file(self) -> None:
         """Tests the get_atoms_from_bs_file method of the monomer class."""
 
@@ -308,6 +327,38 @@ class TestMonomerClass(TestCase):
         self.assertIsInstance(coordinates, np.ndarray)
         self.assertEqual(coordinates.shape, (self.monomer.atom_count, 3))
 
+    def test_template(self) -> None:
+        """Tests the read-only array template of the monomer class."""
+        template = self.monomer.template
+
+        self.assertIsInstance(template, MonomerTemplate)
+        self.assertIs(template, self.monomer.template)
+        self.assertEqual(template.atom_count, self.monomer.atom_count)
+        self.assertTrue(
+            np.array_equal(template.coordinates, self.monomer.coordinates_to_numpy())
+        )
+        self.assertEqual(template.names.tolist(), ["CA", "CB", "O"])
+        self.assertEqual(template.link.tolist(), [2, 0])
+
+        # neighbours relative to the first atom, -1 is the last atom of the previous residue
+        self.assertEqual(
+            template.bonds().tolist(), [[0, 1], [0, -1], [1, 0], [1, 2], [2, 3], [2, 7]]
+        )
+
+        with self.assertRaises(ValueError):
+            template.coordinates[0, 0] = 1.0
+
+        # templates do not depend on the atom indices of updated monomers
+        updated_template = self.monomer.update(10, [1.0, 0.0, 0.0]).template
+        self.assertTrue(np.array_equal(updated_template.bonds(), template.bonds()))
+        self.assertTrue(
+            np.allclose(
+                updated_template.coordinates[:, 0], template.coordinates[:, 0] + 1
+            )
+        )
+
+        self.assertEqual(template.invert().link.tolist(), [0, 2])
+
     def test_get_explicit_links(self) -> List[List[int]]:
         """Tests the get_explicit_links method of the monomer class."""
         links = self.monomer.get_explicit_links()
@@ -401,3 +452,156 @@ class TestMonomersClass(TestCase):
         self.assertTrue(peo.name + "_" + peo.resolution in d.keys())
 
         self.assertTrue(peo in self.monomers)
+        self.assertEqual(self.monomers.index(peo), len(self.monomers) - 1)
+
+        self.monomers.remove_monomer(self.monomers[0])
+        self.assertEqual(self.monomers.index(peo), len(self.monomers) - 1)
+        self.assertEqual(
+            self.monomers.index({"name": name, "resolution": resolution}),
+            len(self.monomers) - 1,
+        )
+
+        self.monomers.remove_monomer(peo)
+        self.assertFalse(peo in self.monomers)
+        self.assertFalse({"name": name, "resolution": resolution} in self.monomers)
+        with self.assertRaises(ValueError):
+            self.monomers.index(peo)
+
+    def test_inverted_template(self) -> None:
+        """Tests that inverted templates are cached until monomers are added or removed."""
+        index = next(i for i, m in enumerate(self.monomers) if not m.polymer)
+        monomer = self.monomers[index]
+
+        template = self.monomers.inverted_template(index)
+        self.assertIs(self.monomers.inverted_template(index), template)
+        self.assertEqual(template.link.tolist(), monomer.template.link[::-1].tolist())
+        self.assertTrue(
+            np.array_equal(template.coordinates, monomer.template.coordinates)
+        )
+
+        self.monomers.remove_monomer(self.monomers[-1])
+        self.assertIsNot(self.monomers.inverted_template(index), template)
+
+        with self.assertRaises(ValueError):
+            self.monomers.inverted_template(
+                next(i for i, m in enumerate(self.monomers) if m.polymer)
+            )
+
+
+class TestStructs(TestCase):
+    """Test the data structures of the structs module."""
+
+    def test_sequence_atom_count(self) -> None:
+        """Tests the total atom count of a sequence."""
+        monomers = Monomers.from_json()
+        sequence = Sequence([0, 1], [False, False], [1, 3])
+
+        self.assertEqual(
+            sequence.atom_count(monomers),
+            monomers[0].atom_count + 3 * monomers[1].atom_count,
+        )
+
+    def test_bond_graph(self) -> None:
+        """Tests the CSR bond graph with duplicate, reversed and self bonds."""
+        graph = BondGraph.from_edges(
+            np.array([[1, 0], [0, 1], [2, 1], [3, 1], [3, 3], [1, 2]]), 5
+        )
+
+        self.assertEqual(graph.edges.tolist(), [[0, 1], [1, 2], [1, 3]])
+        self.assertEqual(graph.indptr.tolist(), [0, 1, 4, 5, 6, 6])
+        self.assertEqual(graph.indices.tolist(), [1, 0, 2, 3, 1, 1])
+        self.assertEqual(graph.indptr.dtype, np.int32)
+        self.assertEqual(graph.indices.dtype, np.int32)
+        self.assertEqual(graph.degrees.tolist(), [1, 3, 1, 1, 0])
+        self.assertEqual(graph.neighbours(1).tolist(), [0, 2, 3])
+        self.assertEqual(graph.atom_count, 5)
+
+        empty = BondGraph.from_edges(np.empty((0, 2), dtype=np.int64), 3)
+        self.assertEqual(empty.indptr.tolist(), [0, 0, 0, 0])
+        self.assertEqual(empty.edges.shape, (0, 2))
+
+        with self.assertRaises(ValueError):
+            BondGraph.from_edges(np.array([[0, 5]]), 5)
+
+    def test_coordinate_buffer(self) -> None:
+        """Tests filling and growing the coordinate buffer."""
+        buffer = CoordinateBuffer(capacity=4)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(buffer.to_numpy().shape, (0, 3))
+
+        points = np.arange(30, dtype=float).reshape(10, 3)
+        buffer.append(points[:3])
+        self.assertEqual(buffer.capacity, 4)
+
+        buffer.append(points[3:])
+        self.assertEqual(len(buffer), 10)
+        self.assertGreaterEqual(buffer.capacity, 10)
+        self.assertTrue(np.array_equal(buffer.to_numpy(), points))
+        self.assertTrue(np.array_equal(buffer[2:4], points[2:4]))
+
+    def test_exclusions(self) -> None:
+        """Tests the 1-2 and 1-3 pairs over the explicit bonds and the links of a structure."""
+        structure = Structure(
+            coordinates=np.zeros((5, 3)),
+            names=np.array(["C"] * 5),
+            elements=np.array(["C"] * 5),
+            residue_names=np.array(["A", "A", "A", "B", "B"]),
+            residue_numbers=np.array([1, 1, 1, 2, 2]),
+            bonds=np.array([[0, 1], [1, 2], [3, 4]]),
+            links=np.array([[2, 3]]),
+        )
+
+        self.assertEqual(
+            structure.exclusions().tolist(),
+            [[0, 1], [0, 2], [1, 2], [1, 3], [2, 3], [2, 4], [3, 4]],
+        )
+
+    def test_from_runs(self) -> None:
+        """Tests that runs of repeated residues create the same structure as the single residues."""
+        monomers = Monomers.from_json()
+        first, second = monomers[0].template, monomers[4].invert().template
+        templates = [first] * 3 + [second] * 2
+        atom_count = sum(t.atom_count for t in templates)
+
+        structure = Structure.from_runs(
+            [(first, 3), (second, 2)], np.zeros((atom_count, 3))
+        )
+        self.assertTrue(
+            np.array_equal(
+                Structure.from_templates(templates, np.zeros((atom_count, 3))).bonds,
+                structure.bonds,
+            )
+        )
+
+        offsets = np.cumsum([0] + [t.atom_count for t in templates])
+        bonds = {
+            tuple(sorted(bond))
+            for t, offset in zip(templates, offsets)
+            for bond in (t.bonds() + offset).tolist()
+            if min(bond) >= 0 and max(bond) < atom_count and bond[0] != bond[1]
+        }
+        links = np.concatenate([t.link + o for t, o in zip(templates, offsets)])
+
+        self.assertEqual(set(map(tuple, structure.bonds.tolist())), bonds)
+        self.assertEqual(
+            structure.links.tolist(), np.stack((links[:-1], links[1:]), 1).tolist()
+        )
+        self.assertEqual(
+            structure.names.tolist(),
+            np.concatenate([t.names for t in templates]).tolist(),
+        )
+        self.assertEqual(structure.residue_count, 5)
+        self.assertEqual(structure.residue_names[-1], second.name)
+
+        # the neighbours of CSX list one atom itself, which is no bond
+        csx = monomers[10].template
+        structure = Structure.from_runs([(csx, 2)], np.zeros((2 * csx.atom_count, 3)))
+        self.assertTrue(np.any(csx.bonds()[:, 0] == csx.bonds()[:, 1]))
+        self.assertFalse(np.any(structure.bonds[:, 0] == structure.bonds[:, 1]))
+
+    def test_atom_slots(self) -> None:
+        """Tests that atoms do not carry an instance dictionary."""
+        atom = Atom("C", "C", 0.0, 0.0, 0.0, [2], 1)
+        self.assertFalse(hasattr(atom, "__dict__"))
+        with self.assertRaises(AttributeError):
+            atom.charge = 0.0
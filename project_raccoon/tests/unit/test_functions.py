@@ -1,23 +1,53 @@
 from contextlib import AbstractContextManager
 from typing import Any
 from unittest import TestCase
+from unittest.mock import patch
 
 from project_raccoon.src.functions import (
     generate_file,
     generate_sequence,
     calc_minimal_distance,
+    minimal_distance,
+    check_minimal_distance,
     get_elements_and_coords_from_pdb,
     get_links_from_pdb,
     pdb_to_xyz,
+    CellList,
+    KDTreeIndex,
+    BoundingSphereIndex,
+    ClashThresholds,
+    build_structure,
+    write_pdb,
+    generate_ensemble,
+    build_box,
+    PeriodicCellList,
+    relax_structure,
+    read_pdb,
+    read_pdb_atoms,
+    read_bond_graph,
+    close_contacts,
+    check_close_contacts,
+)
+from project_raccoon.src.functions.ensemble import ensemble_paths
+from project_raccoon.src.functions.standard import (
+    get_semi_random_walk_shift,
+    get_rand_shift,
+    grow_chain,
+    grow_chain_rosenbluth,
+    GrowthError,
+    soft_weights,
+    AdaptiveShift,
+    get_rand_rotation,
+    _residue_runs,
 )
-from project_raccoon.src.functions.standard import get_semi_random_walk_shift
 
 from project_raccoon.src.typing import List, Dict, Tuple, NamedTuple
 
-from project_raccoon.src.data import Monomer, Monomers, Sequence, Atom
+from project_raccoon.src.data import Monomer, Monomers, Sequence, Atom, Structure
 from collections import namedtuple
 
 from pathlib import Path
+from scipy.spatial.distance import cdist
 
 import numpy as np
 
@@ -135,6 +165,40 @@ class TestFunctions(TestCase):
 
         self.assertTrue(min_dist >= trr)
 
+    def test_srw_batched(self) -> None:
+        """Tests the batched semi random walk shift with coordinates and a collision index."""
+
+        trr = 1
+        shift_conf = [-1, 1, -1, 1, -1, 1, 1]
+        monomer = self.monomers[self.seq.index[1]]
+
+        shifts = get_rand_shift(*shift_conf, size=8)
+        self.assertEqual(shifts.shape, (8, 3))
+        self.assertEqual(get_rand_shift(*shift_conf).shape, (3,))
+
+        rng = np.random.default_rng(0)
+        coordinates = rng.uniform(-6, 6, size=(100, 3))
+        cell_list = CellList(cutoff=trr)
+        cell_list.add(coordinates)
+
+        for placed_atoms in [coordinates, cell_list]:
+            m = get_semi_random_walk_shift(
+                placed_atoms,
+                monomer,
+                trr=trr,
+                cshift=np.zeros(3),
+                shift_conf=shift_conf,
+                batch_size=16,
+            )
+
+            self.assertIsInstance(m, np.ndarray)
+            self.assertEqual(m.shape, (3,))
+
+            min_dist = calc_minimal_distance(
+                coordinates, monomer.coordinates_to_numpy() + m
+            )
+            self.assertTrue(min_dist >= trr)
+
     def test_calc_minimal_distance(self) -> None:
         """Tests the minimal distance function with a known set of coordinates."""
 
@@ -148,6 +212,751 @@ class TestFunctions(TestCase):
         min_dist = calc_minimal_distance(coordinates[:-1], coordinates[-1:])
         self.assertAlmostEqual(min_dist, 4.69041575982343)
 
+    def test_minimal_distance(self) -> None:
+        """Tests the chunked minimal distance and the closest atom pair against the distance matrix."""
+
+        coordinates = np.random.default_rng(11).uniform(0, 20, size=(2000, 3))
+        coordinates[1500] = coordinates[10]
+
+        result = minimal_distance(coordinates, chunk_size=300)
+        self.assertAlmostEqual(
+            result.distance, calc_minimal_distance(coordinates, coordinates)
+        )
+        self.assertAlmostEqual(
+            np.linalg.norm(coordinates[result.first] - coordinates[result.second]),
+            result.distance,
+        )
+        self.assertLess(result.first, result.second)
+
+        self.assertEqual(minimal_distance(coordinates[:1]).first, -1)
+        self.assertEqual(minimal_distance(np.zeros((3, 3))).distance, np.inf)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outpath = Path(tmpdir) / self.out_file_name
+            generate_file(self.monomers, self.seq, False, outpath)
+            _, coords = get_elements_and_coords_from_pdb(outpath)
+            result = check_minimal_distance(outpath)
+
+        self.assertAlmostEqual(result.distance, calc_minimal_distance(coords, coords))
+
+    def test_close_contacts(self) -> None:
+        """Tests the close contacts against the distance matrix and the round trip of the structure through a pdb file."""
+
+        structure = build_structure(self.monomers, self.seq)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outpath = Path(tmpdir) / self.out_file_name
+            write_pdb(structure, outpath, explicit_bonds=True)
+            read = read_pdb(outpath)
+            contacts = check_close_contacts(outpath, cutoff=3.0)
+            rows = (Path(tmpdir) / f"{outpath.stem}_contacts.csv").read_text()
+
+        np.testing.assert_allclose(read.coordinates, structure.coordinates, atol=1e-3)
+        np.testing.assert_array_equal(read.names, structure.names)
+        np.testing.assert_array_equal(read.residue_names, structure.residue_names)
+        bonds = np.concatenate((structure.bonds, structure.links))
+        bonds = np.unique(np.sort(bonds, axis=1), axis=0)
+        np.testing.assert_array_equal(read.bonds, bonds)
+
+        distances = cdist(structure.coordinates, structure.coordinates)
+        residues = structure.residue_numbers
+        excluded = {tuple(pair) for pair in structure.exclusions().tolist()}
+        expected = {
+            (i, j)
+            for i, j in zip(*np.nonzero(np.triu(distances < 3.0, k=1)))
+            if (i, j) not in excluded
+        }
+
+        result = close_contacts(structure, 3.0)
+        self.assertEqual(
+            set(zip(result.first.tolist(), result.second.tolist())), expected
+        )
+        other = close_contacts(structure, 3.0, same_residue=False)
+        self.assertEqual(
+            set(zip(other.first.tolist(), other.second.tolist())),
+            {(i, j) for i, j in expected if residues[i] != residues[j]},
+        )
+        # the coordinates in the file are rounded, so the file is compared with the structure read from it
+        np.testing.assert_array_equal(contacts.first, close_contacts(read, 3.0).first)
+        np.testing.assert_allclose(
+            result.distances, distances[result.first, result.second]
+        )
+        self.assertTrue(np.all(np.diff(residues[result.first]) >= 0))
+
+        self.assertEqual(len(rows.splitlines()), len(contacts.first) + 1)
+        self.assertTrue(rows.startswith("residue_1,residue_name_1,residue_2"))
+
+        with self.assertRaises(ValueError):
+            close_contacts(structure, 0)
+
+        # a small negative coordinate wraps to the edge of the cell by round-off
+        structure.box = np.array([10.0, 10.0, 10.0])
+        structure.coordinates = structure.coordinates.copy()
+        structure.coordinates[0] = [-1e-17, 0.0, 0.0]
+        close_contacts(structure, 3.0)
+
+    def test_close_contacts_wrapped_serials(self) -> None:
+        """Tests the close contacts of a file with more than 99999 atoms, whose serial numbers wrap around."""
+
+        atom_count = 110000
+        rng = np.random.default_rng(3)
+        coordinates = np.cumsum(rng.normal(0, 0.9, size=(atom_count, 3)), axis=0) % 150
+        chain = np.stack((np.arange(atom_count - 1), np.arange(1, atom_count)), axis=1)
+        structure = Structure(
+            coordinates=coordinates,
+            names=np.full(atom_count, "C"),
+            elements=np.full(atom_count, "C"),
+            residue_names=np.full(atom_count, "PEO"),
+            residue_numbers=np.arange(atom_count) // 7 + 1,
+            bonds=chain[: atom_count // 2],
+            links=chain[atom_count // 2 :],
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outpath = Path(tmpdir) / self.out_file_name
+            write_pdb(structure, outpath, explicit_bonds=True)
+            read = read_pdb(outpath)
+            contacts = check_close_contacts(outpath, cutoff=1.0)
+            links = get_links_from_pdb(outpath)
+
+        np.testing.assert_array_equal(read.bonds, chain)
+        np.testing.assert_array_equal(links, (chain + 1) % 100000)
+        expected = close_contacts(read, 1.0)
+        np.testing.assert_array_equal(contacts.first, expected.first)
+        np.testing.assert_array_equal(contacts.second, expected.second)
+        self.assertTrue(np.any(contacts.second >= 100000))
+
+    def test_read_pdb_atoms(self) -> None:
+        """Tests the fixed column reader with touching columns, line breaks of different platforms, chunks and models."""
+
+        records = [
+            "CRYST1   10.000   20.000   30.000  90.00  90.00  90.00 P 1           1",
+            "MODEL        1",
+            "ATOM  99999  CA  ALA A   1    -123.456-234.567-345.678  1.00  0.00           C",
+            "HETATM    2  OW  HOH B1000       1.000   2.000   3.000",
+            "TER",
+            "ENDMDL",
+            "MODEL        2",
+            "ATOM      5  N   ALA A   1       1.000   2.000   3.000  1.00  0.00           N",
+            "ENDMDL",
+            "CONECT99999    2",
+            "END",
+        ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fpath = Path(tmpdir) / self.out_file_name
+            for newline in ("\n", "\r\n"):
+                fpath.write_bytes(newline.join(records).encode())
+
+                for chunk_size in (7, 1 << 20):
+                    for memory_map in (False, True):
+                        atoms = read_pdb_atoms(fpath, chunk_size, memory_map)
+
+                        np.testing.assert_array_equal(atoms.serials, [99999, 2])
+                        np.testing.assert_array_equal(atoms.names, ["CA", "OW"])
+                        np.testing.assert_array_equal(
+                            atoms.residue_names, ["ALA", "HOH"]
+                        )
+                        np.testing.assert_array_equal(atoms.chains, ["A", "B"])
+                        np.testing.assert_array_equal(atoms.residue_numbers, [1, 1000])
+                        np.testing.assert_array_equal(
+                            atoms.coordinates,
+                            [[-123.456, -234.567, -345.678], [1.0, 2.0, 3.0]],
+                        )
+                        np.testing.assert_array_equal(atoms.elements, ["C", "O"])
+
+            structure = read_pdb(fpath, chunk_size=16)
+            np.testing.assert_array_equal(structure.bonds, [[0, 1]])
+            np.testing.assert_array_equal(structure.box, [10.0, 20.0, 30.0])
+            np.testing.assert_array_equal(structure.residue_numbers, [1, 2])
+
+            fpath.write_text(records[2].replace("-234.567", "-234.5x7"))
+            with self.assertRaises(ValueError):
+                read_pdb_atoms(fpath)
+
+            fpath.write_text("")
+            self.assertEqual(len(read_pdb_atoms(fpath, memory_map=True).serials), 0)
+
+        with self.assertRaises(ValueError):
+            read_pdb_atoms(fpath, chunk_size=0)
+
+    def test_cell_list(self) -> None:
+        """Tests the cell list against the brute force minimal distance."""
+
+        rng = np.random.default_rng(42)
+        placed = rng.uniform(-5, 5, size=(500, 3))
+        trial = rng.uniform(-5, 5, size=(10, 3))
+
+        cell_list = CellList(cutoff=1.0, capacity=16)
+        for chunk in np.array_split(placed, 7):
+            cell_list.add(chunk)
+
+        self.assertEqual(len(cell_list), len(placed))
+
+        min_dist = calc_minimal_distance(placed, trial)
+        self.assertTrue(min_dist < 1.0)
+        self.assertAlmostEqual(cell_list.min_distance(trial), min_dist)
+        self.assertTrue(cell_list.clashes(trial))
+
+        far_away = trial + 100
+        self.assertEqual(cell_list.min_distance(far_away), np.inf)
+        self.assertFalse(cell_list.clashes(far_away))
+
+        with self.assertRaises(ValueError):
+            CellList(cutoff=0)
+
+    def test_periodic_cell_list(self) -> None:
+        """Tests the periodic cell list against the brute force minimum image distances."""
+
+        rng = np.random.default_rng(42)
+        box = np.array([6.0, 7.5, 9.0])
+        placed = rng.uniform(0, 1, size=(300, 3)) * box
+        # unwrapped coordinates of the trial points
+        trial = rng.uniform(-2, 3, size=(40, 3)) * box
+
+        cell_list = PeriodicCellList(cutoff=1.0, box=box, capacity=16)
+        for chunk in np.array_split(placed, 5):
+            cell_list.add(chunk)
+
+        delta = placed[:, None, :] - trial[None, :, :]
+        delta -= box * np.round(delta / box)
+        distances = np.linalg.norm(delta, axis=2)
+
+        self.assertAlmostEqual(cell_list.min_distance(trial), distances.min())
+        self.assertTrue(
+            np.array_equal(cell_list.clashing(trial), np.any(distances < 1.0, axis=0))
+        )
+
+        cell_list.truncate(100)
+        self.assertTrue(
+            np.array_equal(
+                cell_list.clashing(trial), np.any(distances[:100] < 1.0, axis=0)
+            )
+        )
+
+        with self.assertRaises(ValueError):
+            PeriodicCellList(cutoff=1.0, box=[1.0, 0.0, 1.0])
+
+    def test_kdtree_index(self) -> None:
+        """Tests the KD-tree index with a tree and a brute force tail against the brute force minimal distance."""
+
+        rng = np.random.default_rng(42)
+        placed = rng.uniform(-5, 5, size=(500, 3))
+
+        kdtree = KDTreeIndex(cutoff=1.0, rebuild_every=3)
+        for chunk in np.array_split(placed, 10):
+            kdtree.add(chunk)
+
+        self.assertEqual(len(kdtree), len(placed))
+
+        for _ in range(20):
+            trial = rng.uniform(-5, 5, size=(3, 3))
+            min_dist = calc_minimal_distance(placed, trial)
+            self.assertEqual(kdtree.clashes(trial), min_dist < 1.0)
+            if min_dist < 1.0:
+                self.assertAlmostEqual(kdtree.min_distance(trial), min_dist)
+
+        with self.assertRaises(ValueError):
+            KDTreeIndex(cutoff=1.0, rebuild_every=0)
+
+    def test_bounding_sphere_index(self) -> None:
+        """Tests that the bounding sphere index only checks the atoms of nearby residues."""
+
+        residue = np.random.default_rng(5).uniform(-1, 1, size=(10, 3))
+        index = BoundingSphereIndex(cutoff=1.0)
+        for i in range(50):
+            index.add(residue + [4.0 * i, 0, 0])
+
+        self.assertEqual(index.residue_count, 50)
+
+        trial = residue + [100.0, 3.0, 0]
+        self.assertEqual(
+            set(index.neighbours(trial).tolist()) - set(range(230, 270)), set()
+        )
+        min_dist = calc_minimal_distance(index.points, trial)
+        self.assertEqual(index.clashes(trial), min_dist < 1.0)
+        self.assertTrue(len(index.neighbours(residue + [0, 50.0, 0])) == 0)
+
+        index.truncate(205)
+        self.assertEqual(index.residue_count, 21)
+        self.assertEqual(len(index.neighbours(trial)), 0)
+
+    def test_collision_index_truncate(self) -> None:
+        """Tests that truncated collision indices behave like indices of the kept atoms."""
+
+        rng = np.random.default_rng(7)
+        placed = rng.uniform(-5, 5, size=(300, 3))
+        trials = rng.uniform(-5, 5, size=(50, 3))
+
+        for index in [
+            CellList(cutoff=1.0),
+            KDTreeIndex(cutoff=1.0, rebuild_every=2),
+            BoundingSphereIndex(cutoff=1.0, capacity=2),
+        ]:
+            for chunk in np.array_split(placed, 10):
+                index.add(chunk)
+
+            index.truncate(100)
+            self.assertEqual(len(index), 100)
+
+            expected = np.any(cdist(placed[:100], trials) < 1.0, axis=0)
+            self.assertTrue(np.array_equal(index.clashing(trials), expected))
+
+            index.add(placed[100:])
+            self.assertEqual(len(index), 300)
+
+    def test_generate_file_minimal_distance(self) -> None:
+        """Tests that the generated structure respects the threshold of the semi random walk for all collision backends."""
+
+        trr = 1
+        atom_count = sum(
+            self.monomers[index].atom_count * reps
+            for index, reps in zip(self.seq.index, self.seq.reps)
+        )
+
+        for backend in ["grid", "kdtree", "spheres"]:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                outpath = Path(tmpdir) / self.out_file_name
+                generate_file(
+                    self.monomers,
+                    self.seq,
+                    False,
+                    outpath,
+                    trr=trr,
+                    collision_backend=backend,
+                )
+                _, coords = get_elements_and_coords_from_pdb(outpath)
+
+            self.assertEqual(len(coords), atom_count)
+            self.assertTrue(calc_minimal_distance(coords, coords) >= trr - 1e-3)
+
+        with self.assertRaises(ValueError):
+            generate_file(
+                self.monomers, self.seq, False, "out.pdb", collision_backend="octree"
+            )
+
+    def test_close_pairs(self) -> None:
+        """Tests the close pairs of all collision indices against brute force."""
+
+        rng = np.random.default_rng(3)
+        placed = rng.uniform(0, 6, size=(400, 3))
+        trial = rng.uniform(0, 6, size=(30, 3))
+        box = np.full(3, 6.0)
+
+        distances = cdist(trial, placed)
+        delta = trial[:, None, :] - placed[None, :, :]
+        delta -= box * np.round(delta / box)
+        periodic = np.linalg.norm(delta, axis=2)
+
+        indices = [
+            (CellList(cutoff=1.5), distances),
+            (KDTreeIndex(cutoff=1.5, rebuild_every=3), distances),
+            (PeriodicCellList(cutoff=1.5, box=box), periodic),
+            (BoundingSphereIndex(cutoff=1.5), distances),
+        ]
+
+        for index, expected in indices:
+            for chunk in np.array_split(placed, 7):
+                index.add(chunk)
+
+            points, atoms, pair_distances = index.close_pairs(trial)
+            self.assertEqual(
+                set(zip(points.tolist(), atoms.tolist())),
+                set(zip(*[i.tolist() for i in np.nonzero(expected < 1.5)])),
+            )
+            self.assertTrue(np.allclose(pair_distances, expected[points, atoms]))
+
+    def test_soft_weights(self) -> None:
+        """Tests the soft repulsion weights of trial placements."""
+
+        placed = CellList(cutoff=2.0)
+        placed.add(np.zeros((1, 3)))
+
+        residue = np.array([[0.0, 0.0, 0.0], [0.5, 0.0, 0.0]])
+        shifts = np.array([[0.3, 0, 0], [1.5, 0, 0], [5.0, 0, 0]])
+        weights = soft_weights(placed, residue[None] + shifts[:, None], trr=1.0)
+
+        self.assertEqual(weights[0], 0)
+        self.assertAlmostEqual(weights[1], np.exp(-((1 - 1.5 / 2) ** 2)))
+        self.assertEqual(weights[2], 1)
+
+    def test_grow_chain_rosenbluth(self) -> None:
+        """Tests growing chains with configurational bias with and without pruning and enrichment."""
+
+        trr = 1
+        atom_count = self.seq.atom_count(self.monomers)
+
+        for perm in [False, True]:
+            structure, statistics = grow_chain_rosenbluth(
+                self.monomers,
+                self.seq,
+                trr=trr,
+                perm=perm,
+                rng=np.random.default_rng(5),
+            )
+
+            self.assertEqual(structure.atom_count, atom_count)
+            self.assertTrue(np.isfinite(statistics.log_weight))
+
+            # atoms of different residues respect the threshold
+            distances = cdist(structure.coordinates, structure.coordinates)
+            different = structure.residue_numbers[:, None] != structure.residue_numbers
+            self.assertTrue(np.all(distances[different] >= trr))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outpath = Path(tmpdir) / self.out_file_name
+            statistics = generate_file(
+                self.monomers, self.seq, False, outpath, growth="perm"
+            )
+            _, coords = get_elements_and_coords_from_pdb(outpath)
+
+        self.assertEqual(len(coords), atom_count)
+        self.assertIsNotNone(statistics.log_weight)
+
+        with self.assertRaises(ValueError):
+            build_structure(self.monomers, self.seq, growth="pivot")
+
+    def test_grow_chain_perm_obstacles(self) -> None:
+        """Tests that pruned-enriched chains grow between random obstacles, where the semi random walk runs into dead ends."""
+
+        seq = Sequence([1], [False], [40])
+        grown = {grow_chain: 0, grow_chain_rosenbluth: 0}
+
+        for function, options in [
+            (grow_chain, dict()),
+            (grow_chain_rosenbluth, dict(perm=True)),
+        ]:
+            for seed in range(4):
+                rng = np.random.default_rng(seed)
+                obstacles = CellList(cutoff=1.5, capacity=4096)
+                obstacles.add(rng.uniform(-20, 20, size=(2560, 3)))
+
+                try:
+                    function(
+                        self.monomers,
+                        seq,
+                        max_backtracks=20,
+                        rng=rng,
+                        placed_atoms=obstacles,
+                        **options,
+                    )
+                    grown[function] += 1
+                except GrowthError:
+                    pass
+
+        self.assertEqual(grown[grow_chain_rosenbluth], 4)
+        self.assertGreater(grown[grow_chain_rosenbluth], grown[grow_chain])
+
+    def test_adaptive_shift(self) -> None:
+        """Tests that the adaptive controller widens and narrows the shifts within its bounds."""
+
+        controller = AdaptiveShift(target_iterations=4, min_scale=0.5, max_scale=2.0)
+        self.assertEqual(
+            controller.shift_conf([-1, 1, -1, 1, -1, 1, 3]), [-1, 1, -1, 1, -1, 1, 3]
+        )
+
+        for _ in range(100):
+            controller.update(16, 0)
+        self.assertEqual(controller.scale, 2.0)
+        self.assertEqual(
+            controller.shift_conf([-1, 1, -1, 1, -1, 1, 3]), [-2, 2, -2, 2, -1, 1, 6]
+        )
+
+        for _ in range(100):
+            controller.update(16, 16)
+        self.assertEqual(controller.scale, 0.5)
+
+        with self.assertRaises(ValueError):
+            AdaptiveShift(min_scale=2.0)
+
+        # too small shifts are widened, so that the chain can be grown without restarts
+        controller = AdaptiveShift()
+        structure, _ = grow_chain(
+            self.monomers,
+            self.seq,
+            damping_factor=0.05,
+            rng=np.random.default_rng(0),
+            adaptive=controller,
+        )
+        self.assertEqual(structure.atom_count, self.seq.atom_count(self.monomers))
+        self.assertGreater(controller.scale, 1.0)
+
+    def test_residue_runs(self) -> None:
+        """Tests that repeated blocks share one template per monomer and orientation."""
+
+        sequence = Sequence(
+            [0, 0, 4, 0, 4], [False, False, True, False, True], [2, 3, 4, 1, 5]
+        )
+        runs = _residue_runs(self.monomers, sequence)
+
+        self.assertEqual([reps for _, reps in runs], [5, 4, 1, 5])
+        self.assertIs(runs[0][0], runs[2][0])
+        self.assertIs(runs[1][0], runs[3][0])
+        self.assertEqual(
+            runs[1][0].link.tolist(), self.monomers[4].template.link[::-1].tolist()
+        )
+
+    def test_rotational_sampling(self) -> None:
+        """Tests random rotations and chains grown with rotated residues."""
+
+        rotations = get_rand_rotation(size=100, rng=np.random.default_rng(0))
+        self.assertEqual(rotations.shape, (100, 3, 3))
+        np.testing.assert_allclose(
+            rotations @ rotations.transpose(0, 2, 1),
+            np.broadcast_to(np.eye(3), (100, 3, 3)),
+            atol=1e-12,
+        )
+        np.testing.assert_allclose(np.linalg.det(rotations), 1.0)
+        self.assertEqual(get_rand_rotation().shape, (3, 3))
+
+        for grow, kwargs in (
+            (grow_chain, dict(batch_size=1)),
+            (grow_chain, dict()),
+            (grow_chain_rosenbluth, dict()),
+        ):
+            structure, _ = grow(
+                self.monomers,
+                self.seq,
+                rng=np.random.default_rng(1),
+                rotate=True,
+                **kwargs,
+            )
+            self.assertEqual(structure.atom_count, self.seq.atom_count(self.monomers))
+
+            # the residues are rigid, only their orientation changes
+            start = 0
+            for index, reps in zip(self.seq.index, self.seq.reps):
+                template = self.monomers[index].template
+                for _ in range(reps):
+                    coordinates = structure.coordinates[
+                        start : start + template.atom_count
+                    ]
+                    np.testing.assert_allclose(
+                        cdist(coordinates, coordinates),
+                        cdist(template.coordinates, template.coordinates),
+                        atol=1e-9,
+                    )
+                    start += template.atom_count
+
+            residues = structure.residue_numbers
+            distances = cdist(structure.coordinates, structure.coordinates)
+            self.assertGreaterEqual(
+                np.min(distances[residues[:, None] != residues[None, :]]), 1.0 - 1e-9
+            )
+
+    def test_clash_thresholds(self) -> None:
+        """Tests element-pair thresholds and the chains grown with them."""
+
+        thresholds = ClashThresholds(scale=0.5, pairs={("H", "O"): 0.9})
+        h, c, o = thresholds.types(["H", "C", "O"])
+        self.assertAlmostEqual(thresholds.matrix[c, c], 1.7)
+        self.assertAlmostEqual(thresholds.matrix[h, c], 1.45)
+        self.assertEqual(thresholds.matrix[o, h], 0.9)
+        self.assertAlmostEqual(thresholds.cutoff(np.array([h, c])), 1.7)
+
+        with self.assertRaises(ValueError):
+            thresholds.types(["Xx"])
+        self.assertEqual(ClashThresholds(radii={"Xx": 1.0}).types(["Xx"]).shape, (1,))
+
+        # a hydrogen atom may come closer than a carbon atom, bonded pairs are excluded
+        index = CellList(cutoff=1.7)
+        index.add(np.zeros((2, 3)), types=np.array([h, c]))
+        points = np.array([[1.3, 0, 0], [1.3, 0, 0], [0, 1.6, 0]])
+        self.assertEqual(
+            index.clashing_pairs(
+                points, np.array([h, c, h]), thresholds.matrix
+            ).tolist(),
+            [True, True, False],
+        )
+        self.assertEqual(
+            index.clashing_pairs(
+                points,
+                np.array([h, c, h]),
+                thresholds.matrix,
+                np.array([[0, 1], [1, 1]]),
+            ).tolist(),
+            [True, False, False],
+        )
+
+        thresholds = ClashThresholds()
+        structure, _ = grow_chain(
+            self.monomers, self.seq, rng=np.random.default_rng(0), thresholds=thresholds
+        )
+        self.assertEqual(structure.atom_count, self.seq.atom_count(self.monomers))
+
+        types = thresholds.types(structure.elements)
+        residues = structure.residue_numbers
+        excluded = np.zeros((structure.atom_count, structure.atom_count), dtype=bool)
+        excluded[tuple(structure.exclusions().T)] = True
+        excluded |= excluded.T
+
+        distances = cdist(structure.coordinates, structure.coordinates)
+        checked = (residues[:, None] != residues[None, :]) & ~excluded
+        self.assertTrue(
+            np.all(
+                distances[checked]
+                >= thresholds.matrix[types[:, None], types[None, :]][checked] - 1e-9
+            )
+        )
+
+        with self.assertRaises(ValueError):
+            build_structure(
+                self.monomers, self.seq, growth="rosenbluth", thresholds=thresholds
+            )
+
+    def test_grow_chain_backtracking(self) -> None:
+        """Tests that a failed semi random walk step only undoes the last residues."""
+
+        walk = get_semi_random_walk_shift
+        calls = list()
+
+        def failing_walk(*args, **kwargs):
+            calls.append(len(args[0]))
+            # the sixth step fails once
+            return False if len(calls) == 6 else walk(*args, **kwargs)
+
+        # fixed seed, so that the walk itself does not fail
+        np.random.seed(1)
+        with patch(
+            "project_raccoon.src.functions.standard.get_semi_random_walk_shift",
+            side_effect=failing_walk,
+        ):
+            structure, statistics = grow_chain(
+                self.monomers, self.seq, backtrack_depth=2
+            )
+
+        self.assertEqual(structure.residue_count, sum(self.seq.reps))
+        self.assertEqual(structure.atom_count, self.seq.atom_count(self.monomers))
+        self.assertEqual(statistics.backtracks, 1)
+        self.assertEqual(statistics.residues_undone, 2)
+        self.assertEqual(statistics.max_depth, 2)
+
+        # the walk is continued from the fourth residue with the atoms of three residues placed
+        self.assertEqual(calls[6], calls[3])
+
+        with patch(
+            "project_raccoon.src.functions.standard.get_semi_random_walk_shift",
+            return_value=False,
+        ), self.assertRaises(Exception):
+            grow_chain(self.monomers, self.seq, max_backtracks=5)
+
+    def test_build_structure(self) -> None:
+        """Tests building a structure in memory and writing it to a PDB file."""
+
+        structure = build_structure(self.monomers, self.seq)
+        atom_count = self.seq.atom_count(self.monomers)
+
+        self.assertIsInstance(structure, Structure)
+        self.assertEqual(structure.atom_count, atom_count)
+        self.assertEqual(structure.residue_count, sum(self.seq.reps))
+        self.assertEqual(structure.coordinates.shape, (atom_count, 3))
+        self.assertEqual(structure.elements.shape, (atom_count,))
+        self.assertEqual(structure.names.shape, (atom_count,))
+        self.assertEqual(structure.residue_names.shape, (atom_count,))
+        self.assertEqual(structure.residue_numbers[0], 1)
+
+        self.assertEqual(structure.bonds.shape[1], 2)
+        self.assertTrue(np.all(structure.bonds[:, 0] < structure.bonds[:, 1]))
+        self.assertTrue(np.all((structure.bonds >= 0) & (structure.bonds < atom_count)))
+        self.assertEqual(structure.links.shape[1], 2)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outpath = Path(tmpdir) / self.out_file_name
+            write_pdb(structure, outpath, explicit_bonds=True)
+            elements, coords = get_elements_and_coords_from_pdb(outpath)
+            links = get_links_from_pdb(outpath)
+
+        self.assertEqual(elements, structure.elements.tolist())
+        self.assertTrue(np.allclose(coords, structure.coordinates, atol=1e-3))
+        self.assertEqual(len(links), len(structure.bonds) + len(structure.links))
+
+    def test_atom_views(self) -> None:
+        """Tests the atom views of a structure."""
+
+        structure = build_structure(self.monomers, self.seq)
+        atom = structure[1]
+
+        self.assertEqual(atom.index, 2)
+        self.assertEqual(atom.element, structure.elements[1])
+        self.assertEqual(atom.ff_identifier, structure.names[1])
+        self.assertEqual([atom.x, atom.y, atom.z], structure.coordinates[1].tolist())
+        self.assertEqual(atom.to_list()[-1], 2)
+        self.assertEqual(
+            set(atom.to_dict()),
+            {"ff_identifier", "element", "x", "y", "z", "neighbours", "index"},
+        )
+        self.assertTrue(repr(atom).startswith("Atom("))
+
+        bonded = {int(j) + 1 for i, j in structure.bonds if i == 1} | {
+            int(i) + 1 for i, j in structure.bonds if j == 1
+        }
+        self.assertEqual(set(atom.neighbours), bonded)
+
+        self.assertEqual(structure[-1].index, structure.atom_count)
+        self.assertEqual(len(list(structure)), structure.atom_count)
+        with self.assertRaises(IndexError):
+            structure[structure.atom_count]
+
+    def test_write_pdb_fixed_columns(self) -> None:
+        """Tests that the PDB writer places all fields in the fixed PDB columns."""
+
+        coordinates = np.array(
+            [[-1.2344, 0.0, 12.5], [-0.4, 1000.25, -999.999], [3.0, -12.0, 0.0005]]
+        )
+        structure = Structure(
+            coordinates=coordinates,
+            names=np.array(["CH3", "HH31", "O"]),
+            elements=np.array(["C", "H", "O"]),
+            residue_names=np.array(["ACE", "ACE", "PEO"]),
+            residue_numbers=np.array([1, 1, 12345]),
+            bonds=np.array([[0, 1]]),
+            links=np.array([[1, 2]]),
+        )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outpath = Path(tmpdir) / self.out_file_name
+            write_pdb(structure, outpath, explicit_bonds=True)
+            with open(outpath, "r") as f:
+                lines = f.read().splitlines()
+
+        atoms = [line for line in lines if line.startswith("ATOM")]
+        self.assertEqual(len(atoms), 3)
+
+        for index, line in enumerate(atoms):
+            self.assertEqual(len(line), 80)
+            self.assertEqual(int(line[6:11]), index + 1)
+            self.assertEqual(line[12:16].strip(), structure.names[index])
+            self.assertEqual(line[17:20], structure.residue_names[index])
+            self.assertEqual(line[21], "A")
+            self.assertEqual(int(line[22:26]), structure.residue_numbers[index] % 10000)
+            for axis, (start, stop) in enumerate([(30, 38), (38, 46), (46, 54)]):
+                self.assertEqual(line[start:stop], f"{coordinates[index, axis]:8.3f}")
+            self.assertEqual(line[76:78].strip(), structure.elements[index])
+
+        self.assertEqual(lines[3], "CONECT    1    2")
+        self.assertEqual(lines[4], "CONECT    2    3")
+        self.assertTrue(lines[5].startswith("MASTER"))
+        self.assertEqual(lines[-1], "END")
+
+        # coordinates, which need more than 8 columns, are rejected before the file is written
+        for value in [10000.0, 9999.9996, -1000.0, -999.9996, np.nan]:
+            wide = Structure(
+                coordinates=np.where(np.arange(3) == 1, value, coordinates),
+                names=structure.names,
+                elements=structure.elements,
+                residue_names=structure.residue_names,
+                residue_numbers=structure.residue_numbers,
+                bonds=structure.bonds,
+                links=structure.links,
+            )
+            with tempfile.TemporaryDirectory() as tmpdir:
+                outpath = Path(tmpdir) / self.out_file_name
+                with self.assertRaisesRegex(
+                    ValueError, r"y coordinate .* atom 1 \(CH3\)"
+                ):
+                    write_pdb(wide, outpath)
+                self.assertFalse(outpath.exists())
+
     def test_explicit_bonds(self) -> None:
         """Tests the explicit bond function"""
         pass
@@ -174,3 +983,187 @@ class TestFunctions(TestCase):
             links = get_links_from_pdb(Path(tmpdir) / self.out_file_name)
 
         self.assertIsInstance(links, np.ndarray)
+        self.assertEqual(links.shape[1], 2)
+        self.assertTrue(np.all(links[:, 0] < links[:, 1]))
+
+    def test_read_bond_graph(self) -> None:
+        """Tests the bond graph of CONECT records with different numbers of bonded atoms and repeated bonds."""
+
+        records = [
+            f"ATOM  {serial:>5d}  C   PEO A   1       0.000   0.000   0.000  1.00  0.00           C"
+            for serial in (10, 20, 30, 40, 50)
+        ]
+        records += [
+            "CONECT   10   20   30   40   50",
+            "CONECT   20   10",
+            "CONECT   30   40",
+            "END",
+        ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fpath = Path(tmpdir) / self.out_file_name
+            fpath.write_text("\n".join(records))
+            graph = read_bond_graph(fpath)
+            links = get_links_from_pdb(fpath)
+
+            fpath.write_text("\n".join(records + ["CONECT   10   60"]))
+            with self.assertRaises(ValueError):
+                read_bond_graph(fpath)
+
+        self.assertEqual(graph.edges.tolist(), [[0, 1], [0, 2], [0, 3], [0, 4], [2, 3]])
+        self.assertEqual(graph.indptr.tolist(), [0, 4, 5, 7, 9, 10])
+        self.assertEqual(graph.neighbours(2).tolist(), [0, 3])
+        self.assertEqual(
+            links.tolist(), [[10, 20], [10, 30], [10, 40], [10, 50], [30, 40]]
+        )
+
+    def test_generate_ensemble(self) -> None:
+        """Tests that an ensemble is reproducible for a seed, independent of the number of workers."""
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outpath = Path(tmpdir) / self.out_file_name
+            statistics = generate_ensemble(
+                self.monomers, self.seq, 3, outpath, seed=42, workers=1
+            )
+            paths = ensemble_paths(outpath, 3)
+            serial = [path.read_text() for path in paths]
+
+            generate_ensemble(self.monomers, self.seq, 3, outpath, seed=42, workers=2)
+            parallel = [path.read_text() for path in paths]
+
+            generate_ensemble(
+                self.monomers,
+                self.seq,
+                3,
+                outpath,
+                seed=42,
+                workers=1,
+                multi_model=True,
+            )
+            with open(outpath, "r") as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(
+            [path.name for path in paths], ["out_1.pdb", "out_2.pdb", "out_3.pdb"]
+        )
+        self.assertEqual(len(statistics), 3)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(set(serial)), 3)
+
+        atom_count = self.seq.atom_count(self.monomers)
+        self.assertEqual(sum(line.startswith("MODEL") for line in lines), 3)
+        self.assertEqual(sum(line.startswith("ENDMDL") for line in lines), 3)
+        self.assertEqual(sum(line.startswith("ATOM") for line in lines), 3 * atom_count)
+
+        # the models are the chains of the numbered files
+        atoms = [line for line in serial[1].splitlines() if line.startswith("ATOM")]
+        start = lines.index("MODEL        2") + 1
+        self.assertEqual(lines[start : start + atom_count], atoms)
+
+    def test_shift_conf_not_modified(self) -> None:
+        """Tests that the shift configuration of the caller is not modified while growing a chain."""
+
+        shift_conf = [-1, 1, -1, 1, -1, 1, 1]
+        build_structure(self.monomers, self.seq, shift_conf=shift_conf)
+
+        self.assertEqual(shift_conf, [-1, 1, -1, 1, -1, 1, 1])
+
+    def test_build_box(self) -> None:
+        """Tests packing several chains into a periodic cell at a target density."""
+
+        seq = Sequence(index=[6, 3, 1], inverted=[False] * 3, reps=[1, 5, 10])
+        structure = build_box(
+            self.monomers,
+            [self.seq, seq],
+            [2, 3],
+            density=0.5,
+            rng=np.random.default_rng(0),
+        )
+
+        atom_count = 2 * self.seq.atom_count(self.monomers) + 3 * seq.atom_count(
+            self.monomers
+        )
+        self.assertEqual(structure.atom_count, atom_count)
+        self.assertEqual(
+            structure.residue_count, 2 * sum(self.seq.reps) + 3 * sum(seq.reps)
+        )
+        self.assertTrue(np.all(np.diff(structure.residue_numbers) >= 0))
+
+        # the minimum image distances between all atoms respect the threshold
+        delta = structure.coordinates[:, None, :] - structure.coordinates[None, :, :]
+        delta -= structure.box * np.round(delta / structure.box)
+        distances = np.linalg.norm(delta, axis=2)
+        np.fill_diagonal(distances, np.inf)
+        self.assertGreaterEqual(distances.min(), 1.0 - 1e-9)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            outpath = Path(tmpdir) / self.out_file_name
+            write_pdb(structure, outpath)
+            with open(outpath, "r") as f:
+                lines = f.read().splitlines()
+
+        self.assertTrue(lines[0].startswith("CRYST1"))
+        self.assertAlmostEqual(float(lines[0][6:15]), structure.box[0], places=3)
+
+        with self.assertRaises(ValueError):
+            build_box(self.monomers, [seq], [1])
+
+    def test_relax_structure(self) -> None:
+        """Tests that the relaxation pushes atoms of different residues apart and keeps the residues rigid."""
+
+        structure, _ = grow_chain(
+            self.monomers, self.seq, trr=0.8, rng=np.random.default_rng(0)
+        )
+        relaxed, statistics = relax_structure(structure, distance=1.0)
+
+        self.assertGreaterEqual(statistics.min_distance, 1.0)
+        self.assertLessEqual(statistics.max_deviation, 0.1)
+        self.assertLess(statistics.steps, 1000)
+
+        distances = cdist(relaxed.coordinates, relaxed.coordinates)
+        different = relaxed.residue_numbers[:, None] != relaxed.residue_numbers
+        excluded = relaxed.exclusions()
+        different[excluded[:, 0], excluded[:, 1]] = False
+        different[excluded[:, 1], excluded[:, 0]] = False
+        self.assertGreaterEqual(distances[different].min(), 1.0)
+
+        # the internal distances of the residues are kept
+        same = ~(relaxed.residue_numbers[:, None] != relaxed.residue_numbers)
+        before = cdist(structure.coordinates, structure.coordinates)
+        self.assertTrue(np.allclose(distances[same], before[same]))
+
+        # the bonds between residues keep their length and the 1-3 pairs are not compressed
+        edges = relaxed.bond_graph().edges
+        edges = edges[
+            relaxed.residue_numbers[edges[:, 0]] != relaxed.residue_numbers[edges[:, 1]]
+        ]
+        bonded = distances[edges[:, 0], edges[:, 1]] - before[edges[:, 0], edges[:, 1]]
+        self.assertLessEqual(np.max(np.abs(bonded)), 0.1)
+
+        excluded = excluded[
+            relaxed.residue_numbers[excluded[:, 0]]
+            != relaxed.residue_numbers[excluded[:, 1]]
+        ]
+        compressed = (
+            before[excluded[:, 0], excluded[:, 1]]
+            - distances[excluded[:, 0], excluded[:, 1]]
+        )
+        self.assertLessEqual(np.max(compressed), 0.1)
+
+        structure = build_structure(
+            self.monomers, self.seq, trr=0.8, relax=1.0, rng=np.random.default_rng(0)
+        )
+        self.assertTrue(np.allclose(structure.coordinates, relaxed.coordinates))
+
+        # a relaxation, which would distort the bonds to remove the clashes, fails
+        with self.assertRaises(GrowthError):
+            build_structure(
+                self.monomers,
+                self.seq,
+                trr=0.7,
+                relax=1.0,
+                rng=np.random.default_rng(0),
+            )
+
+        with self.assertRaises(ValueError):
+            relax_structure(structure, distance=0)
@@ -1,5 +1,18 @@
 from unittest import TestCase
 
+from project_raccoon.src.functions import (
+    build_structure,
+    write_pdb,
+    write_models,
+    validate_pdb,
+    check_pdb_file,
+)
+from project_raccoon.src.data import Monomers, Sequence
+
+from pathlib import Path
+
+import tempfile
+
 
 class TestPdbFile(TestCase):
     """
@@ -7,13 +20,127 @@ class TestPdbFile(TestCase):
     """
 
     def setUp(self) -> None:
+        self.structure = build_structure(
+            Monomers.from_json(), Sequence([0, 1], [False, False], [3, 2])
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.fpath = Path(self.tmpdir.name) / "out.pdb"
+        write_pdb(self.structure, self.fpath, explicit_bonds=True)
+        self.lines = self.fpath.read_text().splitlines()
         return super().setUp()
 
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+        return super().tearDown()
+
+    def validate(self, lines):
+        """Writes the lines and returns the messages of the errors by line number."""
+        self.fpath.write_text("\n".join(lines))
+        return {(error.line, error.message) for error in validate_pdb(self.fpath)}
+
     def test_is_sorted(self):
-        pass
+        lines = self.lines.copy()
+        lines[2] = lines[2][:6] + "   99" + lines[2][11:]
+
+        errors = self.validate(lines)
+        self.assertIn((3, "Serial number 99 does not follow 2."), errors)
+        self.assertIn((4, "Serial number 4 does not follow 99."), errors)
+
+        # the serial numbers restart in every model
+        write_models([self.structure, self.structure], self.fpath)
+        self.assertEqual(validate_pdb(self.fpath, chunk_size=64), [])
 
     def test_closing(self):
-        pass
+        errors = self.validate(self.lines[:-1])
+        self.assertEqual(
+            {message for _, message in errors},
+            {"The last record of the file is not END."},
+        )
+
+        master = self.lines[-2]
+        lines = self.lines[:-2] + [master[:50] + "    1" + master[55:], "END"]
+        errors = self.validate(lines)
+        self.assertEqual(
+            errors,
+            {
+                (
+                    len(lines) - 1,
+                    f"Atom count 1 does not match the {self.structure.atom_count} ATOM and HETATM records.",
+                )
+            },
+        )
+
+        errors = self.validate(self.lines[:-2] + ["END"])
+        self.assertEqual(errors, {(0, "The MASTER record is missing.")})
 
     def test_validate_pdb_file(self):
-        pass
+        self.assertEqual(check_pdb_file(self.fpath), [])
+        self.fpath.write_bytes("\r\n".join(self.lines).encode())
+        self.assertEqual(validate_pdb(self.fpath, memory_map=True), [])
+
+        lines = self.lines.copy()
+        lines[0] = lines[0][:40]
+        lines[1] = lines[1] + " " * 10 + "X"
+        lines[4] = lines[4][:31] + "x" + lines[4][32:]
+        lines.insert(len(lines) - 2, "CONECT    1 9999")
+
+        errors = self.validate(lines)
+        self.assertEqual(
+            errors,
+            {
+                (1, "Record has 40 columns, the coordinates need 54."),
+                (2, "Record has 91 columns, at most 80 are allowed."),
+                (5, f"Invalid coordinate '{lines[4][30:38].strip()}'."),
+                (
+                    len(lines) - 2,
+                    "Bonded atom with serial number 9999 does not exist.",
+                ),
+            },
+        )
+
+    def test_legacy_layout(self):
+        """Tests files of the former writer, which left-justifies the serial numbers and the MASTER fields."""
+        count = 10050
+        layout = "{:>0}{:<7}{:<5}{:<5}{:<4}{:<3}{:<6}{:<8}{:<8}{:<10}{:<7}{:<14}{}"
+        atoms = [
+            layout.format(
+                "",
+                "ATOM",
+                serial,
+                "C",
+                "PEO",
+                "A",
+                (serial - 1) // 7 + 1,
+                f"{serial % 50:.3f}",
+                "0.000",
+                f"{serial // 50:.3f}",
+                1.0,
+                0.0,
+                "C",
+            )
+            for serial in range(1, count + 1)
+        ]
+        conect = [
+            layout.format("", "CONECT", serial, serial + 1, *[""] * 10)
+            for serial in range(1, count)
+        ]
+        master = "{:>0}{:<11}{:<5}{:<5}{:<4}{:<5}{:<5}{:<5}{:<5}{:<5}{:<5}{:<5}{:<5}{}".format(
+            "", "MASTER", 0, 0, 0, 0, 0, 0, 0, 0, count, 0, count, 0
+        )
+        self.assertEqual(atoms[-1][6:12], " 10050")
+        self.assertEqual(conect[-1][6:17], " 1004910050")
+
+        self.validate(atoms + conect + [master, "END"])
+        self.assertEqual(check_pdb_file(self.fpath), [])
+
+        # MASTER fields, which are only separated by whitespace
+        master = "MASTER 0 0 0 0 0 0 0 0 10050 0 10050 0"
+        self.assertEqual(self.validate(atoms + conect + [master, "END"]), set())
+
+        # errors are still found in the former layout
+        lines = atoms + conect[:-1] + ["CONECT 1004920000", master, "END"]
+        errors = self.validate(lines)
+        self.assertEqual(
+            errors,
+            {(len(lines) - 2, "Bonded atom with serial number 20000 does not exist.")},
+        )
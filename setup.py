@@ -23,7 +23,6 @@ setup(
     entry_points={"console_scripts": ["project_raccoon=project_raccoon.__main__:main"]},
     python_requires=">=3.11",
     install_requires=[
-        "biopandas==0.4.1",
         "numpy==1.26.3",
         "pandas==2.1.4",
         "py3Dmol==2.0.4",